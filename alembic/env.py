@@ -18,12 +18,12 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "a
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 from app.core.config import settings
-from app.core.db import Base  # Base.metadata
+from app.core.db import Base, normalize_db_url  # Base.metadata
 # Optionally import models so autogenerate sees them
-from app.models import user, site, post
+from app.models import user, site, post, refresh_token, publish_job, campaign, credit_ledger, article_cache, generation_usage
 
 # Set sqlalchemy.url from app settings to avoid placeholder
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+config.set_main_option("sqlalchemy.url", normalize_db_url(settings.DATABASE_URL))
 
 target_metadata = Base.metadata
 
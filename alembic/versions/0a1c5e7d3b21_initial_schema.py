@@ -0,0 +1,84 @@
+"""initial schema (users, wp_sites, posts)
+
+Revision ID: 0a1c5e7d3b21
+Revises:
+Create Date: 2025-09-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a1c5e7d3b21'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Tables that used to come from Base.metadata.create_all() at import time.
+    # Databases created that way already have them plus the columns of the next
+    # two revisions: `alembic stamp 59aeefb748f3`, then `alembic upgrade head`.
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('credits', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+
+    op.create_table(
+        'wp_sites',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('wp_url', sa.String(length=255), nullable=False),
+        sa.Column('wp_user', sa.String(length=255), nullable=False),
+        sa.Column('wp_app_pass_enc', sa.Text(), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('site_name', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_wp_sites_id'), 'wp_sites', ['id'], unique=False)
+    op.create_index(op.f('ix_wp_sites_user_id'), 'wp_sites', ['user_id'], unique=False)
+
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('site_name', sa.String(length=255), nullable=True),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('wp_post_url', sa.String(length=500), nullable=False),
+        sa.Column('has_image', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['site_id'], ['wp_sites.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_posts_id'), 'posts', ['id'], unique=False)
+    op.create_index(op.f('ix_posts_user_id'), 'posts', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_posts_user_id'), table_name='posts')
+    op.drop_index(op.f('ix_posts_id'), table_name='posts')
+    op.drop_table('posts')
+    op.drop_index(op.f('ix_wp_sites_user_id'), table_name='wp_sites')
+    op.drop_index(op.f('ix_wp_sites_id'), table_name='wp_sites')
+    op.drop_table('wp_sites')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
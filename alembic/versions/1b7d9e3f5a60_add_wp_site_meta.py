@@ -0,0 +1,55 @@
+"""add wp_site_meta table and publish_jobs.terms
+
+Revision ID: 1b7d9e3f5a60
+Revises: f4c6a8e2b917
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7d9e3f5a60'
+down_revision: Union[str, Sequence[str], None] = 'f4c6a8e2b917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'wp_site_meta',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(length=20), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('etag', sa.String(length=255), nullable=True),
+        sa.Column('last_modified', sa.String(length=64), nullable=True),
+        sa.Column('status_code', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['site_id'], ['wp_sites.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('site_id', 'resource', name='uq_wp_site_meta_site_resource'),
+    )
+    op.create_index(op.f('ix_wp_site_meta_id'), 'wp_site_meta', ['id'], unique=False)
+    op.create_index(op.f('ix_wp_site_meta_site_id'), 'wp_site_meta', ['site_id'], unique=False)
+    op.create_index(op.f('ix_wp_site_meta_expires_at'), 'wp_site_meta', ['expires_at'], unique=False)
+
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.add_column(sa.Column('terms', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.drop_column('terms')
+
+    op.drop_index(op.f('ix_wp_site_meta_expires_at'), table_name='wp_site_meta')
+    op.drop_index(op.f('ix_wp_site_meta_site_id'), table_name='wp_site_meta')
+    op.drop_index(op.f('ix_wp_site_meta_id'), table_name='wp_site_meta')
+    op.drop_table('wp_site_meta')
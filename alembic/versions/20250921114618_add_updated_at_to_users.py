@@ -3,7 +3,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = "20250921114618"
-down_revision = None
+down_revision = "0a1c5e7d3b21"
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,51 @@
+"""add article_cache table and publish_jobs.use_cache
+
+Revision ID: a3f9c1d7e8b2
+Revises: f2a8d6b13c59
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f9c1d7e8b2'
+down_revision: Union[str, Sequence[str], None] = 'f2a8d6b13c59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'article_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('title', sa.String(length=500), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_article_cache_last_used_at'), 'article_cache', ['last_used_at'], unique=False)
+    op.create_index(op.f('ix_article_cache_expires_at'), 'article_cache', ['expires_at'], unique=False)
+
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.add_column(sa.Column('use_cache', sa.Boolean(), server_default=sa.true(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.drop_column('use_cache')
+
+    op.drop_index(op.f('ix_article_cache_expires_at'), table_name='article_cache')
+    op.drop_index(op.f('ix_article_cache_last_used_at'), table_name='article_cache')
+    op.drop_table('article_cache')
@@ -0,0 +1,53 @@
+"""add publish_jobs table (background auto-publish)
+
+Revision ID: b4d2f8e61a07
+Revises: 7c3e9a1f2b40
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d2f8e61a07'
+down_revision: Union[str, Sequence[str], None] = '7c3e9a1f2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'publish_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('with_image', sa.Boolean(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('stage', sa.String(length=30), nullable=True),
+        sa.Column('stage_timings', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.ForeignKeyConstraint(['site_id'], ['wp_sites.id']),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_publish_jobs_user_id'), 'publish_jobs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_publish_jobs_status'), 'publish_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_publish_jobs_status'), table_name='publish_jobs')
+    op.drop_index(op.f('ix_publish_jobs_user_id'), table_name='publish_jobs')
+    op.drop_table('publish_jobs')
@@ -0,0 +1,59 @@
+"""add generation_usage table
+
+Revision ID: c7e4a2b9d150
+Revises: a3f9c1d7e8b2
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e4a2b9d150'
+down_revision: Union[str, Sequence[str], None] = 'a3f9c1d7e8b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'generation_usage',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=True),
+        sa.Column('post_id', sa.Integer(), nullable=True),
+        sa.Column('job_id', sa.String(length=32), nullable=True),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=True),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('prompt_tokens', sa.Integer(), nullable=True),
+        sa.Column('completion_tokens', sa.Integer(), nullable=True),
+        sa.Column('latency_ms', sa.Float(), nullable=True),
+        sa.Column('retries', sa.Integer(), nullable=True),
+        sa.Column('success', sa.Boolean(), nullable=True),
+        sa.Column('cached', sa.Boolean(), nullable=True),
+        sa.Column('cost_usd', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['post_id'], ['posts.id']),
+        sa.ForeignKeyConstraint(['site_id'], ['wp_sites.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_generation_usage_id'), 'generation_usage', ['id'], unique=False)
+    op.create_index(op.f('ix_generation_usage_post_id'), 'generation_usage', ['post_id'], unique=False)
+    op.create_index(op.f('ix_generation_usage_job_id'), 'generation_usage', ['job_id'], unique=False)
+    op.create_index('ix_generation_usage_user_created', 'generation_usage', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_generation_usage_user_created', table_name='generation_usage')
+    op.drop_index(op.f('ix_generation_usage_job_id'), table_name='generation_usage')
+    op.drop_index(op.f('ix_generation_usage_post_id'), table_name='generation_usage')
+    op.drop_index(op.f('ix_generation_usage_id'), table_name='generation_usage')
+    op.drop_table('generation_usage')
@@ -0,0 +1,54 @@
+"""add campaigns table and campaign columns on publish_jobs
+
+Revision ID: d91a5c3e7f12
+Revises: b4d2f8e61a07
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91a5c3e7f12'
+down_revision: Union[str, Sequence[str], None] = 'b4d2f8e61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'campaigns',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('with_image', sa.Boolean(), nullable=True),
+        sa.Column('total_items', sa.Integer(), nullable=False),
+        sa.Column('credits_reserved', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_campaigns_user_id'), 'campaigns', ['user_id'], unique=False)
+
+    # batch mode so this also works on SQLite (no ALTER ... ADD CONSTRAINT)
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.add_column(sa.Column('campaign_id', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('credit_reserved', sa.Boolean(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_publish_jobs_campaign_id'), ['campaign_id'], unique=False)
+        batch_op.create_foreign_key('fk_publish_jobs_campaign_id', 'campaigns', ['campaign_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.drop_constraint('fk_publish_jobs_campaign_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_publish_jobs_campaign_id'))
+        batch_op.drop_column('credit_reserved')
+        batch_op.drop_column('campaign_id')
+
+    op.drop_index(op.f('ix_campaigns_user_id'), table_name='campaigns')
+    op.drop_table('campaigns')
@@ -0,0 +1,28 @@
+"""add composite (user_id, created_at, id) index on posts
+
+Revision ID: e5b7c2d94a31
+Revises: d91a5c3e7f12
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7c2d94a31'
+down_revision: Union[str, Sequence[str], None] = 'd91a5c3e7f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_posts_user_created_id', 'posts', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_user_created_id', table_name='posts')
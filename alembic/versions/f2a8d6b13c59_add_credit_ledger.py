@@ -0,0 +1,53 @@
+"""add credit_ledger table
+
+Revision ID: f2a8d6b13c59
+Revises: e5b7c2d94a31
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8d6b13c59'
+down_revision: Union[str, Sequence[str], None] = 'e5b7c2d94a31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'credit_ledger',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('balance_after', sa.Integer(), nullable=True),
+        sa.Column('job_id', sa.String(length=32), nullable=True),
+        sa.Column('campaign_id', sa.String(length=32), nullable=True),
+        sa.Column('note', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_credit_ledger_id'), 'credit_ledger', ['id'], unique=False)
+    op.create_index(op.f('ix_credit_ledger_user_id'), 'credit_ledger', ['user_id'], unique=False)
+    op.create_index(op.f('ix_credit_ledger_job_id'), 'credit_ledger', ['job_id'], unique=False)
+
+    # Opening balance so every user's ledger sums to users.credits
+    op.execute(
+        "INSERT INTO credit_ledger (user_id, kind, delta, balance_after, note) "
+        "SELECT id, 'grant', COALESCE(credits, 0), COALESCE(credits, 0), 'opening balance' FROM users"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_credit_ledger_job_id'), table_name='credit_ledger')
+    op.drop_index(op.f('ix_credit_ledger_user_id'), table_name='credit_ledger')
+    op.drop_index(op.f('ix_credit_ledger_id'), table_name='credit_ledger')
+    op.drop_table('credit_ledger')
@@ -0,0 +1,65 @@
+"""add scheduled_publishes table and publish_jobs.schedule_id
+
+Revision ID: f4c6a8e2b917
+Revises: e8d3f5a1c246
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c6a8e2b917'
+down_revision: Union[str, Sequence[str], None] = 'e8d3f5a1c246'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'scheduled_publishes',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=32), nullable=False),
+        sa.Column('keyword', sa.String(length=255), nullable=False),
+        sa.Column('style', sa.String(length=100), nullable=True),
+        sa.Column('with_image', sa.Boolean(), nullable=True),
+        sa.Column('use_cache', sa.Boolean(), nullable=True),
+        sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('claim_token', sa.String(length=32), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('title', sa.String(length=500), nullable=True),
+        sa.Column('content', sa.Text(), nullable=True),
+        sa.Column('image_b64', sa.Text(), nullable=True),
+        sa.Column('generated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['site_id'], ['wp_sites.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id'),
+    )
+    op.create_index(op.f('ix_scheduled_publishes_site_id'), 'scheduled_publishes', ['site_id'], unique=False)
+    op.create_index('ix_scheduled_publishes_status_due', 'scheduled_publishes', ['status', 'due_at'], unique=False)
+    op.create_index('ix_scheduled_publishes_user_due', 'scheduled_publishes', ['user_id', 'due_at'], unique=False)
+
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.add_column(sa.Column('schedule_id', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('publish_jobs') as batch_op:
+        batch_op.drop_column('schedule_id')
+
+    op.drop_index('ix_scheduled_publishes_user_due', table_name='scheduled_publishes')
+    op.drop_index('ix_scheduled_publishes_status_due', table_name='scheduled_publishes')
+    op.drop_index(op.f('ix_scheduled_publishes_site_id'), table_name='scheduled_publishes')
+    op.drop_table('scheduled_publishes')
@@ -1,13 +1,129 @@
 # app/core/db.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.core.config import settings
+from app.core.metrics import count_query
+
+
+def normalize_db_url(url: str) -> str:
+    # Heroku / Render style URLs
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _sqlite_pragmas(engine: Engine, in_memory: bool):
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        if not in_memory:
+            # WAL: readers never block the writer (and vice versa);
+            # NORMAL sync is safe with WAL and avoids an fsync per commit
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cur.close()
+
+
+def build_engine(url: str | None = None) -> Engine:
+    """
+    One engine factory for the app, migrations and scripts.
+    - SQLite (single node): WAL, synchronous=NORMAL, busy timeout
+    - PostgreSQL (multi node): sized pool, overflow, recycle, pre-ping,
+      optional statement timeout
+    """
+    url = normalize_db_url(url or settings.DATABASE_URL)
+    pool_kwargs = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            **({} if in_memory else pool_kwargs),
+        )
+        _sqlite_pragmas(engine, in_memory)
+        return engine
+
+    connect_args = {}
+    if url.startswith("postgresql"):
+        connect_args["application_name"] = "rankpost-backend"
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = f"-c statement_timeout={int(settings.DB_STATEMENT_TIMEOUT_MS)}"
+
+    return create_engine(url, connect_args=connect_args, **pool_kwargs)
+
+
+def async_db_url(url: str) -> str:
+    """sync URL → async driver URL (aiosqlite / asyncpg)"""
+    url = normalize_db_url(url)
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    if url.startswith("postgresql:") or url.startswith("postgresql+psycopg2:"):
+        return "postgresql+asyncpg:" + url.split(":", 1)[1]
+    return url
+
+
+def build_async_engine(url: str | None = None) -> AsyncEngine:
+    """Async twin of build_engine(), same pool settings and SQLite pragmas"""
+    url = async_db_url(url or settings.DATABASE_URL)
+    pool_kwargs = dict(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+    if url.startswith("sqlite"):
+        in_memory = ":memory:" in url or "mode=memory" in url or url.endswith("://")
+        engine_ = create_async_engine(
+            url,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000},
+            # aiosqlite defaults to NullPool (a new connection per session)
+            **({} if in_memory else dict(poolclass=AsyncAdaptedQueuePool, **pool_kwargs)),
+        )
+        _sqlite_pragmas(engine_.sync_engine, in_memory)
+        return engine_
+
+    connect_args = {}
+    if url.startswith("postgresql+asyncpg"):
+        server_settings = {"application_name": "rankpost-backend"}
+        if settings.DB_STATEMENT_TIMEOUT_MS:
+            server_settings["statement_timeout"] = str(int(settings.DB_STATEMENT_TIMEOUT_MS))
+        connect_args["server_settings"] = server_settings
+
+    return create_async_engine(url, connect_args=connect_args, **pool_kwargs)
+
+
+# Count every statement (sync + async engines) for /metrics and per-request query counts
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    count_query()
+
+
+def pool_status(engine_: Engine | None = None) -> dict:
+    """Connection pool metrics (for /utils/db-pool and monitoring)"""
+    pool = (engine_ or engine).pool
+    status = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            status[name] = fn()
+    return status
+
 
 # Database engine create karo
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+engine = build_engine()
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -24,8 +140,31 @@ def get_db():
     finally:
         db.close()
 
-# Import all models so they register with SQLAlchemy
-from app.models import user, site, post  # sabhi models yahan import karna zaroori hai
 
-# Tables create karo agar exist nahi karti
-Base.metadata.create_all(bind=engine)
+# Async engine for the API routers — created on first use, so scripts and
+# workers that only need the sync engine don't need the async drivers
+_async_engine: AsyncEngine | None = None
+_AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = build_async_engine()
+        # expire_on_commit=False: no implicit (blocking) reloads after commit
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+# Dependency to get async DB session
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _AsyncSessionLocal = None
+
+# Schema is owned by Alembic (alembic/versions) — run `alembic upgrade head`.
+# No create_all() here: startup must not reflect/DDL against the database.
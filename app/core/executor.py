@@ -0,0 +1,106 @@
+# app/core/executor.py
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from app.core.config import settings
+
+
+class CpuExecutor:
+    """
+    Shared process pool for CPU-bound work (bcrypt, JPEG encoding) so it
+    does not hold the GIL on the API / worker threads.
+
+    - `workers=0` runs tasks inline on the calling thread (dev / tests)
+    - the pool is created lazily on first use, with the "spawn" start
+      method (forking a process that already runs threads is unsafe)
+    - task functions must be top-level, picklable functions
+    - `stats()` reports queue depth and per-task latency
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(0, workers)
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._failed = 0
+        self._tasks: dict[str, dict] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def _record(self, name: str, started: float, failed: bool):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._pending -= 1
+            if failed:
+                self._failed += 1
+            t = self._tasks.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            t["count"] += 1
+            t["total_ms"] += elapsed_ms
+            t["max_ms"] = max(t["max_ms"], elapsed_ms)
+
+    def submit(self, fn, *args) -> Future:
+        name = getattr(fn, "__name__", "task")
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+
+        if not self.workers:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._get_pool().submit(fn, *args)
+
+        future.add_done_callback(
+            lambda f: self._record(name, started, f.cancelled() or f.exception() is not None)
+        )
+        return future
+
+    def run(self, fn, *args):
+        """Run on the pool and wait (blocks the caller, but not the GIL)."""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn, *args):
+        """Run on the pool without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._pending,
+                "submitted": self._submitted,
+                "failed": self._failed,
+                "tasks": {
+                    name: {
+                        "count": t["count"],
+                        "avg_ms": round(t["total_ms"] / t["count"], 2) if t["count"] else 0.0,
+                        "max_ms": round(t["max_ms"], 2),
+                    }
+                    for name, t in self._tasks.items()
+                },
+            }
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Shared pool for the whole process
+cpu_executor = CpuExecutor(workers=settings.CPU_POOL_WORKERS)
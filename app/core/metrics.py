@@ -0,0 +1,262 @@
+# app/core/metrics.py
+# Tiny Prometheus-compatible metrics (text exposition format 0.0.4), no
+# client library needed. Values are per process — with several uvicorn
+# workers, scrape each one or aggregate in Prometheus.
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+logger = logging.getLogger("rankpost")
+
+# Latency buckets in seconds (OpenAI calls take tens of seconds, DB commits ms)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, doc: str, labelnames: tuple = ()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, doc: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            items = [(k, list(s[0]), s[1], s[2]) for k, s in self._values.items()]
+        lines = self.header()
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="%s"' % _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list = []  # callables → [(name, doc, type, {labels}, value)]
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, doc: str, labelnames: tuple = ()) -> Counter:
+        return self.register(Counter(name, doc, labelnames))
+
+    def gauge(self, name: str, doc: str, labelnames: tuple = ()) -> Gauge:
+        return self.register(Gauge(name, doc, labelnames))
+
+    def histogram(self, name: str, doc: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, doc, labelnames, buckets))
+
+    def collector(self, fn):
+        """Register fn() → iterable of (name, doc, type, labels_dict, value), evaluated at scrape time"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        seen = set()
+        for fn in self._collectors:
+            try:
+                samples = list(fn())
+            except Exception as e:
+                logger.exception("Metrics collector %s failed", getattr(fn, "__name__", fn))
+                continue
+            for name, doc, kind, labels, value in samples:
+                if value is None:
+                    continue
+                if name not in seen:
+                    seen.add(name)
+                    lines += [f"# HELP {name} {doc}", f"# TYPE {name} {kind}"]
+                names = tuple(labels)
+                lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# -------------------------
+# HTTP
+# -------------------------
+http_requests = registry.counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+http_latency = registry.histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+http_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+http_exceptions = registry.counter("http_unhandled_exceptions_total", "Unhandled exceptions by route and type", ("route", "exception"))
+
+# -------------------------
+# Database
+# -------------------------
+db_queries = registry.counter("db_queries_total", "SQL statements executed")
+db_queries_per_request = registry.histogram(
+    "http_request_db_queries", "SQL statements per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+
+# -------------------------
+# Publish pipeline
+# -------------------------
+# stage: openai_article / openai_image / jpeg_compress / wp_media_upload / wp_post_create / db_commit
+publish_stage_latency = registry.histogram("publish_stage_duration_seconds", "Auto-publish stage latency", ("stage",))
+publish_jobs = registry.counter("publish_jobs_total", "Finished publish jobs by status", ("status",))
+# event: fired / pregenerated / pregenerate_failed
+scheduler_events = registry.counter("scheduler_events_total", "Scheduled publish events", ("event",))
+
+# Queries issued by the current request (None outside a request)
+_query_count: ContextVar[list | None] = ContextVar("metrics_query_count", default=None)
+
+
+def start_query_count() -> list:
+    counter = [0]
+    _query_count.set(counter)
+    return counter
+
+
+def count_query():
+    db_queries.inc()
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+@contextmanager
+def stage(name: str):
+    """Time a publish stage into publish_stage_duration_seconds"""
+    with publish_stage_latency.time(stage=name):
+        yield
+
+
+# -------------------------
+# ASGI middleware
+# -------------------------
+class MetricsMiddleware:
+    """
+    Per-route latency / status / in-flight / DB-query metrics. Plain ASGI
+    (not BaseHTTPMiddleware) so streaming responses are not buffered.
+    The route label is the path template ("/api/v1/content/jobs/{job_id}"),
+    never the raw path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        queries = start_query_count()
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            route = route_label(scope)
+            http_requests.inc(method=scope["method"], route=route, status=status["code"])
+            http_latency.observe(elapsed, method=scope["method"], route=route)
+            db_queries_per_request.observe(queries[0], route=route)
+
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
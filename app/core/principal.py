@@ -0,0 +1,62 @@
+# app/core/principal.py
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_access_token
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    Lightweight, cacheable view of the logged-in user — what routers need
+    from get_current_user. Load the ORM User by id when a row must change.
+    """
+    id: int
+    email: str
+    credits: int
+    created_at: datetime | None = None
+
+    @classmethod
+    def from_user(cls, user) -> "UserSnapshot":
+        return cls(id=user.id, email=user.email, credits=user.credits or 0, created_at=user.created_at)
+
+
+# token → claims (never kept past the token's own expiry)
+_token_claims = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+# user id → UserSnapshot
+_user_snapshots = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+def cached_token_claims(token: str) -> dict | None:
+    """Decode + verify a JWT, reusing the result for repeat requests"""
+    claims = _token_claims.get(token)
+    if claims is not None:
+        if claims.get("exp", 0) > time.time():
+            return claims
+        _token_claims.pop(token)
+        return None
+
+    claims = decode_access_token(token)
+    if claims:
+        ttl = min(settings.PRINCIPAL_CACHE_TTL, claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            _token_claims.set(token, claims, ttl=ttl)
+    return claims
+
+
+def get_cached_user(user_id: int) -> UserSnapshot | None:
+    return _user_snapshots.get(user_id)
+
+
+def cache_user(user) -> UserSnapshot:
+    snapshot = UserSnapshot.from_user(user)
+    _user_snapshots.set(snapshot.id, snapshot)
+    return snapshot
+
+
+def invalidate_user(user_id: int):
+    """Call whenever the user row (e.g. credits) changes"""
+    _user_snapshots.pop(user_id)
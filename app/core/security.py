@@ -2,6 +2,9 @@ from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.executor import cpu_executor
+import hashlib
+import hmac
 import secrets
 
 # -------------------------
@@ -14,47 +17,96 @@ ALGORITHM = "HS256"
 # -------------------------
 # Password Hashing
 # -------------------------
-def hash_password(password: str) -> str:
+# bcrypt is deliberately slow, so the actual work runs on the shared
+# process pool; the *_sync functions are what the pool executes.
+def _hash_password_sync(password: str) -> str:
     password = password.encode("utf-8")[:72].decode("utf-8", "ignore")
     return pwd_context.hash(password)
 
-def verify_password(plain: str, hashed: str) -> bool:
+def _verify_password_sync(plain: str, hashed: str) -> bool:
     plain = plain.encode("utf-8")[:72].decode("utf-8", "ignore")
     return pwd_context.verify(plain, hashed)
 
+def hash_password(password: str) -> str:
+    return cpu_executor.run(_hash_password_sync, password)
+
+def verify_password(plain: str, hashed: str) -> bool:
+    return cpu_executor.run(_verify_password_sync, plain, hashed)
+
+async def hash_password_async(password: str) -> str:
+    return await cpu_executor.run_async(_hash_password_sync, password)
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await cpu_executor.run_async(_verify_password_sync, plain, hashed)
+
 
 # -------------------------
 # JWT Access Tokens
 # -------------------------
-def create_access_token(subject: str, expires_minutes: int | None = None) -> str:
+def create_access_token(subject: str, expires_minutes: int | None = None, user_id: int | None = None) -> str:
     """
     Create a JWT access token
     :param subject: usually the user's email or id
     :param expires_minutes: optional expiry override
+    :param user_id: stored as "uid" so requests can be authenticated without an email lookup
     """
     expire = datetime.now(timezone.utc) + timedelta(minutes=expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"sub": subject, "exp": expire.timestamp()}
+    if user_id is not None:
+        to_encode["uid"] = user_id
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=ALGORITHM)
 
-def verify_access_token(token: str) -> str:
+def decode_access_token(token: str) -> dict | None:
     """
     Decode and verify JWT token
-    Returns the 'sub' if valid, raises JWTError if invalid
+    Returns the claims if valid, None if invalid/expired
     """
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
-        return payload.get("sub")
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[ALGORITHM])
     except JWTError:
         return None
 
+def verify_access_token(token: str) -> str:
+    """
+    Decode and verify JWT token
+    Returns the 'sub' if valid, None if invalid
+    """
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
 
 # -------------------------
 # Refresh Tokens
 # -------------------------
-def generate_refresh_token() -> str:
-    """Generate a secure random refresh token"""
-    return secrets.token_urlsafe(48)
+# Format: "<selector>.<verifier>"
+#   - selector → random public id, stored as-is in an indexed column (one lookup)
+#   - verifier → random secret, stored only as an HMAC-SHA256 digest
+# Refresh tokens are high-entropy random strings, so a keyed digest is enough
+# (bcrypt is only needed for low-entropy user passwords).
+REFRESH_SELECTOR_BYTES = 12
+REFRESH_VERIFIER_BYTES = 32
+
+
+def generate_refresh_token() -> tuple[str, str, str]:
+    """
+    Generate a secure random refresh token.
+    Returns (token, selector, verifier_hash) — only the token goes to the client.
+    """
+    selector = secrets.token_urlsafe(REFRESH_SELECTOR_BYTES)
+    verifier = secrets.token_urlsafe(REFRESH_VERIFIER_BYTES)
+    return f"{selector}.{verifier}", selector, hash_refresh_verifier(verifier)
+
+def hash_refresh_verifier(verifier: str) -> str:
+    """Keyed digest of the verifier part (fast, constant cost)"""
+    return hmac.new(settings.JWT_SECRET.encode(), verifier.encode(), hashlib.sha256).hexdigest()
+
+def split_refresh_token(token: str) -> tuple[str, str] | None:
+    """Split "<selector>.<verifier>" → (selector, verifier), or None if malformed"""
+    selector, sep, verifier = (token or "").partition(".")
+    if not sep or not selector or not verifier:
+        return None
+    return selector, verifier
 
-def verify_refresh_token(token: str, hashed: str) -> bool:
-    """Verify a refresh token against its hashed value"""
-    return pwd_context.verify(token, hashed)
+def verify_refresh_token(verifier: str, hashed: str) -> bool:
+    """Verify a refresh token verifier against its stored digest (constant time)"""
+    return hmac.compare_digest(hash_refresh_verifier(verifier), hashed)
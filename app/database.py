@@ -1,12 +1,5 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.models import Base
+# Legacy import path — the single engine/session now live in app.core.db
+# (this module used to build a second engine hard-wired to sqlite:///./rankpost.db).
+from app.core.db import Base, SessionLocal, engine
 
-# Abhi ke liye SQLite use kar rahe hain (ek file rankpost.db banegi project ke andar)
-SQLALCHEMY_DATABASE_URL = "sqlite:///./rankpost.db"
-
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+__all__ = ["Base", "SessionLocal", "engine"]
@@ -1,21 +1,27 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+import hmac
+import logging
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.core.db import Base, engine
+from app.core.db import dispose_async_engine, engine, get_async_engine, pool_status
+from app.core.metrics import MetricsMiddleware, http_exceptions, registry, route_label
 from app.core.config import settings
 
-# Import models so tables are created
-from app.models.user import User
-from app.models.site import WordPressSite
-from app.models.post import GeneratedPost
+# Register all models on Base.metadata (the schema itself comes from `alembic upgrade head`)
+import app.models  # noqa: F401
 
 # Import routers
-from app.routers import auth, sites, content, utils, posts, users
+from app.routers import auth, sites, content, utils, posts, users, schedule
 from app.routers import auth_social   # ✅ Social login router
+from app.services.job_queue import job_queue
+from app.services.scheduler import scheduler
+from app.services.wp_meta import site_meta_refresher
+from app.core.executor import cpu_executor
+from app.services.openai_client import close_client, stop_generation_loop
+from app.services.openai_gateway import openai_gateway
 
-# Create all DB tables
-Base.metadata.create_all(bind=engine)
+logger = logging.getLogger("rankpost")
 
 # FastAPI App
 app = FastAPI(
@@ -41,14 +47,81 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency / status / in-flight / DB query counts → /metrics
+app.add_middleware(MetricsMiddleware)
+
+# ==========================
+# BACKGROUND WORKERS
+# ==========================
+@app.on_event("startup")
+def start_workers():
+    job_queue.start()
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    site_meta_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_workers():
+    scheduler.stop()
+    site_meta_refresher.stop()
+    job_queue.stop()
+    cpu_executor.shutdown()
+    stop_generation_loop()
+    await close_client()
+    await dispose_async_engine()
+
 # Global Exception Handler
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
+    route = route_label(request.scope)
+    http_exceptions.inc(route=route, exception=type(exc).__name__)
+    logger.exception("Unhandled error on %s %s", request.method, route)
     return JSONResponse(
         status_code=500,
-        content={"detail": str(exc) or "Internal Server Error"}
+        # Internal details only in debug builds
+        content={"detail": (str(exc) if settings.DEBUG else "") or "Internal Server Error"}
     )
 
+# ==========================
+# METRICS (Prometheus text format)
+# ==========================
+@registry.collector
+def _runtime_metrics():
+    """Executor, DB pool, job queue and OpenAI gateway state, read at scrape time"""
+    ex = cpu_executor.stats()
+    yield "cpu_pool_queue_depth", "CPU pool tasks waiting or running", "gauge", {}, ex["queue_depth"]
+    yield "cpu_pool_tasks_failed_total", "CPU pool tasks that raised", "counter", {}, ex["failed"]
+    for name, t in ex["tasks"].items():
+        yield "cpu_pool_tasks_total", "CPU pool tasks by function", "counter", {"task": name}, t["count"]
+
+    pools = {"sync": pool_status(engine)}
+    try:
+        pools["async"] = pool_status(get_async_engine().sync_engine)
+    except Exception:
+        pass
+    for label, status in pools.items():
+        for key in ("size", "checkedout", "overflow"):
+            if key in status:
+                yield f"db_pool_{key}", f"DB connection pool {key}", "gauge", {"engine": label}, status[key]
+
+    yield "publish_queue_depth", "Publish jobs waiting for a worker", "gauge", {}, job_queue.depth()
+
+    gw = openai_gateway.stats()
+    for key in ("calls", "retries", "rate_limited", "failed"):
+        yield f"openai_{key}_total", f"OpenAI gateway {key.replace('_', ' ')}", "counter", {}, gw[key]
+    yield "openai_rate_wait_seconds_total", "Time spent waiting for OpenAI rate limits", "counter", {}, gw["waited_s"]
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    # Operator endpoint (pool / queue / gateway state): bearer METRICS_TOKEN, off when unset
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 # ==========================
 # ROUTES
 # ==========================
@@ -63,6 +136,7 @@ app.include_router(content.router, prefix="/api/v1/content", tags=["Content"])
 app.include_router(utils.router, prefix="/api/v1/utils", tags=["Utils"])
 app.include_router(posts.router, prefix="/api/v1/posts", tags=["Posts"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
+app.include_router(schedule.router, prefix="/api/v1/schedule", tags=["Schedule"])
 
 # Root Check
 @app.get("/")
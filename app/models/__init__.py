@@ -1,10 +1,17 @@
 # app/models/__init__.py
-from sqlalchemy.orm import declarative_base
+# ✅ Single Base for all models (defined in app.core.db)
+from app.core.db import Base
 
-# ✅ Base class for all models
-Base = declarative_base()
-
-# ✅ Import all models so Alembic / create_all can detect them
+# ✅ Import all models so Alembic autogenerate can detect them
 from .user import User
 from .site import WordPressSite
 from .post import GeneratedPost
+from .refresh_token import RefreshToken
+from .publish_job import PublishJob
+from .campaign import Campaign
+from .credit_ledger import CreditLedgerEntry
+from .article_cache import ArticleCacheEntry
+from .generation_usage import GenerationUsage
+from .idempotency_key import IdempotencyKey
+from .scheduled_publish import ScheduledPublish
+from .site_meta import WordPressSiteMeta
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class ArticleCacheEntry(Base):
+    """
+    Generated article (title + HTML) keyed by sha256(user + site + model +
+    build_prompt()). Lets a retried publish reuse the article instead of
+    paying for it again; never shared between users or sites.
+    Rows expire at `expires_at`; beyond ARTICLE_CACHE_MAX_ENTRIES the least
+    recently used rows are evicted.
+    """
+    __tablename__ = "article_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 hex
+    model = Column(String(100), nullable=False)
+    keyword = Column(String(255), nullable=False)
+    style = Column(String(100), nullable=True)
+
+    title = Column(String(500), nullable=False)
+    content = Column(Text, nullable=False)
+
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_used_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ArticleCacheEntry key={self.key[:12]} keyword={self.keyword}>"
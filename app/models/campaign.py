@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class Campaign(Base):
+    """
+    A bulk publish request: keywords × sites. Each item is a PublishJob with
+    campaign_id set; progress and results are read from those jobs.
+    """
+    __tablename__ = "campaigns"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    style = Column(String(100), nullable=True)
+    with_image = Column(Boolean, default=True)
+    total_items = Column(Integer, nullable=False)
+    credits_reserved = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<Campaign id={self.id} user_id={self.user_id} items={self.total_items}>"
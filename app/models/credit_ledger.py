@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class CreditLedgerEntry(Base):
+    """
+    Append-only audit trail of every credit movement.
+    kind: grant (+n) / reserve (-n) / commit (0, reservation consumed) / refund (+n)
+    users.credits stays the spendable balance; this table explains it.
+    """
+    __tablename__ = "credit_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    kind = Column(String(20), nullable=False)
+    delta = Column(Integer, nullable=False)
+    balance_after = Column(Integer, nullable=True)
+
+    job_id = Column(String(32), nullable=True, index=True)
+    campaign_id = Column(String(32), nullable=True)
+    note = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<CreditLedgerEntry id={self.id} user_id={self.user_id} kind={self.kind} delta={self.delta}>"
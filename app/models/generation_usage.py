@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Float, Index
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class GenerationUsage(Base):
+    """
+    One OpenAI generation (article / image / streamed article): model, tokens,
+    latency, retries and estimated cost. Linked to the published post when
+    there is one; failed generations are kept too (their tokens were paid).
+    kind: article / image / stream — cached=True means the article cache
+    answered and no tokens were spent.
+    """
+    __tablename__ = "generation_usage"
+    __table_args__ = (
+        # Per-user reports: WHERE user_id = ? AND created_at >= ? GROUP BY day / site / ...
+        Index("ix_generation_usage_user_created", "user_id", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    site_id = Column(Integer, ForeignKey("wp_sites.id"), nullable=True)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=True, index=True)
+    job_id = Column(String(32), nullable=True, index=True)
+
+    kind = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    keyword = Column(String(255), nullable=True)
+    style = Column(String(100), nullable=True)
+
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    latency_ms = Column(Float, default=0)
+    retries = Column(Integer, default=0)
+    success = Column(Boolean, default=True)
+    cached = Column(Boolean, default=False)
+    cost_usd = Column(Float, default=0)  # estimated at the prices configured when it ran
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<GenerationUsage id={self.id} kind={self.kind} model={self.model} tokens={self.prompt_tokens}+{self.completion_tokens}>"
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Client-supplied Idempotency-Key of an auto-publish request. The first
+    request stores the key with a hash of its body and the job it started;
+    retries with the same key attach to that job, or get the stored result
+    once it succeeded, instead of generating + publishing again.
+    status: in_progress → succeeded / failed (a failed key may be reused)
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # One row per (user, key); concurrent duplicates collide on this index
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the canonical request body
+
+    status = Column(String(20), nullable=False, default="in_progress")
+    job_id = Column(String(32), nullable=False, index=True)  # no FK: the key row is written before the job row
+    response = Column(Text, nullable=True)  # JSON body replayed to completed duplicates
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey user={self.user_id} key={self.key} status={self.status} job={self.job_id}>"
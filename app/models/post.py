@@ -1,14 +1,40 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from datetime import timezone
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 from app.core.db import Base
 
 
+class _SQLiteCreatedAt(TypeDecorator):
+    """
+    On SQLite, bind datetimes in the same "YYYY-MM-DD HH:MM:SS" text form
+    that CURRENT_TIMESTAMP writes (the default format appends microseconds),
+    with aware values converted to naive UTC first, so keyset comparisons
+    on created_at (cursors, date filters) match stored values exactly.
+    """
+    impl = sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d")
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+
+CreatedAtType = DateTime(timezone=True).with_variant(_SQLiteCreatedAt(), "sqlite")
+
+
 class GeneratedPost(Base):
     """
     Represents an article auto-generated and published via RankPost.
     Stored after successful publishing to WordPress.
     """
     __tablename__ = "posts"  # ✅ Database table name remains 'posts'
+    __table_args__ = (
+        # Keyset pagination of a user's history: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_posts_user_created_id", "user_id", "created_at", "id"),
+    )
 
     # ============ Basic Identifiers ============
     id = Column(Integer, primary_key=True, index=True)
@@ -28,7 +54,7 @@ class GeneratedPost(Base):
     has_image = Column(Boolean, default=False)         # Whether AI-generated image was added
 
     # ============ Timestamps ============
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(CreatedAtType, server_default=func.now())
 
     def __repr__(self):
         return f"<GeneratedPost id={self.id} title={self.title} site={self.site_name}>"
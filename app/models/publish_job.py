@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy.sql import func, true
+from app.core.db import Base
+
+
+class PublishJob(Base):
+    """
+    One auto-publish request, executed in the background by the job workers.
+    Lifecycle: queued → running → succeeded / failed
+    """
+    __tablename__ = "publish_jobs"
+
+    # ============ Identifiers ============
+    id = Column(String(32), primary_key=True)  # uuid4 hex, returned to the client
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    site_id = Column(Integer, ForeignKey("wp_sites.id"), nullable=False)
+    campaign_id = Column(String(32), ForeignKey("campaigns.id"), nullable=True, index=True)
+    schedule_id = Column(String(32), nullable=True)  # scheduled_publishes.id when fired by the scheduler
+
+    # ============ Request ============
+    keyword = Column(String(255), nullable=False)
+    style = Column(String(100), nullable=True)
+    with_image = Column(Boolean, default=True)
+    use_cache = Column(Boolean, default=True, server_default=true())  # reuse / store the generated article (article_cache)
+    terms = Column(Text, nullable=True)         # JSON: {"categories": [...], "tags": [...], "author": "..."} (names)
+
+    # ============ Progress ============
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    stage = Column(String(30), nullable=True)          # current / last stage name
+    stage_timings = Column(Text, nullable=True)        # JSON: {"article": ms, "image": ms, ...}
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    credit_reserved = Column(Boolean, default=False)   # credit already taken at submit (refunded on failure)
+
+    # ============ Result ============
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=True)
+
+    # ============ Timestamps ============
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<PublishJob id={self.id} status={self.status} stage={self.stage}>"
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class RefreshToken(Base):
+    """
+    One row per login session. A user can hold many sessions at once
+    (web + mobile etc.), each rotated independently on /auth/refresh.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Public lookup part of the token → unique index, one query per refresh
+    selector = Column(String(32), unique=True, index=True, nullable=False)
+    # HMAC-SHA256 hex digest of the secret verifier part
+    verifier_hash = Column(String(64), nullable=False)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    last_used_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RefreshToken id={self.id} user_id={self.user_id} selector={self.selector}>"
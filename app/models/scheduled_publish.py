@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Index
+from sqlalchemy.sql import func
+from app.core.db import Base
+
+
+class ScheduledPublish(Base):
+    """
+    One post scheduled for a WordPressSite at `due_at` (drip-feed publishing).
+    Lifecycle:
+      scheduled → generating → ready     (article + image pre-generated ahead of the slot)
+      scheduled / ready → queued         (due: handed to the publish queue as job `job_id`)
+      queued → published / failed        (mirrors the PublishJob)
+      scheduled / generating / ready → cancelled
+    The credit is reserved when the item is scheduled (ledger job_id = job_id).
+    """
+    __tablename__ = "scheduled_publishes"
+    __table_args__ = (
+        # The poller's queue: WHERE status IN (...) AND due_at <= ? ORDER BY due_at
+        Index("ix_scheduled_publishes_status_due", "status", "due_at"),
+        Index("ix_scheduled_publishes_user_due", "user_id", "due_at"),
+    )
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    site_id = Column(Integer, ForeignKey("wp_sites.id"), nullable=False, index=True)
+    job_id = Column(String(32), nullable=False, unique=True)  # assigned up front, the PublishJob id once fired
+
+    # ============ Request ============
+    keyword = Column(String(255), nullable=False)
+    style = Column(String(100), nullable=True)
+    with_image = Column(Boolean, default=True)
+    use_cache = Column(Boolean, default=True)
+    due_at = Column(DateTime(timezone=True), nullable=False)  # UTC
+
+    # ============ State ============
+    status = Column(String(20), nullable=False, default="scheduled")
+    claim_token = Column(String(32), nullable=True)  # set by the poller that claimed the row
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0)            # pre-generation attempts
+    error = Column(Text, nullable=True)
+
+    # ============ Pre-generated content (cleared once published) ============
+    title = Column(String(500), nullable=True)
+    content = Column(Text, nullable=True)
+    image_b64 = Column(Text, nullable=True)
+    generated_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<ScheduledPublish id={self.id} site={self.site_id} due={self.due_at} status={self.status}>"
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, UniqueConstraint
+from app.core.db import Base
+
+
+class WordPressSiteMeta(Base):
+    """
+    Cached WordPress metadata of a site, one row per resource:
+    root (REST discovery), categories, tags, users, auth (app password
+    validity + capabilities). `data` is the JSON we keep; etag /
+    last_modified make the background refresh a conditional GET.
+    Rows are stale after `expires_at` and refreshed in the background.
+    """
+    __tablename__ = "wp_site_meta"
+    __table_args__ = (
+        UniqueConstraint("site_id", "resource", name="uq_wp_site_meta_site_resource"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    site_id = Column(Integer, ForeignKey("wp_sites.id"), nullable=False, index=True)
+    resource = Column(String(20), nullable=False)
+
+    data = Column(Text, nullable=True)              # JSON; kept from the last good fetch when a refresh fails
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    status_code = Column(Integer, nullable=True)    # HTTP status of the last fetch
+    error = Column(Text, nullable=True)             # last refresh error (network, 5xx, ...)
+
+    fetched_at = Column(DateTime(timezone=True), nullable=True)   # last 200 / 304
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<WordPressSiteMeta site={self.site_id} resource={self.resource} expires={self.expires_at}>"
@@ -9,7 +9,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
-    refresh_token_hash = Column(String(255), nullable=True)  # 👈 yeh add karo
+    refresh_token_hash = Column(String(255), nullable=True)  # legacy single-session hash, sessions now live in refresh_tokens
 
     # ⭐ NEW FIELD HERE: Credits system
     credits = Column(Integer, default=0)  # Add credits for usage based system
@@ -1,86 +1,122 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import get_async_db
 from app.models.user import User
 from app.schemas.auth import SignupIn, LoginIn, TokenOut, RefreshIn
-from app.core.security import hash_password, verify_password, create_access_token, generate_refresh_token, verify_refresh_token, verify_access_token
+from app.core.security import hash_password_async, verify_password_async, create_access_token
+from app.core.principal import UserSnapshot, cache_user, cached_token_claims, get_cached_user
+from app.services.credits import grant_credits
+from app.services.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_all_refresh_tokens
 
 router = APIRouter(tags=["Auth"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+# Note: the refresh-token / credit helpers are plain sync-Session functions
+# (the publish workers use them too); routers call them via db.run_sync().
+
 # -------------------------
 # Get current user
 # -------------------------
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
-    email = verify_access_token(token)
-    if not email:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> UserSnapshot:
+    """
+    Cached principal: token claims and a small user snapshot are reused for
+    PRINCIPAL_CACHE_TTL seconds, so most requests never touch the users table.
+    """
+    claims = cached_token_claims(token)
+    if not claims or not claims.get("sub"):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    user = db.query(User).filter(User.email == email).first()
+
+    user_id = claims.get("uid")
+    if user_id is not None:
+        snapshot = get_cached_user(user_id)
+        if snapshot:
+            return snapshot
+        user = await db.get(User, user_id)
+    else:
+        # Tokens issued before "uid" existed
+        user = await db.scalar(select(User).where(User.email == claims["sub"]))
+
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    return cache_user(user)
+
+
+async def get_admin_user(user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
+    """Operator-only endpoints: the logged-in user's email must be in ADMIN_EMAILS"""
+    if user.email.lower() not in settings.admin_emails_set:
+        raise HTTPException(status_code=403, detail="Admin only")
     return user
 
 # -------------------------
 # Signup
 # -------------------------
 @router.post("/signup", response_model=TokenOut, status_code=status.HTTP_201_CREATED)
-def signup(payload: SignupIn, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == payload.email).first():
+async def signup(payload: SignupIn, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(User.id).where(User.email == payload.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = User(
         email=payload.email,
-        hashed_password=hash_password(payload.password)
+        hashed_password=await hash_password_async(payload.password)
     )
 
-    # ⭐ Give free trial credits
-    user.credits = 5  # feel free to change to 10, etc.
-
-    refresh_token = generate_refresh_token()
-    user.refresh_token_hash = hash_password(refresh_token)
-
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.flush()
 
-    access_token = create_access_token(user.email)
+    # ⭐ Give free trial credits
+    await db.run_sync(lambda s: grant_credits(s, user, 5, note="signup trial"))  # feel free to change to 10, etc.
+    refresh_token = await db.run_sync(issue_refresh_token, user)
+    await db.commit()
+
+    access_token = create_access_token(user.email, user_id=user.id)
     return TokenOut(access_token=access_token, refresh_token=refresh_token)
 
 # -------------------------
 # Login
 # -------------------------
 @router.post("/login", response_model=TokenOut)
-def login(payload: LoginIn, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: LoginIn, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.email == payload.email))
+    if not user or not await verify_password_async(payload.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid email or password")
 
-    access_token = create_access_token(user.email)
-    refresh_token = generate_refresh_token()
-    user.refresh_token_hash = hash_password(refresh_token)
-
-    db.add(user)
-    db.commit()
+    access_token = create_access_token(user.email, user_id=user.id)
+    refresh_token = await db.run_sync(issue_refresh_token, user)
+    await db.commit()
     return TokenOut(access_token=access_token, refresh_token=refresh_token)
 
 # -------------------------
 # Refresh Token
 # -------------------------
 @router.post("/refresh", response_model=TokenOut)
-def refresh_token(payload: RefreshIn, db: Session = Depends(get_db)):
+async def refresh_token(payload: RefreshIn, db: AsyncSession = Depends(get_async_db)):
     if not payload.refresh_token:
         raise HTTPException(status_code=400, detail="Missing refresh token")
 
-    users = db.query(User).all()
-    for user in users:
-        if user.refresh_token_hash and verify_refresh_token(payload.refresh_token, user.refresh_token_hash):
-            access_token = create_access_token(user.email)
-            new_refresh = generate_refresh_token()
-            user.refresh_token_hash = hash_password(new_refresh)
+    rotated = await db.run_sync(rotate_refresh_token, payload.refresh_token)
+    if not rotated:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    user, new_refresh = rotated
+    access_token = create_access_token(user.email, user_id=user.id)
+    return TokenOut(access_token=access_token, refresh_token=new_refresh)
 
-            db.add(user)
-            db.commit()
-            return TokenOut(access_token=access_token, refresh_token=new_refresh)
+# -------------------------
+# Logout (revoke one session)
+# -------------------------
+@router.post("/logout")
+async def logout(payload: RefreshIn, db: AsyncSession = Depends(get_async_db)):
+    await db.run_sync(revoke_refresh_token, payload.refresh_token)
+    return {"message": "Logged out"}
 
-    raise HTTPException(status_code=401, detail="Invalid refresh token")
+# -------------------------
+# Logout from all devices
+# -------------------------
+@router.post("/logout-all")
+async def logout_all(user: UserSnapshot = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    revoked = await db.run_sync(revoke_all_refresh_tokens, user.id)
+    await db.commit()
+    return {"message": "Logged out from all sessions", "revoked": revoked}
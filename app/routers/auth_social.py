@@ -4,9 +4,10 @@ from sqlalchemy.orm import Session
 from app.core.db import get_db
 from app.core.security import (
     create_access_token,
-    generate_refresh_token,
     hash_password,
 )
+from app.services.refresh_tokens import issue_refresh_token
+from app.services.credits import grant_credits
 from app.models.user import User
 from app.core.config import settings
 import requests
@@ -81,18 +82,16 @@ def google_callback(
         user = User(
             email=email,
             hashed_password=hash_password("google-temp"),
-            credits=5
         )
         db.add(user)
+        db.flush()
+        grant_credits(db, user, 5, note="signup trial")
         db.commit()
         db.refresh(user)
 
     # ---- Generate JWT ----
-    jwt_access = create_access_token(email)
-    jwt_refresh = generate_refresh_token()
-    user.refresh_token_hash = hash_password(jwt_refresh)
-
-    db.add(user)
+    jwt_access = create_access_token(email, user_id=user.id)
+    jwt_refresh = issue_refresh_token(db, user)
     db.commit()
 
     # ---- Redirect back to frontend ----
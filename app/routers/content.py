@@ -1,14 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+import json
+import logging
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional
-from app.core.db import get_db
+from app.core.db import get_async_db, SessionLocal
 from app.routers.auth import get_current_user
+from app.core.principal import UserSnapshot
 from app.models.site import WordPressSite
 from app.models.post import GeneratedPost  # Updated model name
-from app.services.openai_client import generate_article, generate_image_b64
-from app.services.wordpress import upload_post
-from app.services.crypto import decrypt_text
+from app.models.publish_job import PublishJob
+from app.models.campaign import Campaign
+from app.core.config import settings
+from app.schemas.job import JobOut, JobSubmitted
+from app.schemas.campaign import CampaignCreate, CampaignOut
+from app.services.credits import commit_credits, refund_credits, reserve_credits
+from app.services.article_cache import article_cache_key, store_article
+from app.services.idempotency import IdempotencyKeyMismatch, add_key, find_key, request_fingerprint
+from app.services.json_stream import ArticleStreamParser
+from app.services.openai_client import stream_article
+from app.services.usage import record_generation_usage
+from app.services.job_queue import job_queue, new_job_id
+
+logger = logging.getLogger("rankpost")
 
 router = APIRouter(tags=["Content"])
 
@@ -21,87 +40,387 @@ class AutoPublishRequest(BaseModel):
     style: Optional[str] = "formal"
     site_id: int
     with_image: bool = True
+    use_cache: bool = True  # False → always generate a fresh article
+    categories: list[str] = []      # names / slugs / ids, resolved from the site metadata cache
+    tags: list[str] = []
+    author: Optional[str] = None    # WordPress user name / slug / id
+
+
+class GenerateStreamRequest(BaseModel):
+    keyword: str
+    style: Optional[str] = "formal"
+
+
+async def _jobs_out(db: AsyncSession, jobs: list[PublishJob]) -> list[JobOut]:
+    # One query for all result posts instead of one per job
+    post_ids = [j.post_id for j in jobs if j.post_id]
+    posts = {}
+    if post_ids:
+        posts = {p.id: p for p in await db.scalars(select(GeneratedPost).where(GeneratedPost.id.in_(post_ids)))}
+
+    return [
+        JobOut(
+            id=job.id,
+            status=job.status,
+            stage=job.stage,
+            keyword=job.keyword,
+            style=job.style,
+            site_id=job.site_id,
+            campaign_id=job.campaign_id,
+            with_image=job.with_image,
+            stage_timings=json.loads(job.stage_timings) if job.stage_timings else {},
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            post=posts.get(job.post_id),
+        )
+        for job in jobs
+    ]
 
 
 # -------------------------
-# Auto Publish Article
+# Auto Publish Article (queued)
 # -------------------------
-@router.post("/auto-publish")
-def auto_publish_endpoint(
+async def _find_key(db: AsyncSession, user_id: int, key: str, request_hash: str):
+    """find_key, with a key reused for a different body → 422"""
+    try:
+        return await db.run_sync(find_key, user_id, key, request_hash)
+    except IdempotencyKeyMismatch:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+
+
+async def _replay(db: AsyncSession, row, response: Response):
+    """Answer a duplicate request from its Idempotency-Key row"""
+    if row.status == "succeeded" and row.response:
+        # Finished: stored result, no job/post queries
+        return JSONResponse(json.loads(row.response), headers={"Idempotent-Replayed": "true"})
+
+    # Still running: attach to the in-flight job
+    job_status = await db.scalar(select(PublishJob.status).where(PublishJob.id == row.job_id))
+    response.headers["Idempotent-Replayed"] = "true"
+    return JobSubmitted(
+        job_id=row.job_id,
+        status=job_status or row.status,
+        status_url=f"/api/v1/content/jobs/{row.job_id}",
+    )
+
+
+@router.post("/auto-publish", response_model=JobSubmitted, status_code=status.HTTP_202_ACCEPTED)
+async def auto_publish_endpoint(
     req: AutoPublishRequest,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
 ):
+    """
+    Queue an article for generation + publishing and return immediately.
+    One credit is reserved now; it is refunded if the job fails.
+    Poll GET /content/jobs/{job_id} for progress and the final post.
 
-    # ---------------- Credit Check ----------------
-    if user.credits is None or user.credits < 1:
-        raise HTTPException(status_code=400, detail="NOT_ENOUGH_CREDITS")
+    Send an `Idempotency-Key` header to make retries safe: a repeat with the
+    same key attaches to the first request's job (202), or returns its
+    stored result with the post (200) once it succeeded — no second article,
+    WordPress post or credit. Reusing a key with a different body → 422.
+    """
+
+    # ---------------- Idempotency-Key: replay duplicates ----------------
+    request_hash = request_fingerprint(req.model_dump()) if idempotency_key else None
+    if idempotency_key:
+        existing = await _find_key(db, user.id, idempotency_key, request_hash)
+        if existing:
+            return await _replay(db, existing, response)
 
     # ---------------- Validate site ----------------
-    site = (
-        db.query(WordPressSite)
-        .filter(WordPressSite.id == req.site_id, WordPressSite.user_id == user.id)
-        .first()
+    site = await db.scalar(
+        select(WordPressSite)
+        .where(WordPressSite.id == req.site_id, WordPressSite.user_id == user.id)
     )
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
 
-    # ---------------- Generate Article ----------------
-    article = generate_article(req.keyword, req.style)
-    if not article or not article.get("title") or not article.get("content"):
-        raise HTTPException(status_code=500, detail="Failed to generate article")
+    job_id = new_job_id()
+
+    # ---------------- Claim the key before spending anything ----------------
+    if idempotency_key:
+        try:
+            await db.run_sync(add_key, user.id, idempotency_key, request_hash, job_id)
+        except IntegrityError:
+            # A concurrent duplicate won the race (we waited for its commit) → attach to it
+            await db.rollback()
+            existing = await _find_key(db, user.id, idempotency_key, request_hash)
+            if existing:
+                return await _replay(db, existing, response)
+            raise HTTPException(status_code=409, detail="Idempotency-Key is being used by another request, retry")
+
+    # ---------------- Reserve 1 Credit (atomic) ----------------
+    if not await db.run_sync(reserve_credits, user.id, 1, job_id):
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="NOT_ENOUGH_CREDITS")
+
+    # ---------------- Create + Queue Job ----------------
+    job = PublishJob(
+        id=job_id,
+        user_id=user.id,
+        site_id=site.id,
+        keyword=req.keyword,
+        style=req.style,
+        with_image=req.with_image,
+        use_cache=req.use_cache,
+        terms=json.dumps({"categories": req.categories, "tags": req.tags, "author": req.author})
+        if req.categories or req.tags or req.author else None,
+        status="queued",
+        credit_reserved=True,
+    )
+    db.add(job)
+    await db.commit()
+
+    job_queue.submit(job.id)
+
+    return JobSubmitted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/api/v1/content/jobs/{job.id}",
+    )
 
-    title = article["title"]
-    content_html = article["content"]
 
-    # ---------------- Generate Image (optional) ----------------
-    image_b64 = None
-    has_image = False
-    if req.with_image:
+# -------------------------
+# Streaming Article Generation (SSE)
+# -------------------------
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/generate/stream")
+async def generate_stream_endpoint(
+    req: GenerateStreamRequest,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Generate an article and stream it as Server-Sent Events while the model writes:
+      event: start    → {"keyword", "style"}          (sent immediately)
+      event: title    → {"delta": "..."}               (title text as it arrives)
+      event: content  → {"delta": "<p>..."}            (HTML pieces as they arrive)
+      event: done     → {"title", "content"}           (complete article)
+      event: error    → {"detail": "..."}
+    Costs 1 credit (refunded on error / disconnect). The article is put in the
+    article cache, so the user's next auto-publish of the same keyword + style
+    uses it (once, on one site).
+    Use fetch() + a stream reader on the client (EventSource cannot POST).
+    """
+    style = req.style or "formal"
+    job_id = new_job_id()  # only ties the ledger entries together
+    if not await db.run_sync(reserve_credits, user.id, 1, job_id):
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="NOT_ENOUGH_CREDITS")
+    await db.commit()
+
+    async def events():
+        parser = ArticleStreamParser()
+        usage: list[dict] = []
+        finished = False
         try:
-            image_b64 = generate_image_b64(req.keyword)
-            has_image = bool(image_b64)
-        except Exception as e:
-            print("Image generation failed:", e)
-
-    # ---------------- Publish to WordPress ----------------
-    wp_pass = decrypt_text(site.wp_app_pass_enc)
-    url = upload_post(
-        wp_url=site.wp_url.rstrip("/"),
-        user=site.wp_user,
-        app_pass=wp_pass,
-        title=title,
-        content_html=content_html,
-        image_b64=image_b64,
+            yield _sse("start", {"keyword": req.keyword, "style": style})
+            try:
+                async for field, text in stream_article(req.keyword, style, parser, usage=usage):
+                    yield _sse(field, {"delta": text})
+            except Exception as e:
+                logger.exception("OpenAI stream failed")
+                yield _sse("error", {"detail": "Failed to generate article"})
+                return
+
+            article = parser.article()  # None when the answer was cut off (no closing brace)
+            if article is None:
+                yield _sse("error", {"detail": "Failed to generate article"})
+                return
+
+            finished = True
+            await run_in_threadpool(_settle_stream, user.id, job_id, req.keyword, style, usage, article)
+            yield _sse("done", article)
+        finally:
+            if not finished:
+                # May run while the response task is being cancelled (client
+                # disconnected) → hand the refund to a thread, do not await it
+                asyncio.get_running_loop().run_in_executor(None, _settle_stream, user.id, job_id, req.keyword, style, usage)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    if not url:
-        raise HTTPException(status_code=500, detail="Failed to publish post")
 
-    # ---------------- Deduct 1 Credit ----------------
-    user.credits -= 1
-    db.commit()
+def _settle_stream(user_id: int, job_id: str, keyword: str, style: str, usage: list[dict], article: dict | None = None):
+    """Record token usage, then commit the reserved credit (and cache the article) or refund it"""
+    db = SessionLocal()
+    try:
+        record_generation_usage(db, usage, user_id, job_id=job_id, keyword=keyword, style=style)
+        if article:
+            commit_credits(db, user_id, 1, job_id=job_id)
+        else:
+            refund_credits(db, user_id, 1, job_id=job_id, note="Streaming generation failed")
+        db.commit()
+
+        if article:
+            store_article(db, article_cache_key(keyword, style, user_id), keyword, style, article)
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Stream settle failed")
+    finally:
+        db.close()
+
+
+# -------------------------
+# Job Status
+# -------------------------
+@router.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    job = await db.scalar(select(PublishJob).where(PublishJob.id == job_id, PublishJob.user_id == user.id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return (await _jobs_out(db, [job]))[0]
+
+
+# -------------------------
+# Recent Jobs
+# -------------------------
+@router.get("/jobs", response_model=list[JobOut])
+async def list_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
+):
+    jobs = (
+        await db.scalars(
+            select(PublishJob)
+            .where(PublishJob.user_id == user.id)
+            .order_by(PublishJob.created_at.desc())
+            .limit(limit)
+        )
+    ).all()
+    return await _jobs_out(db, jobs)
+
+
+# -------------------------
+# Bulk Campaign: keywords × sites
+# -------------------------
+@router.post("/campaigns", response_model=CampaignOut, status_code=status.HTTP_202_ACCEPTED)
+async def create_campaign(
+    req: CampaignCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Queue one publish job per keyword × site. All credits are reserved up
+    front in a single atomic UPDATE; failed items are refunded by the worker.
+    """
+    keywords = list(dict.fromkeys(k.strip() for k in req.keywords if k.strip()))
+    site_ids = list(dict.fromkeys(req.site_ids))
+    if not keywords:
+        raise HTTPException(status_code=400, detail="No keywords given")
+
+    total = len(keywords) * len(site_ids)
+    if total > settings.MAX_CAMPAIGN_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Campaign too large (max {settings.MAX_CAMPAIGN_ITEMS} items)")
+
+    # ---------------- Validate sites ----------------
+    owned = set(
+        await db.scalars(
+            select(WordPressSite.id)
+            .where(WordPressSite.user_id == user.id, WordPressSite.id.in_(site_ids))
+        )
+    )
+    missing = [sid for sid in site_ids if sid not in owned]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Site not found: {missing}")
+
+    # ---------------- Reserve credits ----------------
+    campaign_id = new_job_id()
+    if not await db.run_sync(lambda s: reserve_credits(s, user.id, total, campaign_id=campaign_id)):
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="NOT_ENOUGH_CREDITS")
 
-    # ---------------- Save Post in Database ----------------
-    new_post = GeneratedPost(
+    # ---------------- Create campaign + jobs ----------------
+    campaign = Campaign(
+        id=campaign_id,
         user_id=user.id,
-        site_id=site.id,
-        site_name=site.site_name,
-        title=title,
-        keyword=req.keyword,
         style=req.style,
-        wp_post_url=url,
-        has_image=has_image,
+        with_image=req.with_image,
+        total_items=total,
+        credits_reserved=total,
     )
-    db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
-
-    # ---------------- Return Response ----------------
-    return {
-        "url": url,
-        "title": title,
-        "site": site.site_name,
-        "has_image": has_image,
-        "remaining_credits": user.credits,  # Useful for frontend update
-    }
+    db.add(campaign)
+
+    # Sites inner loop → consecutive jobs hit different sites, so the
+    # per-site upload limit does not serialize the whole campaign
+    jobs = [
+        PublishJob(
+            id=new_job_id(),
+            user_id=user.id,
+            site_id=sid,
+            campaign_id=campaign.id,
+            keyword=keyword,
+            style=req.style,
+            with_image=req.with_image,
+            use_cache=req.use_cache,
+            status="queued",
+            credit_reserved=True,
+        )
+        for keyword in keywords
+        for sid in site_ids
+    ]
+    db.add_all(jobs)
+    await db.commit()
+
+    job_ids = [job.id for job in jobs]
+    for job_id in job_ids:
+        job_queue.submit(job_id)
+
+    # Reload campaign + items so server defaults (created_at) are populated
+    await db.refresh(campaign)
+    return await _campaign_out(db, campaign, await _campaign_jobs(db, campaign.id))
+
+
+async def _campaign_jobs(db: AsyncSession, campaign_id: str) -> list[PublishJob]:
+    return (
+        await db.scalars(
+            select(PublishJob)
+            .where(PublishJob.campaign_id == campaign_id)
+            .order_by(PublishJob.created_at, PublishJob.id)
+            .execution_options(populate_existing=True)
+        )
+    ).all()
+
+
+async def _campaign_out(db: AsyncSession, campaign: Campaign, jobs: list[PublishJob]) -> CampaignOut:
+    counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+    for j in jobs:
+        counts[j.status] = counts.get(j.status, 0) + 1
+
+    return CampaignOut(
+        id=campaign.id,
+        status="running" if counts["queued"] or counts["running"] else "completed",
+        total_items=campaign.total_items,
+        credits_reserved=campaign.credits_reserved,
+        counts=counts,
+        created_at=campaign.created_at,
+        items=await _jobs_out(db, jobs),
+    )
+
+
+# -------------------------
+# Campaign Progress / Results
+# -------------------------
+@router.get("/campaigns/{campaign_id}", response_model=CampaignOut)
+async def get_campaign(campaign_id: str, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    campaign = await db.scalar(
+        select(Campaign)
+        .where(Campaign.id == campaign_id, Campaign.user_id == user.id)
+    )
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    return await _campaign_out(db, campaign, await _campaign_jobs(db, campaign.id))
@@ -1,40 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.db import get_db
+from app.core.db import get_async_db
 from app.models.post import GeneratedPost
-from app.models.user import User
+from app.core.principal import UserSnapshot
 from app.routers.auth import get_current_user
+from app.schemas.post import PostOut, PostPage
 
 router = APIRouter(tags=["Posts"])
 
+# Only the columns PostOut needs — no full ORM objects
+POST_COLUMNS = (
+    GeneratedPost.id,
+    GeneratedPost.site_id,
+    GeneratedPost.title,
+    GeneratedPost.keyword,
+    GeneratedPost.style,
+    GeneratedPost.wp_post_url,
+    GeneratedPost.site_name,
+    GeneratedPost.has_image,
+    GeneratedPost.created_at,
+)
+
+
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{post_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, post_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 # ==========================
-# 📌 Get All Posts for Logged-In User
+# 📌 Post History for Logged-In User (keyset paginated)
 # ==========================
-@router.get("/", response_model=list[dict])
-def list_posts(
-    db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+@router.get("/", response_model=PostPage)
+async def list_posts(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    site_id: Optional[int] = None,
+    style: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user)
 ):
-    posts = (
-        db.query(GeneratedPost)
-        .filter(GeneratedPost.user_id == user.id)
-        .order_by(GeneratedPost.created_at.desc())
-        .all()
-    )
+    """
+    Newest first. Uses the (user_id, created_at, id) index, so every page
+    costs the same no matter how deep the client scrolls.
+    """
+    q = select(*POST_COLUMNS).where(GeneratedPost.user_id == user.id)
+
+    if site_id is not None:
+        q = q.where(GeneratedPost.site_id == site_id)
+    if style:
+        q = q.where(GeneratedPost.style == style)
+    if date_from:
+        q = q.where(GeneratedPost.created_at >= date_from)
+    if date_to:
+        q = q.where(GeneratedPost.created_at < date_to)
+
+    if cursor:
+        c_created, c_id = decode_cursor(cursor)
+        q = q.where(
+            or_(
+                GeneratedPost.created_at < c_created,
+                and_(GeneratedPost.created_at == c_created, GeneratedPost.id < c_id),
+            )
+        )
 
-    return [
-        {
-            "id": p.id,
-            "title": p.title,
-            "keyword": p.keyword,
-            "style": p.style,
-            "wp_post_url": p.wp_post_url,
-            "site_name": p.site_name,
-            "has_image": p.has_image,
-            "created_at": p.created_at,
-        }
-        for p in posts
-    ]
+    rows = (
+        await db.execute(
+            q.order_by(GeneratedPost.created_at.desc(), GeneratedPost.id.desc())
+            .limit(limit + 1)
+        )
+    ).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+
+    return PostPage(
+        items=[PostOut(**row._mapping) for row in rows],
+        next_cursor=next_cursor,
+    )
 
 # ==========================
 # 📌 Save Post After Publishing
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.db import get_async_db
+from app.core.principal import UserSnapshot
+from app.models.scheduled_publish import ScheduledPublish
+from app.models.site import WordPressSite
+from app.routers.auth import get_current_user
+from app.schemas.schedule import ScheduleCreate, ScheduledOut
+from app.services.scheduler import cancel_scheduled, schedule_posts
+
+router = APIRouter(tags=["Schedule"])
+
+
+# ==========================
+# 📅 Schedule posts (drip feed): one keyword per slot
+# ==========================
+@router.post("/", response_model=list[ScheduledOut], status_code=status.HTTP_201_CREATED)
+async def create_schedule(
+    req: ScheduleCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
+):
+    """
+    Schedule one post per keyword on a site, `interval_minutes` apart from
+    `start_at`. Credits are reserved now (refunded if an item is cancelled
+    or fails). Articles are generated ahead of each slot, so at due time
+    only the WordPress upload is left.
+    """
+    keywords = [k.strip() for k in req.keywords if k.strip()]
+    if not keywords:
+        raise HTTPException(status_code=400, detail="No keywords given")
+    if len(keywords) > settings.SCHEDULE_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Schedule too large (max {settings.SCHEDULE_MAX_ITEMS} items)")
+
+    site = await db.scalar(
+        select(WordPressSite.id).where(WordPressSite.id == req.site_id, WordPressSite.user_id == user.id)
+    )
+    if not site:
+        raise HTTPException(status_code=404, detail="Site not found")
+
+    items = await db.run_sync(
+        schedule_posts, user.id, req.site_id, keywords, req.start_at, timedelta(minutes=req.interval_minutes),
+        req.style, req.with_image, req.use_cache,
+    )
+    if items is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="NOT_ENOUGH_CREDITS")
+    await db.commit()
+
+    ids = [item.id for item in items]
+    return (
+        await db.scalars(select(ScheduledPublish).where(ScheduledPublish.id.in_(ids)).order_by(ScheduledPublish.due_at))
+    ).all()
+
+
+# ==========================
+# 📅 Upcoming / past scheduled posts
+# ==========================
+@router.get("/", response_model=list[ScheduledOut])
+async def list_schedule(
+    limit: int = Query(50, ge=1, le=200),
+    site_id: Optional[int] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    db: AsyncSession = Depends(get_async_db),
+    user: UserSnapshot = Depends(get_current_user),
+):
+    """Ordered by due time (uses the (user_id, due_at) index)."""
+    q = select(ScheduledPublish).where(ScheduledPublish.user_id == user.id)
+    if site_id is not None:
+        q = q.where(ScheduledPublish.site_id == site_id)
+    if status_filter:
+        q = q.where(ScheduledPublish.status == status_filter)
+    return (await db.scalars(q.order_by(ScheduledPublish.due_at).limit(limit))).all()
+
+
+@router.get("/{schedule_id}", response_model=ScheduledOut)
+async def get_scheduled(schedule_id: str, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    item = await db.scalar(
+        select(ScheduledPublish).where(ScheduledPublish.id == schedule_id, ScheduledPublish.user_id == user.id)
+    )
+    if not item:
+        raise HTTPException(status_code=404, detail="Scheduled post not found")
+    return item
+
+
+# ==========================
+# 📅 Cancel (refunds the credit)
+# ==========================
+@router.delete("/{schedule_id}")
+async def cancel_schedule(schedule_id: str, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    if not await db.run_sync(cancel_scheduled, user.id, schedule_id):
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Scheduled post not found or already being published")
+    await db.commit()
+    return {"message": "Scheduled post cancelled"}
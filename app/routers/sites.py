@@ -1,78 +1,39 @@
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
 from app.models.site import WordPressSite
-from app.models.user import User
-from app.schemas.site import SiteCreate, SiteOut
+from app.models.site_meta import WordPressSiteMeta
+from app.core.principal import UserSnapshot
+from app.schemas.site import SiteCreate, SiteMetaOut, SiteMetaResource, SiteOut, SiteValidationOut
 from app.routers.auth import get_current_user
-from app.services.crypto import encrypt_text
-import requests
+from app.services.crypto import encrypt_text, get_site_password, invalidate_site_password
+from app.services.wp_meta import data_of, refresh_site_by_id, site_meta, site_meta_refresher, store_auth_result
+from app.services.wp_validation import validate_site, validate_sites
 
 router = APIRouter()
 
 
-# ---------------------------------------------------
-# Utility: Validate WordPress Credentials
-# ---------------------------------------------------
-def check_wp_connection(url: str, user: str, app_password: str) -> bool:
-    """
-    Check if WordPress credentials are valid.
-    """
-    try:
-        wp_url = str(url).rstrip("/") + "/wp-json/wp/v2/posts"
-
-        res = requests.get(wp_url, auth=(user, app_password), timeout=10)
-
-        # Unauthorized → invalid credentials
-        if res.status_code == 401:
-            return False
-
-        # Any non-success except empty posts
-        if res.status_code not in [200, 201]:
-            return False
-
-        # Should be valid JSON
-        try:
-            data = res.json()
-        except:
-            return False
-
-        # Normal WordPress response (list of posts)
-        if isinstance(data, list):
-            if len(data) == 0:
-                return True
-            if isinstance(data[0], dict) and ("id" in data[0] or "title" in data[0]):
-                return True
-
-        # Single dictionary post
-        if isinstance(data, dict) and ("id" in data or "title" in data):
-            return True
-
-        return False
-
-    except Exception as e:
-        print("WP check failed:", str(e))
-        return False
-
-
 # ---------------------------------------------------
 # GET: List all sites for logged-in user
 # ---------------------------------------------------
 @router.get("/", response_model=list[SiteOut])
-def list_sites(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return db.query(WordPressSite).filter(WordPressSite.user_id == user.id).all()
+async def list_sites(db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    return (await db.scalars(select(WordPressSite).where(WordPressSite.user_id == user.id))).all()
 
 
 # ---------------------------------------------------
 # GET: Single site detail (REQUIRED by frontend)
 # ---------------------------------------------------
 @router.get("/{site_id}", response_model=SiteOut)
-def get_site(site_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def get_site(site_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
 
-    site = db.query(WordPressSite).filter(
+    site = await db.scalar(select(WordPressSite).where(
         WordPressSite.id == site_id,
         WordPressSite.user_id == user.id
-    ).first()
+    ))
 
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
@@ -84,22 +45,22 @@ def get_site(site_id: int, db: Session = Depends(get_db), user: User = Depends(g
 # POST: Add new site
 # ---------------------------------------------------
 @router.post("/add", response_model=SiteOut)
-def add_site(payload: SiteCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def add_site(payload: SiteCreate, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
 
     # Check duplicate
-    exists = db.query(WordPressSite).filter(
+    exists = await db.scalar(select(WordPressSite.id).where(
         WordPressSite.user_id == user.id,
         WordPressSite.wp_url == str(payload.wp_url)
-    ).first()
+    ))
 
     if exists:
         raise HTTPException(status_code=400, detail="Site already added")
 
-    # Validate WP login
-    is_valid = check_wp_connection(payload.wp_url, payload.wp_user, payload.wp_app_pass_enc)
+    # Validate WP login (blocking HTTP → threadpool, keeps the event loop free)
+    check = await run_in_threadpool(validate_site, payload.wp_url, payload.wp_user, payload.wp_app_pass_enc)
 
-    if not is_valid:
-        raise HTTPException(status_code=400, detail="Invalid WordPress credentials or site unreachable.")
+    if not check.ok:
+        raise HTTPException(status_code=400, detail=f"{check.message} ({check.cause})")
 
     # Save encrypted password
     site = WordPressSite(
@@ -112,27 +73,110 @@ def add_site(payload: SiteCreate, db: Session = Depends(get_db), user: User = De
     )
 
     db.add(site)
-    db.commit()
-    db.refresh(site)
+    await db.flush()
+    await db.run_sync(store_auth_result, site.id, check)
+    await db.commit()
+    await db.refresh(site)
+
+    # Warm the metadata cache (categories, tags, users, auth) in the background
+    site_meta_refresher.submit(site.id)
 
     return site
 
 
+# ---------------------------------------------------
+# POST: Check credentials without saving the site
+# ---------------------------------------------------
+@router.post("/validate", response_model=SiteValidationOut)
+async def validate_new_site(payload: SiteCreate, user: UserSnapshot = Depends(get_current_user)):
+    check = await run_in_threadpool(validate_site, payload.wp_url, payload.wp_user, payload.wp_app_pass_enc)
+    return SiteValidationOut(wp_url=str(payload.wp_url).rstrip("/"), **check.as_dict())
+
+
+# ---------------------------------------------------
+# POST: Re-check all of the user's sites in one call
+# ---------------------------------------------------
+@router.post("/revalidate", response_model=list[SiteValidationOut])
+async def revalidate_sites(db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    """
+    Checks run in parallel, so the call takes about as long as the slowest
+    site. Results also update the cached auth check used by publishing.
+    """
+    sites = (await db.scalars(select(WordPressSite).where(WordPressSite.user_id == user.id))).all()
+    creds = [(s.wp_url, s.wp_user, get_site_password(s)) for s in sites]
+    checks = await run_in_threadpool(validate_sites, creds)
+
+    def _store(sync_db):
+        for site, check in zip(sites, checks):
+            store_auth_result(sync_db, site.id, check)
+
+    out = [SiteValidationOut(site_id=s.id, wp_url=s.wp_url, **c.as_dict()) for s, c in zip(sites, checks)]
+    await db.run_sync(_store)
+    await db.commit()
+    return out
+
+
+# ---------------------------------------------------
+# GET: Cached WordPress metadata (no WP round-trip)
+# ---------------------------------------------------
+def _meta_out(site_id: int, rows: dict) -> SiteMetaOut:
+    now = datetime.now(timezone.utc)
+    resources = {}
+    for name, row in rows.items():
+        expires_at = row.expires_at.replace(tzinfo=timezone.utc) if row.expires_at.tzinfo is None else row.expires_at
+        resources[name] = SiteMetaResource(
+            data=data_of(row) if row.data is not None else None,
+            status_code=row.status_code,
+            error=row.error,
+            fetched_at=row.fetched_at,
+            expires_at=row.expires_at,
+            stale=expires_at <= now,
+        )
+    auth = rows.get("auth")
+    auth_valid = data_of(auth).get("valid") if auth is not None and auth.data is not None else None
+    return SiteMetaOut(site_id=site_id, auth_valid=auth_valid, resources=resources)
+
+
+async def _owned_site_id(db: AsyncSession, site_id: int, user_id: int) -> int:
+    owned = await db.scalar(select(WordPressSite.id).where(WordPressSite.id == site_id, WordPressSite.user_id == user_id))
+    if not owned:
+        raise HTTPException(status_code=404, detail="Site not found")
+    return owned
+
+
+@router.get("/{site_id}/meta", response_model=SiteMetaOut)
+async def get_site_meta(site_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    await _owned_site_id(db, site_id, user.id)
+    return _meta_out(site_id, await db.run_sync(site_meta, site_id))
+
+
+# ---------------------------------------------------
+# POST: Refresh metadata now (conditional GETs)
+# ---------------------------------------------------
+@router.post("/{site_id}/meta/refresh", response_model=SiteMetaOut)
+async def refresh_site_meta(site_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
+    await _owned_site_id(db, site_id, user.id)
+    await run_in_threadpool(refresh_site_by_id, site_id, True)
+    return _meta_out(site_id, await db.run_sync(site_meta, site_id))
+
+
 # ---------------------------------------------------
 # DELETE: Remove a site
 # ---------------------------------------------------
 @router.delete("/{site_id}")
-def delete_site(site_id: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+async def delete_site(site_id: int, db: AsyncSession = Depends(get_async_db), user: UserSnapshot = Depends(get_current_user)):
 
-    site = db.query(WordPressSite).filter(
+    site = await db.scalar(select(WordPressSite).where(
         WordPressSite.id == site_id,
         WordPressSite.user_id == user.id
-    ).first()
+    ))
 
     if not site:
         raise HTTPException(status_code=404, detail="Site not found")
 
-    db.delete(site)
-    db.commit()
+    await db.execute(delete(WordPressSiteMeta).where(WordPressSiteMeta.site_id == site.id))
+    await db.delete(site)
+    await db.commit()
+    invalidate_site_password(site_id)
 
     return {"message": "Site deleted successfully"}
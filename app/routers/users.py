@@ -1,16 +1,85 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.db import get_db
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.db import get_async_db
 from app.routers.auth import get_current_user
-from app.models.user import User
+from app.core.principal import UserSnapshot
+from app.models.credit_ledger import CreditLedgerEntry
+from app.services.credits import get_balance
+from app.services.usage import GROUP_COLUMNS, usage_report
+from app.schemas.usage import UsageReport, UsageRow
 
 router = APIRouter(tags=["Users"])
 
 @router.get("/me")
-def get_me(user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_me(user: UserSnapshot = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     return {
         "id": user.id,
         "email": user.email,
-        "credits": user.credits,
+        "credits": await db.run_sync(get_balance, user.id),
         "created_at": user.created_at,
     }
+
+# ==========================
+# 📌 Credit balance + recent ledger entries (audit)
+# ==========================
+@router.get("/me/credits")
+async def get_my_credits(
+    limit: int = Query(50, ge=1, le=200),
+    user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    entries = (
+        await db.scalars(
+            select(CreditLedgerEntry)
+            .where(CreditLedgerEntry.user_id == user.id)
+            .order_by(CreditLedgerEntry.id.desc())
+            .limit(limit)
+        )
+    ).all()
+    return {
+        "balance": await db.run_sync(get_balance, user.id),
+        "entries": [
+            {
+                "id": e.id,
+                "kind": e.kind,
+                "delta": e.delta,
+                "balance_after": e.balance_after,
+                "job_id": e.job_id,
+                "campaign_id": e.campaign_id,
+                "note": e.note,
+                "created_at": e.created_at,
+            }
+            for e in entries
+        ],
+    }
+
+# ==========================
+# 📊 OpenAI usage: tokens, latency, retries, cost
+# ==========================
+@router.get("/me/usage", response_model=UsageReport)
+async def get_my_usage(
+    group_by: str = Query("day,site", description=f"comma-separated: {', '.join(GROUP_COLUMNS)}"),
+    since: datetime | None = None,
+    until: datetime | None = None,
+    site_id: int | None = None,
+    user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Aggregated generation usage of the current user, most expensive group
+    first — e.g. ?group_by=style or ?group_by=keyword to find what costs most.
+    """
+    groups = list(dict.fromkeys(g.strip() for g in group_by.split(",") if g.strip()))
+    unknown = [g for g in groups if g not in GROUP_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown group_by: {unknown}")
+
+    rows = await db.run_sync(lambda s: usage_report(s, user.id, groups, since, until, site_id))
+    totals = await db.run_sync(lambda s: usage_report(s, user.id, [], since, until, site_id))
+    return UsageReport(
+        group_by=groups,
+        rows=[UsageRow(**r) for r in rows],
+        totals=UsageRow(**totals[0]) if totals and totals[0]["generations"] else UsageRow(generations=0),
+    )
@@ -1,5 +1,9 @@
 import requests
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from app.core.executor import cpu_executor
+from app.core.db import get_async_engine, pool_status
+from app.routers.auth import get_admin_user
+from app.services.openai_gateway import openai_gateway
 
 router = APIRouter(tags=["Utils"])
 
@@ -10,3 +14,25 @@ def ipinfo():
         return r.json()
     except Exception as e:
         return {"error": str(e)}
+
+
+# Operator endpoints (internal pool / queue / rate-limit state) → ADMIN_EMAILS only
+@router.get("/executor", dependencies=[Depends(get_admin_user)])
+def executor_stats():
+    """Queue depth + task latency of the CPU process pool"""
+    return cpu_executor.stats()
+
+
+@router.get("/db-pool", dependencies=[Depends(get_admin_user)])
+def db_pool_stats():
+    """Database connection pool usage (sync: workers/scripts, async: API routers)"""
+    return {
+        "sync": pool_status(),
+        "async": pool_status(get_async_engine().sync_engine),
+    }
+
+
+@router.get("/openai", dependencies=[Depends(get_admin_user)])
+def openai_stats():
+    """OpenAI gateway: calls, retries, 429s and time spent waiting for the rate limits"""
+    return openai_gateway.stats()
@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.schemas.job import JobOut
+
+class CampaignCreate(BaseModel):
+    keywords: list[str] = Field(..., min_length=1)
+    site_ids: list[int] = Field(..., min_length=1)
+    style: str | None = "formal"
+    with_image: bool = True
+    use_cache: bool = True  # False → always generate fresh articles
+
+class CampaignOut(BaseModel):
+    id: str
+    status: str                      # running / completed
+    total_items: int
+    credits_reserved: int
+    counts: dict[str, int] = {}      # {"queued": n, "running": n, "succeeded": n, "failed": n}
+    created_at: datetime | None = None
+    items: list[JobOut] = []
@@ -0,0 +1,25 @@
+from datetime import datetime
+from pydantic import BaseModel
+from app.schemas.post import PostOut
+
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    post: PostOut | None = None  # set when an Idempotency-Key replays a finished job
+
+class JobOut(BaseModel):
+    id: str
+    status: str
+    stage: str | None = None
+    keyword: str
+    style: str | None = None
+    site_id: int
+    campaign_id: str | None = None
+    with_image: bool | None = None
+    stage_timings: dict[str, float] = {}
+    error: str | None = None
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    post: PostOut | None = None
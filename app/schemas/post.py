@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+class PostOut(BaseModel):
+    id: int
+    site_id: int | None = None
+    title: str
+    keyword: str
+    style: str | None = None
+    wp_post_url: str
+    site_name: str | None = None
+    has_image: bool | None = None
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+class PostPage(BaseModel):
+    items: list[PostOut]
+    next_cursor: str | None = None  # pass back as ?cursor= for the next page
@@ -0,0 +1,27 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class ScheduleCreate(BaseModel):
+    site_id: int
+    keywords: list[str] = Field(..., min_length=1)  # one post per keyword, in this order
+    start_at: datetime                              # first slot (naive = UTC)
+    interval_minutes: int = Field(1440, ge=1)       # gap between slots, default one per day
+    style: str | None = "formal"
+    with_image: bool = True
+    use_cache: bool = True
+
+class ScheduledOut(BaseModel):
+    id: str
+    site_id: int
+    keyword: str
+    style: str | None = None
+    with_image: bool | None = None
+    due_at: datetime
+    status: str                            # scheduled / generating / ready / queued / published / failed / cancelled
+    job_id: str                            # GET /content/jobs/{job_id} once queued
+    generated_at: datetime | None = None   # set when article + image were pre-generated
+    error: str | None = None
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
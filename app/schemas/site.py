@@ -1,3 +1,5 @@
+from datetime import datetime
+from typing import Any
 from pydantic import BaseModel, HttpUrl
 
 class SiteCreate(BaseModel):
@@ -16,3 +18,27 @@ class SiteOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class SiteMetaResource(BaseModel):
+    data: Any = None                  # categories / tags / users: [{id, name, slug}], root / auth: {...}
+    status_code: int | None = None
+    error: str | None = None
+    fetched_at: datetime | None = None
+    expires_at: datetime | None = None
+    stale: bool = False
+
+class SiteMetaOut(BaseModel):
+    site_id: int
+    auth_valid: bool | None = None    # None = not checked yet
+    resources: dict[str, SiteMetaResource] = {}
+
+class SiteValidationOut(BaseModel):
+    site_id: int | None = None        # None for a site that is not saved yet
+    wp_url: str
+    ok: bool
+    cause: str                        # ok / invalid_url / dns / tls / connect / timeout / unauthorized / ...
+    message: str
+    status_code: int | None = None
+    wp_code: str | None = None        # WordPress error code, e.g. "incorrect_password"
+    wp_user_id: int | None = None
+    latency_ms: float = 0.0
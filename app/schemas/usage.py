@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+class UsageRow(BaseModel):
+    # Group keys (only the requested ones are filled)
+    day: str | None = None
+    site: int | None = None
+    style: str | None = None
+    keyword: str | None = None
+    model: str | None = None
+    kind: str | None = None
+
+    generations: int
+    cached: int = 0            # answered by the article cache (no tokens)
+    failed: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    avg_latency_ms: float = 0
+    max_latency_ms: float = 0
+    retries: int = 0
+    cost_usd: float = 0        # estimate, at the configured prices
+
+class UsageReport(BaseModel):
+    group_by: list[str]
+    rows: list[UsageRow]       # most expensive first
+    totals: UsageRow
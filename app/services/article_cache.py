@@ -0,0 +1,108 @@
+# app/services/article_cache.py
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.article_cache import ArticleCacheEntry
+from app.services.openai_client import build_prompt
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def article_cache_key(keyword: str, style: str | None, user_id: int, site_id: int | None = None,
+                      model: str | None = None) -> str:
+    """
+    Same user + site + prompt + model → same key (style changes the prompt,
+    so it is covered). Scoped per user and site: an article is never served
+    to another tenant, nor published twice on different sites (duplicate
+    content). site_id None = a streamed draft not tied to a site yet.
+    """
+    model = model or settings.OPENAI_MODEL
+    prompt = build_prompt(keyword, style or "formal")
+    return hashlib.sha256(f"{user_id}\n{site_id or ''}\n{model}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+def find_article(db: Session, keyword: str, style: str | None, user_id: int, site_id: int) -> tuple[str, dict | None]:
+    """
+    (key, article) for a publish: the article cached for this user + site
+    (e.g. a retry after a failed upload), else a draft the user streamed,
+    which moves to this site so it is published only once. Caller commits.
+    """
+    key = article_cache_key(keyword, style, user_id, site_id)
+    article = get_cached_article(db, key)
+    if article is None:
+        draft_key = article_cache_key(keyword, style, user_id)
+        article = get_cached_article(db, draft_key)
+        # Only the job that deletes the draft gets it (parallel campaign jobs race for it)
+        if article is not None and db.execute(delete(ArticleCacheEntry).where(ArticleCacheEntry.key == draft_key)).rowcount == 1:
+            store_article(db, key, keyword, style, article)
+        else:
+            article = None
+    return key, article
+
+
+def get_cached_article(db: Session, key: str) -> dict | None:
+    """
+    Returns {"title": ..., "content": ...} for a live entry, or None.
+    A hit bumps hits/last_used_at (LRU order for eviction). Caller commits.
+    """
+    if settings.ARTICLE_CACHE_TTL <= 0:
+        return None
+
+    now = _utcnow()
+    row = db.execute(
+        select(ArticleCacheEntry.title, ArticleCacheEntry.content)
+        .where(ArticleCacheEntry.key == key, ArticleCacheEntry.expires_at > now)
+    ).first()
+    if not row:
+        return None
+
+    db.execute(
+        update(ArticleCacheEntry)
+        .where(ArticleCacheEntry.key == key)
+        .values(hits=ArticleCacheEntry.hits + 1, last_used_at=now)
+    )
+    return {"title": row.title, "content": row.content}
+
+
+def store_article(db: Session, key: str, keyword: str, style: str | None, article: dict):
+    """
+    Upsert a generated article and trim the cache (expired rows first, then
+    least recently used beyond ARTICLE_CACHE_MAX_ENTRIES). Caller commits.
+    """
+    if settings.ARTICLE_CACHE_TTL <= 0:
+        return
+
+    now = _utcnow()
+    entry = db.get(ArticleCacheEntry, key)
+    if entry is None:
+        entry = ArticleCacheEntry(key=key, hits=0)
+        db.add(entry)
+    entry.model = settings.OPENAI_MODEL
+    entry.keyword = keyword[:255]
+    entry.style = style
+    entry.title = article["title"][:500]
+    entry.content = article["content"]
+    entry.last_used_at = now
+    entry.expires_at = now + timedelta(seconds=settings.ARTICLE_CACHE_TTL)
+    db.flush()
+
+    _evict(db, now)
+
+
+def _evict(db: Session, now: datetime):
+    db.execute(delete(ArticleCacheEntry).where(ArticleCacheEntry.expires_at <= now))
+
+    overflow = (db.scalar(select(func.count()).select_from(ArticleCacheEntry)) or 0) - settings.ARTICLE_CACHE_MAX_ENTRIES
+    if overflow > 0:
+        oldest = (
+            select(ArticleCacheEntry.key)
+            .order_by(ArticleCacheEntry.last_used_at)
+            .limit(overflow)
+            .scalar_subquery()
+        )
+        db.execute(delete(ArticleCacheEntry).where(ArticleCacheEntry.key.in_(oldest)))
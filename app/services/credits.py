@@ -0,0 +1,140 @@
+# app/services/credits.py
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.principal import invalidate_user
+from app.models.credit_ledger import CreditLedgerEntry
+from app.models.user import User
+
+# user id → spendable balance; filled from UPDATE ... RETURNING once the
+# transaction commits, so it is refreshed for free on every credit movement
+# in this process
+_balances = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+_PENDING = "credit_balances"  # Session.info key: user id → balance waiting for commit
+
+
+def _changed(db: Session, user_id: int, balance: int | None):
+    """
+    Remember the new balance on the session; it only reaches the cache after
+    commit (a rollback, e.g. an all-or-nothing reservation that ran short,
+    must not leave an uncommitted balance behind). Until then the entry is
+    dropped, so readers go to the database.
+    """
+    db.info.setdefault(_PENDING, {})[user_id] = balance
+    _balances.pop(user_id)
+    invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session):
+    for user_id, balance in session.info.pop(_PENDING, {}).items():
+        if balance is None:
+            _balances.pop(user_id)
+        else:
+            _balances.set(user_id, balance)
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session):
+    for user_id in session.info.pop(_PENDING, {}):
+        _balances.pop(user_id)
+        invalidate_user(user_id)
+
+
+def _log(db: Session, user_id: int, kind: str, delta: int, balance_after: int | None,
+         job_id: str | None = None, campaign_id: str | None = None, note: str | None = None):
+    db.add(CreditLedgerEntry(
+        user_id=user_id,
+        kind=kind,
+        delta=delta,
+        balance_after=balance_after,
+        job_id=job_id,
+        campaign_id=campaign_id,
+        note=note,
+    ))
+
+
+def get_balance(db: Session, user_id: int) -> int:
+    """Spendable credits, served from the per-user cache when possible"""
+    balance = _balances.get(user_id)
+    if balance is None:
+        balance = db.query(User.credits).filter(User.id == user_id).scalar() or 0
+        _balances.set(user_id, balance)
+    return balance
+
+
+def reserve_credits(db: Session, user_id: int, amount: int,
+                    job_id: str | None = None, campaign_id: str | None = None) -> bool:
+    """
+    Atomically take `amount` credits if (and only if) the user has them.
+    Single UPDATE ... WHERE credits >= amount, so parallel requests cannot
+    overspend and no row stays locked while the job runs. Caller commits.
+    """
+    balance = db.execute(
+        update(User)
+        .where(User.id == user_id, User.credits >= amount)
+        .values(credits=User.credits - amount)
+        .returning(User.credits)
+    ).scalar_one_or_none()
+    if balance is None:
+        return False
+
+    _log(db, user_id, "reserve", -amount, balance, job_id=job_id, campaign_id=campaign_id)
+    _changed(db, user_id, balance)
+    return True
+
+
+def reserve_credits_per_job(db: Session, user_id: int, job_ids: list[str]) -> bool:
+    """
+    reserve_credits() for a batch: one credit per job id, all or nothing, in
+    a single UPDATE plus one multi-row ledger INSERT (one "reserve" row per
+    job, as if they had been reserved one by one). Caller commits.
+    """
+    amount = len(job_ids)
+    if not amount:
+        return True
+    balance = db.execute(
+        update(User)
+        .where(User.id == user_id, User.credits >= amount)
+        .values(credits=User.credits - amount)
+        .returning(User.credits)
+    ).scalar_one_or_none()
+    if balance is None:
+        return False
+
+    db.execute(insert(CreditLedgerEntry), [
+        {"user_id": user_id, "kind": "reserve", "delta": -1, "balance_after": balance + amount - i, "job_id": job_id}
+        for i, job_id in enumerate(job_ids, start=1)
+    ])
+    _changed(db, user_id, balance)
+    return True
+
+
+def commit_credits(db: Session, user_id: int, amount: int, job_id: str | None = None):
+    """Mark a reservation as consumed (work delivered). Caller commits."""
+    _log(db, user_id, "commit", 0, None, job_id=job_id, note=f"{amount} credit(s) used")
+
+
+def refund_credits(db: Session, user_id: int, amount: int, job_id: str | None = None, note: str | None = None):
+    """Give back previously reserved credits. Caller commits."""
+    balance = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(credits=User.credits + amount)
+        .returning(User.credits)
+    ).scalar_one_or_none()
+
+    _log(db, user_id, "refund", amount, balance, job_id=job_id, note=note)
+    _changed(db, user_id, balance)
+
+
+def grant_credits(db: Session, user: User, amount: int, note: str | None = None):
+    """Add credits to a (possibly new, unflushed) user. Caller commits."""
+    user.credits = (user.credits or 0) + amount
+    db.flush()
+    _log(db, user.id, "grant", amount, user.credits, note=note)
+    _changed(db, user.id, user.credits)
@@ -1,17 +1,30 @@
 # app/services/crypto.py
 
-import base64
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from cryptography.fernet import Fernet, MultiFernet
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-def get_fernet() -> Fernet:
+
+@lru_cache(maxsize=1)
+def get_fernet() -> MultiFernet:
+    """
+    Build the cipher once per process.
+    Encrypts with FERNET_KEY_BASE64; also decrypts with any FERNET_OLD_KEYS,
+    so keys can be rotated without downtime:
+      1. new key → FERNET_KEY_BASE64, old key → FERNET_OLD_KEYS, restart
+      2. run rotate_fernet_keys.py to re-encrypt stored secrets
+      3. drop the old key from FERNET_OLD_KEYS
+    """
     if not settings.FERNET_KEY_BASE64:
         # Agar key nahi mili to generate karo aur print karo (ya .env me set karo)
         key = Fernet.generate_key()
         print("Generated new FERNET_KEY_BASE64:", key.decode())
     else:
         key = settings.FERNET_KEY_BASE64.encode()
-    return Fernet(key)
+
+    old_keys = [k.strip().encode() for k in settings.FERNET_OLD_KEYS.split(",") if k.strip()]
+    return MultiFernet([Fernet(key)] + [Fernet(k) for k in old_keys])
 
 def encrypt_text(plaintext: str) -> str:
     f = get_fernet()
@@ -21,3 +34,32 @@ def encrypt_text(plaintext: str) -> str:
 def decrypt_text(token_str: str) -> str:
     f = get_fernet()
     return f.decrypt(token_str.encode()).decode()
+
+def rotate_text(token_str: str) -> str:
+    """Re-encrypt a token under the current primary key"""
+    return get_fernet().rotate(token_str.encode()).decode()
+
+
+# -------------------------
+# Decrypted WordPress credentials
+# -------------------------
+# site_id → (ciphertext, plaintext). The ciphertext is compared on read, so
+# an updated password (new ciphertext) never returns a stale value.
+_site_passwords = TTLCache(
+    maxsize=settings.CREDENTIAL_CACHE_SIZE,
+    ttl=settings.CREDENTIAL_CACHE_TTL,
+)
+
+def get_site_password(site) -> str:
+    """Decrypted app password of a WordPressSite, cached for a short TTL"""
+    cached = _site_passwords.get(site.id)
+    if cached and cached[0] == site.wp_app_pass_enc:
+        return cached[1]
+
+    plaintext = decrypt_text(site.wp_app_pass_enc)
+    _site_passwords.set(site.id, (site.wp_app_pass_enc, plaintext))
+    return plaintext
+
+def invalidate_site_password(site_id: int):
+    """Call when a site is updated or deleted"""
+    _site_passwords.pop(site_id)
@@ -0,0 +1,90 @@
+# app/services/idempotency.py
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+from app.models.post import GeneratedPost
+from app.models.publish_job import PublishJob
+from app.schemas.job import JobSubmitted
+from app.schemas.post import PostOut
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used for a different request body"""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def request_fingerprint(payload: dict) -> str:
+    """sha256 of the request body in canonical JSON (key order / spacing do not matter)"""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def find_key(db: Session, user_id: int, key: str, request_hash: str) -> IdempotencyKey | None:
+    """
+    The live row for (user, key), or None when the request should run.
+    Expired rows and rows whose job failed are dropped here, so a client can
+    retry a failure with the same key. Raises IdempotencyKeyMismatch when
+    the key belongs to a different request body. Caller commits.
+    """
+    row = db.scalar(select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key))
+    if row is None:
+        return None
+    if _aware(row.expires_at) <= _utcnow() or row.status == "failed":
+        db.delete(row)
+        db.flush()
+        return None
+    if row.request_hash != request_hash:
+        raise IdempotencyKeyMismatch(key)
+    return row
+
+
+def add_key(db: Session, user_id: int, key: str, request_hash: str, job_id: str) -> IdempotencyKey:
+    """
+    Store a new key for `job_id` (also purges expired keys). The flush raises
+    IntegrityError when a concurrent request claimed the same key first — on
+    SQLite and Postgres the INSERT waits for that transaction to finish.
+    """
+    now = _utcnow()
+    db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now))
+    row = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=request_hash,
+        status="in_progress",
+        job_id=job_id,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL),
+    )
+    db.add(row)
+    db.flush()
+    return row
+
+
+def complete_key(db: Session, job: PublishJob):
+    """Record a finished job's result on its key, if it has one. Caller commits."""
+    row = db.scalar(select(IdempotencyKey).where(IdempotencyKey.job_id == job.id))
+    if row is None:
+        return
+
+    row.status = job.status
+    if job.status == "succeeded":
+        post = db.get(GeneratedPost, job.post_id) if job.post_id else None
+        body = JobSubmitted(
+            job_id=job.id,
+            status=job.status,
+            status_url=f"/api/v1/content/jobs/{job.id}",
+            post=PostOut.model_validate(post) if post else None,
+        )
+        row.response = body.model_dump_json()
@@ -0,0 +1,237 @@
+# app/services/job_queue.py
+
+import logging
+import json
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.metrics import publish_jobs
+from app.models.generation_usage import GenerationUsage
+from app.models.publish_job import PublishJob
+from app.models.scheduled_publish import ScheduledPublish
+from app.models.site import WordPressSite
+from app.models.user import User
+from app.services.credits import commit_credits, refund_credits, reserve_credits
+from app.services.idempotency import complete_key
+from app.services.publisher import PublishError, publish_article
+from app.services.wp_meta import auth_rejected
+
+logger = logging.getLogger("rankpost")
+
+# Jobs stuck in "running" longer than this are assumed to belong to a dead
+# worker process and are put back in the queue on startup.
+STALE_RUNNING_AFTER = timedelta(minutes=15)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+class JobQueue:
+    """
+    In-process publish queue backed by the `publish_jobs` table.
+
+    - The table (SQLite by default) is the durable store: a job row exists
+      before it is queued and carries status, stage timings and the result.
+    - A queue.Queue hands job ids to a fixed pool of worker threads.
+    - Workers claim a job with a conditional UPDATE (queued → running), so a
+      job is executed once even if several API processes queue the same id.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._threads: list[threading.Thread] = []
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"publish-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        self._requeue_pending()
+
+    def stop(self, timeout: float = 5.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def submit(self, job_id: str):
+        self._queue.put(job_id)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _requeue_pending(self):
+        db = SessionLocal()
+        try:
+            stale_before = _utcnow() - STALE_RUNNING_AFTER
+            (
+                db.query(PublishJob)
+                .filter(PublishJob.status == "running", PublishJob.started_at < stale_before)
+                .update({PublishJob.status: "queued"}, synchronize_session=False)
+            )
+            db.commit()
+            pending = (
+                db.query(PublishJob.id)
+                .filter(PublishJob.status == "queued")
+                .order_by(PublishJob.created_at)
+                .all()
+            )
+            for (job_id,) in pending:
+                self.submit(job_id)
+        finally:
+            db.close()
+
+    # -------------------------
+    # Worker
+    # -------------------------
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                break
+            try:
+                run_job(job_id)
+            except Exception as e:
+                logger.exception("Job %s crashed", job_id)
+
+
+def _claim(db, job_id: str) -> bool:
+    claimed = (
+        db.query(PublishJob)
+        .filter(PublishJob.id == job_id, PublishJob.status == "queued")
+        .update(
+            {
+                PublishJob.status: "running",
+                PublishJob.started_at: _utcnow(),
+                PublishJob.attempts: PublishJob.attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return claimed == 1
+
+
+def _finish(db, job: PublishJob, status: str, timings: dict, error: str | None = None):
+    publish_jobs.inc(status=status)
+    job.status = status
+    job.error = error
+    job.stage_timings = json.dumps(timings)
+    job.finished_at = _utcnow()
+    if job.credit_reserved:
+        # Reserved at submit → consume on success, give back on failure
+        if status == "succeeded":
+            commit_credits(db, job.user_id, 1, job_id=job.id)
+        else:
+            refund_credits(db, job.user_id, 1, job_id=job.id, note=error)
+            job.credit_reserved = False
+    complete_key(db, job)
+    if job.schedule_id:
+        _finish_scheduled(db, job)
+    db.commit()
+
+
+def _finish_scheduled(db, job: PublishJob):
+    # Mirror the result on the scheduled item; pre-generated content is no longer needed
+    (
+        db.query(ScheduledPublish)
+        .filter(ScheduledPublish.id == job.schedule_id)
+        .update(
+            {
+                ScheduledPublish.status: "published" if job.status == "succeeded" else "failed",
+                ScheduledPublish.error: job.error,
+                ScheduledPublish.content: None,
+                ScheduledPublish.image_b64: None,
+            },
+            synchronize_session=False,
+        )
+    )
+    if job.post_id:
+        # Pre-generation usage was recorded under the job id before the post existed
+        (
+            db.query(GenerationUsage)
+            .filter(GenerationUsage.job_id == job.id, GenerationUsage.post_id.is_(None))
+            .update({GenerationUsage.post_id: job.post_id}, synchronize_session=False)
+        )
+
+
+def run_job(job_id: str):
+    """Execute one publish job end to end (called on a worker thread)."""
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return  # already taken by another worker / process
+
+        job = db.get(PublishJob, job_id)
+        timings: dict = {}
+
+        user = db.get(User, job.user_id)
+        site = db.get(WordPressSite, job.site_id)
+        if not site or site.user_id != job.user_id:
+            return _finish(db, job, "failed", timings, "Site not found")
+        if auth_rejected(db, site.id):
+            # Known-bad app password (cached check) → fail before paying for generation
+            return _finish(db, job, "failed", timings, "WordPress rejected the application password")
+        if not job.credit_reserved:
+            # Jobs queued before reservations existed
+            if not reserve_credits(db, job.user_id, 1, job_id=job.id):
+                return _finish(db, job, "failed", timings, "NOT_ENOUGH_CREDITS")
+            job.credit_reserved = True
+            db.commit()
+
+        def on_stage(name: str):
+            job.stage = name
+            db.commit()
+
+        # Scheduled publishes bring their pre-generated article / image
+        scheduled = db.get(ScheduledPublish, job.schedule_id) if job.schedule_id else None
+        article = {"title": scheduled.title, "content": scheduled.content} if scheduled and scheduled.content else None
+        image_b64 = scheduled.image_b64 if scheduled else None
+
+        try:
+            post = publish_article(
+                db, user, site,
+                keyword=job.keyword,
+                style=job.style,
+                with_image=job.with_image,
+                timings=timings,
+                on_stage=on_stage,
+                use_cache=job.use_cache is not False,
+                job_id=job.id,
+                article=article,
+                image_b64=image_b64,
+                terms=json.loads(job.terms) if job.terms else None,
+            )
+        except PublishError as e:
+            db.rollback()
+            job.stage = e.stage
+            return _finish(db, job, "failed", timings, e.message)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Job %s failed", job_id)
+            return _finish(db, job, "failed", timings, str(e) or "Internal Server Error")
+
+        job.post_id = post.id
+        job.stage = "done"
+        _finish(db, job, "succeeded", timings)
+    finally:
+        db.close()
+
+
+# Shared queue for the API process (started from app.main on startup)
+job_queue = JobQueue(workers=settings.PUBLISH_WORKERS)
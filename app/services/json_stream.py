@@ -0,0 +1,233 @@
+# app/services/json_stream.py
+
+import re
+
+# Characters that end a run of plain string text
+_STRING_SPECIAL = re.compile(r'["\\\x00-\x1f\x7f]')
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class ArticleStreamParser:
+    """
+    Incremental parser for the model's `{"title": "...", "content": "..."}`
+    answer. Feed it chunks as they stream in; it returns the decoded text of
+    the wanted string fields as soon as it arrives, without waiting for the
+    closing brace.
+
+    Tolerant in the same ways the old regex/find("{") clean-up was: anything
+    before the first "{" (```json fences, chatter) is skipped, and raw control
+    characters inside strings are dropped. Non-string values are skipped.
+    """
+
+    def __init__(self, fields: tuple[str, ...] = ("title", "content")):
+        self.fields = fields
+        self.values: dict[str, str] = {}
+        self.done = False
+
+        self._buf = ""            # unconsumed input (e.g. a split escape sequence)
+        self._state = "start"     # start / key / in_key / colon / value / in_value / skip / after
+        self._key = ""
+        self._current: list[str] = []
+        self._depth = 0           # nesting while skipping a non-string value
+        self._skip_in_string = False
+        self._skip_escape = False
+        self._pending_high: str | None = None  # first half of a \\uD83D\\uDE00 surrogate pair
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """Consume `chunk`; returns [(field, new_text), ...] for wanted fields"""
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        out: list[tuple[str, str]] = []
+        i = 0
+        buf = self._buf
+        n = len(buf)
+
+        while i < n and not self.done:
+            state = self._state
+            c = buf[i]
+
+            if state == "start":
+                j = buf.find("{", i)
+                if j == -1:
+                    i = n
+                else:
+                    self._state = "key"
+                    i = j + 1
+
+            elif state in ("key", "colon", "value", "after"):
+                if c.isspace():
+                    i += 1
+                elif state == "key":
+                    if c == '"':
+                        self._state, self._key, self._current = "in_key", "", []
+                    elif c == "}":
+                        self.done = True
+                    i += 1
+                elif state == "colon":
+                    if c == ":":
+                        self._state = "value"
+                    i += 1
+                elif state == "value":
+                    if c == '"':
+                        self._state, self._current = "in_value", []
+                        i += 1
+                    else:
+                        self._state, self._depth = "skip", 0
+                        self._skip_in_string = self._skip_escape = False
+                else:  # after
+                    if c == ",":
+                        self._state = "key"
+                    elif c == "}":
+                        self.done = True
+                    i += 1
+
+            elif state in ("in_key", "in_value"):
+                consumed, text, closed = self._read_string(buf, i)
+                if consumed == 0:
+                    break  # incomplete escape, wait for more input
+                i += consumed
+                if state == "in_key":
+                    self._key += text
+                    if closed:
+                        self._state = "colon"
+                else:
+                    wanted = self._key in self.fields
+                    if text and wanted:
+                        self._current.append(text)
+                        out.append((self._key, text))
+                    if closed:
+                        if wanted:
+                            self.values[self._key] = "".join(self._current)
+                        self._state = "after"
+
+            else:  # skip
+                i = self._skip_value(buf, i)
+
+        self._buf = buf[i:]
+        return out
+
+    def result(self) -> dict:
+        """
+        Fields decoded so far (a field still streaming is included partially).
+        Only a finished article once `done` (closing brace seen); use
+        article() for that.
+        """
+        values = dict(self.values)
+        if self._state == "in_value" and self._key in self.fields:
+            values[self._key] = "".join(self._current)
+        return values
+
+    def article(self) -> dict | None:
+        """
+        The complete {"title", "content"} answer, or None when the object was
+        never closed (output cut off at max_tokens, dropped stream) or a field
+        is missing/empty — a half-written article must never be published.
+        """
+        if not self.done:
+            return None
+        values = self.result()
+        if not all(values.get(field) for field in self.fields):
+            return None
+        return values
+
+    # -------------------------
+    # Internals
+    # -------------------------
+    def _read_string(self, buf: str, i: int) -> tuple[int, str, bool]:
+        """Read string text from buf[i:]; returns (chars consumed, decoded text, string closed)"""
+        parts: list[str] = []
+        start = i
+        n = len(buf)
+        while i < n:
+            m = _STRING_SPECIAL.search(buf, i)
+            end = m.start() if m else n
+            if end > i:
+                parts.append(self._flush_surrogate() + buf[i:end])
+                i = end
+            if not m:
+                break
+
+            c = buf[i]
+            if c == '"':
+                parts.append(self._flush_surrogate())
+                return i + 1 - start, "".join(parts), True
+            if c != "\\":
+                i += 1  # raw control character → dropped
+                continue
+
+            # Escape sequence (may be split across chunks)
+            if i + 1 >= n:
+                break
+            e = buf[i + 1]
+            if e == "u":
+                if i + 6 > n:
+                    break
+                try:
+                    code = int(buf[i + 2:i + 6], 16)
+                except ValueError:
+                    code = 0xFFFD
+                i += 6
+                if 0xD800 <= code <= 0xDBFF:
+                    parts.append(self._flush_surrogate())
+                    self._pending_high = chr(code)
+                elif 0xDC00 <= code <= 0xDFFF and self._pending_high:
+                    high = ord(self._pending_high) - 0xD800
+                    self._pending_high = None
+                    parts.append(chr(0x10000 + (high << 10) + (code - 0xDC00)))
+                else:
+                    parts.append(self._flush_surrogate() + chr(code))
+            else:
+                parts.append(self._flush_surrogate() + _ESCAPES.get(e, e))
+                i += 2
+
+        return i - start, "".join(parts), False
+
+    def _flush_surrogate(self) -> str:
+        # A lone high surrogate cannot be encoded later, replace it
+        if self._pending_high is None:
+            return ""
+        self._pending_high = None
+        return "�"
+
+    def _skip_value(self, buf: str, i: int) -> int:
+        """Skip a number / literal / nested object or array; returns new index"""
+        n = len(buf)
+        while i < n:
+            c = buf[i]
+            if self._skip_in_string:
+                if self._skip_escape:
+                    self._skip_escape = False
+                elif c == "\\":
+                    self._skip_escape = True
+                elif c == '"':
+                    self._skip_in_string = False
+            elif c == '"':
+                self._skip_in_string = True
+            elif c in "[{":
+                self._depth += 1
+            elif c in "]}":
+                if self._depth == 0:
+                    self._state = "after"  # closing brace of the article object
+                    return i
+                self._depth -= 1
+            elif c == "," and self._depth == 0:
+                self._state = "after"
+                return i
+            i += 1
+        return i
+
+
+def parse_article(text: str) -> dict | None:
+    """
+    Parse a complete model answer into {"title": ..., "content": ...}.
+    Returns None when it is truncated (no closing brace) or title/content is
+    missing, so callers retry instead of publishing a partial article.
+    """
+    parser = ArticleStreamParser()
+    parser.feed(text)
+    return parser.article()
@@ -0,0 +1,92 @@
+# app/services/media.py
+
+import binascii
+import io
+
+# Decode base64 in slices of this many characters (must be a multiple of 4)
+B64_CHUNK = 64 * 1024
+
+
+class MemoryReader(io.RawIOBase):
+    """Read-only, seekable file object over a memoryview — no copy of the data."""
+
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        elif whence == io.SEEK_END:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        self._view = memoryview(b"")
+        super().close()
+
+
+def decode_b64(b64: str) -> bytearray:
+    """
+    Decode base64 slice by slice into one preallocated buffer, instead of
+    b64decode() building a second full-size bytes object from a cleaned copy.
+    Returns a bytearray so it can be handed to a pool process as-is.
+    """
+    if "\n" in b64 or "\r" in b64 or " " in b64:
+        b64 = "".join(b64.split())
+
+    out = bytearray(len(b64) // 4 * 3)
+    pos = 0
+    with memoryview(out) as view:
+        for i in range(0, len(b64), B64_CHUNK):
+            chunk = binascii.a2b_base64(b64[i:i + B64_CHUNK])
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+    del out[pos:]  # drop the padding slack (in place, no copy)
+    return out
+
+
+def encode_jpeg(raw: bytes | bytearray, quality: int = 72, max_dimension: int = 0) -> io.BytesIO:
+    """
+    Raw image bytes (see decode_b64) → (optionally downsized) JPEG, returned
+    as a BytesIO at position 0 so it can be streamed as a request body.
+    `max_dimension` caps the longer side in pixels (0 = keep original size).
+    """
+    from PIL import Image  # imported lazily: only the CPU pool processes need Pillow
+
+    with MemoryReader(memoryview(raw)) as fp:
+        img = Image.open(fp)
+        if max_dimension:
+            # JPEG sources can be decoded at reduced scale directly
+            img.draft("RGB", (max_dimension, max_dimension))
+        img.load()
+    del raw
+
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if max_dimension and max(img.size) > max_dimension:
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    out = io.BytesIO()
+    img.save(out, "JPEG", optimize=True, quality=quality)
+    img.close()
+    out.seek(0)
+    return out
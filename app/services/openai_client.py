@@ -1,12 +1,98 @@
 # app/services/openai_client.py
 
-import json
-import re
+import logging
+import asyncio
+import threading
 import time
-import openai
+from typing import AsyncIterator
+import httpx
 from app.core.config import settings
+from app.core.metrics import publish_stage_latency
+from app.services.json_stream import ArticleStreamParser, parse_article
+from app.services.openai_gateway import openai_gateway
 
-openai.api_key = settings.OPENAI_API_KEY
+logger = logging.getLogger("rankpost")
+
+# -------------------------
+# Async client (one per event loop, sharing one keep-alive pool each)
+# -------------------------
+# The API event loop uses its own client; publish worker threads hand their
+# coroutines to a single background "generation" loop, so article + image
+# calls of every job overlap on one thread instead of a thread each.
+_clients: dict = {}             # event loop → AsyncOpenAI
+_transport: httpx.AsyncBaseTransport | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def set_transport(transport: httpx.AsyncBaseTransport | None):
+    """
+    Route all OpenAI HTTP traffic through `transport` (e.g. httpx.MockTransport
+    or httpx.ASGITransport(app=fake_openai)) — for tests and benchmarks.
+    Clients created before the call are dropped, so set it before use.
+    """
+    global _transport
+    _transport = transport
+    _clients.clear()
+
+
+def _build_client():
+    from openai import AsyncOpenAI  # slow import → only on first use
+
+    http_client = httpx.AsyncClient(
+        transport=_transport,
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+            keepalive_expiry=60,
+        ),
+        timeout=httpx.Timeout(settings.OPENAI_ARTICLE_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY or "missing",  # a fake base URL needs no real key
+        base_url=settings.OPENAI_BASE_URL or None,
+        http_client=http_client,
+        max_retries=0,  # retries + backoff live in the gateway
+    )
+
+
+def get_client():
+    """AsyncOpenAI bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = _build_client()
+    return client
+
+
+async def close_client():
+    """Close the running loop's client (API shutdown)"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def _generation_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="openai-loop", daemon=True).start()
+        return _loop
+
+
+def stop_generation_loop(timeout: float = 5.0):
+    """Close the background loop's client and stop the loop (API shutdown)"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(close_client(), loop).result(timeout)
+    except Exception as e:
+        logger.warning("OpenAI client close failed: %s", e)
+    loop.call_soon_threadsafe(loop.stop)
 
 
 def style_guidelines(style: str) -> str:
@@ -55,49 +141,231 @@ Return STRICT JSON only in this format:
 """.strip()
 
 
-def generate_article(keyword: str, style: str = "formal", retries: int = 2) -> dict | None:
+ARTICLE_MAX_TOKENS = 4000
+IMAGE_MODEL = "dall-e-2"  # the API default for images.generate, named explicitly for usage accounting
+IMAGE_SIZE = "1024x1024"
+
+
+def _usage_tokens(resp) -> int | None:
+    usage = getattr(resp, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def _new_usage(kind: str, model: str) -> dict:
+    """One usage record per generation (see app.services.usage)"""
+    return {
+        "kind": kind,
+        "model": model,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "latency_ms": 0.0,
+        "retries": 0,
+        "success": False,
+        "_started": time.perf_counter(),
+    }
+
+
+def _add_tokens(record: dict, usage_obj):
+    if usage_obj is not None:
+        record["prompt_tokens"] += getattr(usage_obj, "prompt_tokens", 0) or 0
+        record["completion_tokens"] += getattr(usage_obj, "completion_tokens", 0) or 0
+
+
+def _close_usage(record: dict, usage: list | None, success: bool):
+    record["success"] = success
+    record["latency_ms"] = round((time.perf_counter() - record.pop("_started")) * 1000, 1)
+    if usage is not None:
+        usage.append(record)
+
+
+async def generate_article_async(keyword: str, style: str = "formal", retries: int = 2, usage: list | None = None) -> dict | None:
     """
     Generate an SEO blog article using OpenAI.
+    Transient API errors (429 / 5xx / timeouts) are retried by the gateway;
+    `retries` only covers answers that do not contain a usable article.
+    Appends a token/latency record to `usage` if given.
     Returns dict { "title": ..., "content": ... } or None on failure.
     """
     prompt = build_prompt(keyword, style)
+    estimated = openai_gateway.estimate_tokens(prompt, ARTICLE_MAX_TOKENS)
+    client = get_client()
+    record = _new_usage("article", settings.OPENAI_MODEL)
+    article = None
 
-    for attempt in range(retries):
-        try:
-            resp = openai.ChatCompletion.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=4000,
-            )
+    try:
+        for attempt in range(retries):
+            meta: dict = {}
+            try:
+                resp = await openai_gateway.call_async(
+                    client.chat.completions.create,
+                    model=settings.OPENAI_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=ARTICLE_MAX_TOKENS,
+                    timeout=settings.OPENAI_ARTICLE_TIMEOUT,
+                    tokens=estimated,
+                    meta=meta,
+                )
+            except Exception as e:
+                logger.exception("OpenAI article generation failed")
+                return None
+            finally:
+                record["retries"] += meta.get("retries", 0) + (1 if attempt else 0)
+            await openai_gateway.record_usage_async(estimated, _usage_tokens(resp))
+            _add_tokens(record, resp.usage)
 
-            text = resp["choices"][0]["message"]["content"]
-            cleaned = re.sub(r"[\x00-\x1F\x7F]", "", text).strip()
-            first, last = cleaned.find("{"), cleaned.rfind("}")
-            payload = cleaned[first:last + 1] if first != -1 and last > first else cleaned
+            article = parse_article(resp.choices[0].message.content or "")
+            if article and article.get("title") and article.get("content"):
+                return article
+            article = None
+            logger.warning("OpenAI article attempt %d: no complete title/content in the answer", attempt + 1)
 
-            return json.loads(payload)
+        return None
+    finally:
+        # Also runs when the caller's timeout cancels us → partial record
+        _close_usage(record, usage, article is not None)
 
-        except Exception as e:
-            print(f"[OpenAI Article Error] attempt {attempt + 1}: {e}")
-            time.sleep(2)
 
-    return None
+async def stream_article(
+    keyword: str,
+    style: str = "formal",
+    parser: ArticleStreamParser | None = None,
+    usage: list | None = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """
+    Streaming variant of generate_article_async: yields (field, text) as soon
+    as the model writes it ("title" first, then "content" HTML in pieces).
+    The full article is `parser.article()` once the generator is exhausted
+    (None if the answer was cut off).
+    Errors are raised to the caller (no retries once text is flowing).
+    """
+    parser = parser or ArticleStreamParser()
+    prompt = build_prompt(keyword, style)
+    record = _new_usage("stream", settings.OPENAI_MODEL)
+    meta: dict = {}
+    stream = None
+    try:
+        # Only opening the stream is retried — once text flows it belongs to the client
+        stream = await openai_gateway.call_async(
+            get_client().chat.completions.create,
+            model=settings.OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.7,
+            max_tokens=ARTICLE_MAX_TOKENS,
+            stream=True,
+            stream_options={"include_usage": True},  # last chunk carries the token counts
+            timeout=settings.OPENAI_ARTICLE_TIMEOUT,
+            tokens=openai_gateway.estimate_tokens(prompt, ARTICLE_MAX_TOKENS),
+            meta=meta,
+        )
+        async with openai_gateway.async_slot():  # the stream keeps the connection busy until done
+            async for chunk in stream:
+                _add_tokens(record, getattr(chunk, "usage", None))
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    for event in parser.feed(text):
+                        yield event
+    finally:
+        record["retries"] = meta.get("retries", 0)
+        _close_usage(record, usage, parser.done)
+        if stream is not None:
+            await stream.close()
 
 
-def generate_image_b64(prompt: str, retries: int = 2) -> str | None:
+async def generate_image_b64_async(prompt: str, usage: list | None = None) -> str | None:
     """
     Generate a base64-encoded image for WordPress featured image.
+    Transient API errors are retried by the gateway.
     """
-    for attempt in range(retries):
+    record = _new_usage("image", IMAGE_MODEL)
+    meta: dict = {}
+    image_b64 = None
+    try:
+        resp = await openai_gateway.call_async(
+            get_client().images.generate,
+            model=IMAGE_MODEL,
+            prompt=prompt,
+            size=IMAGE_SIZE,
+            response_format="b64_json",
+            timeout=settings.OPENAI_IMAGE_TIMEOUT,
+            meta=meta,
+        )
+        image_b64 = resp.data[0].b64_json
+        return image_b64
+    except Exception as e:
+        logger.exception("OpenAI image generation failed")
+        return None
+    finally:
+        record["retries"] = meta.get("retries", 0)
+        _close_usage(record, usage, bool(image_b64))
+
+
+def stage_budget(call_timeout: float) -> float:
+    """
+    Deadline for a whole generation stage. It must outlast every gateway
+    attempt plus the backoff between them, or the first timed-out call is
+    cancelled from outside and is never retried.
+    """
+    if settings.OPENAI_STAGE_TIMEOUT > 0:
+        return settings.OPENAI_STAGE_TIMEOUT
+    retries = max(0, settings.OPENAI_MAX_RETRIES)
+    return call_timeout * (retries + 1) + settings.OPENAI_BACKOFF_MAX * retries
+
+
+async def generate_article_and_image_async(
+    keyword: str,
+    style: str = "formal",
+    with_image: bool = True,
+    article: dict | None = None,
+    usage: list | None = None,
+) -> tuple[dict | None, str | None, dict]:
+    """
+    Run article and featured image generation concurrently — the image prompt
+    only needs the keyword, so there is no reason to wait for the article.
+    Pass `article` (e.g. from the article cache) to only generate the image.
+    Token/latency records of each call are appended to `usage` if given.
+    Returns (article, image_b64, timings_ms). A stage that fails or exceeds
+    its budget (stage_budget: all retries included) comes back as None; the
+    other stage is unaffected.
+    """
+    timings: dict = {}
+
+    async def stage(name: str, coro, timeout: float):
+        start = time.perf_counter()
         try:
-            resp = openai.Image.create(
-                prompt=prompt,
-                size="1024x1024",
-                response_format="b64_json"
-            )
-            return resp["data"][0]["b64_json"]
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning("OpenAI %s stage timed out after %ss", name, timeout)
         except Exception as e:
-            print(f"[OpenAI Image Error] attempt {attempt + 1}: {e}")
-            time.sleep(2)
-    return None
+            logger.exception("OpenAI %s stage failed", name)
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[name] = round(elapsed * 1000, 1)
+            publish_stage_latency.observe(elapsed, stage=f"openai_{name}")
+        return None
+
+    async def keep(value):
+        return value
+
+    article, image_b64 = await asyncio.gather(
+        stage("article", generate_article_async(keyword, style, usage=usage), stage_budget(settings.OPENAI_ARTICLE_TIMEOUT))
+        if article is None else keep(article),
+        stage("image", generate_image_b64_async(keyword, usage=usage), stage_budget(settings.OPENAI_IMAGE_TIMEOUT))
+        if with_image else keep(None),
+    )
+    return article, image_b64, timings
+
+
+def generate_article_and_image(
+    keyword: str,
+    style: str = "formal",
+    with_image: bool = True,
+    article: dict | None = None,
+    usage: list | None = None,
+) -> tuple[dict | None, str | None, dict]:
+    """Blocking wrapper for worker threads: runs on the shared generation loop"""
+    future = asyncio.run_coroutine_threadsafe(
+        generate_article_and_image_async(keyword, style, with_image, article, usage),
+        _generation_loop(),
+    )
+    return future.result()
@@ -0,0 +1,360 @@
+# app/services/openai_gateway.py
+
+import logging
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from app.core.config import settings
+
+logger = logging.getLogger("rankpost")
+
+# Bucket names
+REQUESTS = "requests"
+TOKENS = "tokens"
+_PAUSE = "__pause__"  # shared "nobody calls before <timestamp>" after a 429
+
+# HTTP statuses worth retrying
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _take(state: dict, costs: dict[str, float], limits: dict[str, float], now: float) -> float:
+    """
+    Token-bucket math shared by both stores. `state` maps name → (tokens, updated).
+    Refills every bucket at limit/60 per second (capped at one minute's worth),
+    then either deducts all `costs` and returns 0, or deducts nothing and
+    returns how many seconds until all of them would fit. Mutates `state`.
+    """
+    paused_until = state.get(_PAUSE, (0.0, 0.0))[0]
+    if paused_until > now:
+        return paused_until - now
+
+    wait = 0.0
+    refilled = {}
+    for name, cost in costs.items():
+        capacity = limits[name]
+        if capacity <= 0 or cost <= 0:
+            continue  # unlimited / free
+        rate = capacity / 60.0
+        tokens, updated = state.get(name, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+        refilled[name] = tokens
+        cost = min(cost, capacity)  # a single huge call must still fit eventually
+        if tokens < cost:
+            wait = max(wait, (cost - tokens) / rate)
+
+    for name, tokens in refilled.items():
+        if not wait:
+            tokens -= min(costs[name], limits[name])
+        state[name] = (tokens, now)
+    return wait
+
+
+class LocalBucketStore:
+    """Buckets shared by all threads of this process (default)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: dict = {}
+
+    def take(self, costs: dict[str, float], limits: dict[str, float]) -> float:
+        with self._lock:
+            return _take(self._state, costs, limits, time.time())
+
+    def adjust(self, name: str, delta: float):
+        with self._lock:
+            if name in self._state:
+                tokens, updated = self._state[name]
+                self._state[name] = (tokens + delta, updated)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            until = max(self._state.get(_PAUSE, (0.0, 0.0))[0], time.time() + seconds)
+            self._state[_PAUSE] = (until, 0.0)
+
+
+class SqliteBucketStore:
+    """
+    Buckets shared by every worker process on the host via a small SQLite
+    file. Each take() is one BEGIN IMMEDIATE transaction (the write lock
+    serializes processes); wall-clock time so all processes agree.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)  # autocommit; we BEGIN ourselves
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = {name: (tokens, updated) for name, tokens, updated in conn.execute("SELECT name, tokens, updated FROM buckets")}
+            before = dict(state)
+            yield state
+            changed = [(n, t, u) for n, (t, u) in state.items() if before.get(n) != (t, u)]
+            conn.executemany("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)", changed)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def take(self, costs: dict[str, float], limits: dict[str, float]) -> float:
+        with self._transaction() as state:
+            return _take(state, costs, limits, time.time())
+
+    def adjust(self, name: str, delta: float):
+        with self._transaction() as state:
+            if name in state:
+                tokens, updated = state[name]
+                state[name] = (tokens + delta, updated)
+
+    def pause(self, seconds: float):
+        with self._transaction() as state:
+            until = max(state.get(_PAUSE, (0.0, 0.0))[0], time.time() + seconds)
+            state[_PAUSE] = (until, 0.0)
+
+
+# -------------------------
+# Error classification
+# -------------------------
+def _status_of(exc: Exception) -> int | None:
+    status = getattr(exc, "http_status", None) or getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_of(exc: Exception) -> float | None:
+    """Seconds from a Retry-After (or retry-after-ms) header on the error, if any"""
+    headers = getattr(exc, "headers", None) or getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass  # HTTP-date form → fall back to our own backoff
+    return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = _status_of(exc)
+    if status is not None:
+        return status in RETRY_STATUSES
+    # No HTTP status: connection problems and timeouts are transient
+    name = type(exc).__name__
+    return isinstance(exc, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connection" in name
+
+
+class ProcessSemaphore:
+    """
+    asyncio semaphore shared by every event loop of the process (the API loop
+    and the background generation loop), so `value` is one process-wide cap.
+    Waiters are woken in FIFO order on their own loop.
+    """
+
+    def __init__(self, value: int):
+        self._value = value
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()  # (loop, future)
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._value > 0 and not self._waiters:
+                self._value -= 1
+                return
+            fut = loop.create_future()
+            self._waiters.append((loop, fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, fut))
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                self.release()  # release() already picked us → pass the slot on
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._value += 1
+                return
+            loop, fut = self._waiters.popleft()
+        loop.call_soon_threadsafe(_wake, fut)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+def _wake(fut: asyncio.Future):
+    # A cancelled waiter passes the slot on itself (see acquire)
+    if not fut.done():
+        fut.set_result(None)
+
+
+class OpenAIGateway:
+    """
+    Every OpenAI call goes through here:
+    - token buckets for requests/min and tokens/min (process-wide, or shared
+      by all workers when OPENAI_RATE_STORE points at a SQLite file)
+    - one cap on concurrent calls for the whole process (all event loops)
+    - retries with full-jitter exponential backoff; Retry-After is honoured
+      and a 429 pauses *all* callers for that long, so they do not retry in
+      lock-step (thundering herd)
+    Callers are async (API loop or the background generation loop).
+    """
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        store=None,
+    ):
+        self.limits = {REQUESTS: float(rpm), TOKENS: float(tpm)}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.store = store or LocalBucketStore()
+        self._slots = ProcessSemaphore(max(1, max_concurrency))
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "rate_limited": 0, "failed": 0, "waited_s": 0.0}
+
+    # -------------------------
+    # Helpers
+    # -------------------------
+    @staticmethod
+    def estimate_tokens(prompt: str, max_tokens: int = 0) -> int:
+        """Rough prompt tokens (~4 chars each) + completion budget"""
+        return len(prompt) // 4 + max_tokens
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _count(self, key: str, amount: float = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def record_usage(self, estimated: int, actual: int | None):
+        """Correct the tokens bucket once the real usage is known"""
+        if actual is not None and self.limits[TOKENS] > 0:
+            self.store.adjust(TOKENS, estimated - actual)
+
+    async def record_usage_async(self, estimated: int, actual: int | None):
+        await self._off_loop(self.record_usage, estimated, actual)
+
+    def _on_error(self, exc: Exception, attempt: int) -> float | None:
+        """Delay before the next attempt, or None when the error is final"""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            self._count("failed")
+            return None
+        retry_after = retry_after_of(exc)
+        delay = self.backoff(attempt, retry_after)
+        if _status_of(exc) == 429:
+            self._count("rate_limited")
+            self.store.pause(delay)
+        self._count("retries")
+        return delay
+
+    # -------------------------
+    # Async API (event loop)
+    # -------------------------
+    async def _off_loop(self, fn, *args):
+        """
+        Run a store-touching call from the event loop. The shared SQLite store
+        can wait on its file lock (up to the connect timeout) under multi-worker
+        contention, so it goes to a thread; the in-process store is instant.
+        """
+        if isinstance(self.store, LocalBucketStore):
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def acquire_async(self, tokens: int = 0):
+        costs = {REQUESTS: 1, TOKENS: tokens}
+        while True:
+            wait = await self._off_loop(self.store.take, costs, self.limits)
+            if not wait:
+                return
+            self._count("waited_s", wait)
+            await asyncio.sleep(wait)
+
+    def async_slot(self) -> ProcessSemaphore:
+        """Process-wide concurrency slot (`async with gateway.async_slot():`)"""
+        return self._slots
+
+    async def call_async(self, fn, *args, tokens: int = 0, meta: dict | None = None, **kwargs):
+        """
+        Await `fn(*args, **kwargs)` under the limits, retrying transient errors.
+        `meta`, if given, receives {"retries": n} (also when the call fails).
+        """
+        attempt = 0
+        meta = meta if meta is not None else {}
+        while True:
+            meta["retries"] = attempt
+            await self.acquire_async(tokens)
+            self._count("calls")
+            try:
+                async with self.async_slot():
+                    return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = await self._off_loop(self._on_error, e, attempt)  # may pause the shared store
+                if delay is None:
+                    raise
+                logger.warning("OpenAI gateway retry %d in %.1fs: %r", attempt + 1, delay, e)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["waited_s"] = round(out["waited_s"], 2)
+        out["limits"] = {"rpm": self.limits[REQUESTS], "tpm": self.limits[TOKENS]}
+        out["store"] = type(self.store).__name__
+        return out
+
+
+def _build_gateway() -> OpenAIGateway:
+    store = SqliteBucketStore(settings.OPENAI_RATE_STORE) if settings.OPENAI_RATE_STORE else None
+    return OpenAIGateway(
+        rpm=settings.OPENAI_RPM,
+        tpm=settings.OPENAI_TPM,
+        max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        backoff_base=settings.OPENAI_BACKOFF_BASE,
+        backoff_max=settings.OPENAI_BACKOFF_MAX,
+        store=store,
+    )
+
+
+# Shared by every OpenAI call in this process
+openai_gateway = _build_gateway()
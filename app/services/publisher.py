@@ -0,0 +1,152 @@
+# app/services/publisher.py
+
+import logging
+import time
+from contextlib import contextmanager
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import publish_stage_latency
+from app.models.post import GeneratedPost
+from app.models.site import WordPressSite
+from app.models.user import User
+from app.services.openai_client import generate_article_and_image
+from app.services.article_cache import find_article, store_article
+from app.services.usage import record_generation_usage
+from app.services.wordpress import upload_post
+from app.services.crypto import get_site_password
+from app.services.site_limits import site_limiter
+from app.services.wp_meta import resolve_terms
+
+logger = logging.getLogger("rankpost")
+
+
+class PublishError(Exception):
+    """Raised when a publish stage fails; `stage` tells the client where."""
+
+    def __init__(self, stage: str, message: str):
+        super().__init__(message)
+        self.stage = stage
+        self.message = message
+
+
+@contextmanager
+def stage_timer(timings: dict, stage: str):
+    """Record how long a stage took (ms) into `timings`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def publish_article(
+    db: Session,
+    user: User,
+    site: WordPressSite,
+    keyword: str,
+    style: str | None,
+    with_image: bool,
+    timings: dict,
+    on_stage=None,
+    use_cache: bool = True,
+    job_id: str | None = None,
+    article: dict | None = None,
+    image_b64: str | None = None,
+    terms: dict | None = None,
+) -> GeneratedPost:
+    """
+    Full auto-publish pipeline: generate (article ∥ image) → upload → save.
+    `on_stage(name)` is called before each stage so callers can report progress.
+    With `use_cache` an article generated earlier for the same prompt, user
+    and site (or streamed by the user) is reused, and a fresh one is cached
+    before upload (so a retry after a failed upload does not pay for the
+    article again).
+    Token / latency usage of every OpenAI call is stored in generation_usage
+    (right after generation, so failed publishes are accounted too) and
+    linked to the post once it is saved.
+    A pre-generated `article` / `image_b64` (scheduled publishes) skips those
+    OpenAI calls, leaving just the upload.
+    `terms` ({"categories": [...], "tags": [...], "author": ...} by name)
+    are mapped to ids from the site metadata cache, no extra WP round-trips.
+    Credits are handled by the caller (reserved before, committed/refunded after).
+    Raises PublishError on failure. Returns the saved GeneratedPost.
+    """
+    on_stage = on_stage or (lambda name: None)
+
+    # ---------------- Generate Article + Image (parallel) ----------------
+    on_stage("generate")
+    with stage_timer(timings, "generate"):
+        cache_key, cached = find_article(db, keyword, style, user.id, site.id) if use_cache and article is None else (None, None)
+        if cached:
+            db.commit()
+        usage: list[dict] = []
+        article = article or cached
+        need_image = with_image and not image_b64
+        gen_timings: dict = {}
+        if article is None or need_image:
+            article, new_image, gen_timings = generate_article_and_image(keyword, style, need_image, article=article, usage=usage)
+            image_b64 = image_b64 or new_image
+    timings.update(gen_timings)
+
+    if cached:
+        usage.append({"kind": "article", "model": settings.OPENAI_MODEL, "cached": True, "success": True})
+    usage_rows = record_generation_usage(db, usage, user.id, site_id=site.id, job_id=job_id, keyword=keyword, style=style)
+    db.commit()
+
+    if not article or not article.get("title") or not article.get("content"):
+        raise PublishError("article", "Failed to generate article")
+
+    if cached:
+        timings["article_cache_hit"] = 1
+    elif cache_key:
+        try:
+            store_article(db, cache_key, keyword, style, article)
+            db.commit()
+        except Exception as e:
+            # A cache write must never fail the publish (e.g. a parallel job stored the same key)
+            db.rollback()
+            logger.warning("Article cache write failed: %s", e)
+
+    title = article["title"]
+    content_html = article["content"]
+    has_image = bool(image_b64)
+
+    # ---------------- Publish to WordPress ----------------
+    term_ids = resolve_terms(db, site, terms) if terms else {}
+    on_stage("upload")
+    with site_limiter.slot(site.id), stage_timer(timings, "upload"):
+        wp_pass = get_site_password(site)
+        url = upload_post(
+            wp_url=site.wp_url.rstrip("/"),
+            user=site.wp_user,
+            app_pass=wp_pass,
+            title=title,
+            content_html=content_html,
+            image_b64=image_b64,
+            **term_ids,
+        )
+    if not url:
+        raise PublishError("upload", "Failed to publish post")
+
+    # ---------------- Save Post ----------------
+    on_stage("save")
+    with stage_timer(timings, "save"):
+        post = GeneratedPost(
+            user_id=user.id,
+            site_id=site.id,
+            site_name=site.site_name,
+            title=title,
+            keyword=keyword,
+            style=style,
+            wp_post_url=url,
+            has_image=has_image,
+        )
+        db.add(post)
+        db.flush()
+        for row in usage_rows:
+            row.post_id = post.id
+        with publish_stage_latency.time(stage="db_commit"):
+            db.commit()
+        db.refresh(post)
+
+    return post
@@ -0,0 +1,104 @@
+# app/services/refresh_tokens.py
+
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.security import generate_refresh_token, split_refresh_token, verify_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _as_utc(dt: datetime) -> datetime:
+    # SQLite gives back naive datetimes, Postgres gives aware ones
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def issue_refresh_token(db: Session, user: User) -> str:
+    """
+    Start a new session for the user and return the raw refresh token.
+    Caller is responsible for db.commit().
+    """
+    token, selector, verifier_hash = generate_refresh_token()
+    db.add(RefreshToken(
+        user_id=user.id,
+        selector=selector,
+        verifier_hash=verifier_hash,
+        expires_at=_utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+def _lookup(db: Session, token: str) -> RefreshToken | None:
+    """Single indexed lookup by selector, then constant-time verifier check"""
+    parts = split_refresh_token(token)
+    if not parts:
+        return None
+    selector, verifier = parts
+
+    row = db.query(RefreshToken).filter(RefreshToken.selector == selector).first()
+    if not row or not verify_refresh_token(verifier, row.verifier_hash):
+        return None
+    return row
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple[User, str] | None:
+    """
+    Exchange a valid refresh token for a new one (old one is revoked).
+    Returns (user, new_token) or None if the token is invalid/expired/revoked.
+    Presenting an already-rotated token revokes every session of that user,
+    since it means the token was copied.
+    """
+    row = _lookup(db, token)
+    if not row:
+        return None
+
+    now = _utcnow()
+    if row.revoked_at is not None:
+        revoke_all_refresh_tokens(db, row.user_id)
+        db.commit()
+        return None
+    if _as_utc(row.expires_at) <= now:
+        return None
+
+    user = db.get(User, row.user_id)
+    if not user:
+        return None
+
+    # Conditional revoke: of two concurrent refreshes with the same token only
+    # one matches "revoked_at IS NULL"; the other is treated as reuse
+    claimed = (
+        db.query(RefreshToken)
+        .filter(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: now, RefreshToken.last_used_at: now}, synchronize_session=False)
+    )
+    if claimed != 1:
+        revoke_all_refresh_tokens(db, row.user_id)
+        db.commit()
+        return None
+
+    new_token = issue_refresh_token(db, user)
+    db.commit()
+    return user, new_token
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Revoke one session (logout). Returns False if the token is unknown."""
+    row = _lookup(db, token)
+    if not row:
+        return False
+    if row.revoked_at is None:
+        row.revoked_at = _utcnow()
+        db.commit()
+    return True
+
+
+def revoke_all_refresh_tokens(db: Session, user_id: int) -> int:
+    """Revoke every active session of a user (logout everywhere). Caller commits."""
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .update({RefreshToken.revoked_at: _utcnow()}, synchronize_session=False)
+    )
@@ -0,0 +1,325 @@
+# app/services/scheduler.py
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.metrics import scheduler_events
+from app.models.publish_job import PublishJob
+from app.models.scheduled_publish import ScheduledPublish
+from app.services.article_cache import find_article, store_article
+from app.services.credits import refund_credits, reserve_credits_per_job
+from app.services.job_queue import job_queue, new_job_id
+from app.services.openai_client import generate_article_and_image
+from app.services.usage import record_generation_usage
+
+logger = logging.getLogger("rankpost")
+
+# Pre-generations claimed longer ago than this belong to a dead process → back to "scheduled"
+STALE_GENERATING_AFTER = timedelta(minutes=15)
+MAX_PREGENERATE_ATTEMPTS = 3  # after that the article is generated at publish time
+
+FIREABLE = ("scheduled", "ready")
+CANCELLABLE = ("scheduled", "generating", "ready")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Naive datetimes from clients are taken as UTC"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+# -------------------------
+# Scheduling / cancelling (API)
+# -------------------------
+def schedule_posts(
+    db: Session,
+    user_id: int,
+    site_id: int,
+    keywords: list[str],
+    start_at: datetime,
+    interval: timedelta,
+    style: str | None,
+    with_image: bool,
+    use_cache: bool,
+) -> list[ScheduledPublish] | None:
+    """
+    One item per keyword at start_at, start_at + interval, ... One credit per
+    item is reserved now (all or nothing). Returns None when the user does
+    not have enough credits. Caller commits.
+    """
+    start_at = as_utc(start_at)
+    job_ids = [new_job_id() for _ in keywords]
+    if not reserve_credits_per_job(db, user_id, job_ids):
+        return None
+    items = [
+        ScheduledPublish(
+            id=new_job_id(),
+            user_id=user_id,
+            site_id=site_id,
+            job_id=job_id,
+            keyword=keyword,
+            style=style,
+            with_image=with_image,
+            use_cache=use_cache,
+            due_at=start_at + interval * i,
+            status="scheduled",
+            attempts=0,
+        )
+        for i, (keyword, job_id) in enumerate(zip(keywords, job_ids))
+    ]
+    db.add_all(items)
+    db.flush()
+    return items
+
+
+def cancel_scheduled(db: Session, user_id: int, schedule_id: str) -> bool:
+    """Cancel an item that has not been handed to the publish queue yet and refund its credit. Caller commits."""
+    row = db.scalar(select(ScheduledPublish).where(ScheduledPublish.id == schedule_id, ScheduledPublish.user_id == user_id))
+    if row is None:
+        return False
+    cancelled = db.execute(
+        update(ScheduledPublish)
+        .where(ScheduledPublish.id == schedule_id, ScheduledPublish.status.in_(CANCELLABLE))
+        .values(status="cancelled", content=None, image_b64=None)
+    ).rowcount
+    if not cancelled:
+        return False
+    refund_credits(db, user_id, 1, job_id=row.job_id, note="schedule cancelled")
+    return True
+
+
+# -------------------------
+# Claiming
+# -------------------------
+def _claim(db: Session, statuses: tuple, new_status: str, due_before: datetime, limit: int, *where) -> list[ScheduledPublish]:
+    """
+    Move up to `limit` rows (oldest due_at first) from `statuses` to
+    `new_status` and return them. Rows are claimed with a conditional UPDATE
+    that stamps a fresh claim token, so two pollers can never both get the
+    same row; on Postgres the candidate SELECT also uses FOR UPDATE SKIP
+    LOCKED, so concurrent pollers take disjoint batches instead of colliding.
+    Caller commits.
+    """
+    candidates = (
+        select(ScheduledPublish.id)
+        .where(ScheduledPublish.status.in_(statuses), ScheduledPublish.due_at <= due_before, *where)
+        .order_by(ScheduledPublish.due_at)
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    ids = list(db.scalars(candidates))
+    if not ids:
+        return []
+
+    token = uuid.uuid4().hex
+    db.execute(
+        update(ScheduledPublish)
+        .where(ScheduledPublish.id.in_(ids), ScheduledPublish.status.in_(statuses))
+        .values(status=new_status, claim_token=token, claimed_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return list(db.scalars(select(ScheduledPublish).where(ScheduledPublish.claim_token == token)))
+
+
+def release_stale(db: Session) -> int:
+    """Pre-generations orphaned by a dead process go back to "scheduled". Caller commits."""
+    return db.execute(
+        update(ScheduledPublish)
+        .where(ScheduledPublish.status == "generating", ScheduledPublish.claimed_at < _utcnow() - STALE_GENERATING_AFTER)
+        .values(status="scheduled", claim_token=None)
+    ).rowcount
+
+
+def fire_due(db: Session, limit: int) -> list[str]:
+    """
+    Hand due items to the publish queue: each becomes a PublishJob (id =
+    the item's job_id, credit already reserved) and the job worker uploads
+    the pre-generated article. Commits; returns the job ids to submit.
+    """
+    rows = _claim(db, FIREABLE, "queued", _utcnow(), limit)
+    for row in rows:
+        db.add(PublishJob(
+            id=row.job_id,
+            user_id=row.user_id,
+            site_id=row.site_id,
+            schedule_id=row.id,
+            keyword=row.keyword,
+            style=row.style,
+            with_image=row.with_image,
+            use_cache=row.use_cache,
+            status="queued",
+            credit_reserved=True,
+        ))
+    db.commit()
+    return [row.job_id for row in rows]
+
+
+# -------------------------
+# Pre-generation
+# -------------------------
+def pregenerate(schedule_id: str, token: str):
+    """
+    Generate article + image for a claimed item ahead of its slot (called on
+    a pre-generation thread). Uses / fills the article cache like a publish
+    does; usage is recorded under the item's job id. On failure the item goes
+    back to "scheduled" and is retried, then left for publish time.
+    """
+    db = SessionLocal()
+    try:
+        row = db.get(ScheduledPublish, schedule_id)
+        if row is None or row.claim_token != token:
+            return
+
+        cache_key, cached = (
+            find_article(db, row.keyword, row.style, row.user_id, row.site_id) if row.use_cache is not False else (None, None)
+        )
+        usage: list[dict] = []
+        article, image_b64, _ = generate_article_and_image(row.keyword, row.style, row.with_image, article=cached, usage=usage)
+        if cached:
+            usage.append({"kind": "article", "model": settings.OPENAI_MODEL, "cached": True, "success": True})
+        record_generation_usage(db, usage, row.user_id, site_id=row.site_id, job_id=row.job_id, keyword=row.keyword, style=row.style)
+        db.commit()
+
+        ok = bool(article and article.get("title") and article.get("content"))
+        if ok and cache_key and not cached:
+            try:
+                store_article(db, cache_key, row.keyword, row.style, article)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning("Article cache write failed: %s", e)
+
+        if ok:
+            values = dict(status="ready", title=article["title"][:500], content=article["content"],
+                          image_b64=image_b64, generated_at=_utcnow(), error=None)
+        else:
+            values = dict(status="scheduled", error="Article pre-generation failed")
+        values["attempts"] = ScheduledPublish.attempts + 1
+
+        # Conditional: the item may have been cancelled meanwhile
+        db.execute(
+            update(ScheduledPublish)
+            .where(ScheduledPublish.id == schedule_id, ScheduledPublish.claim_token == token,
+                   ScheduledPublish.status == "generating")
+            .values(**values)
+        )
+        db.commit()
+        scheduler_events.inc(event="pregenerated" if ok else "pregenerate_failed")
+    except Exception as e:
+        db.rollback()
+        logger.exception("Scheduler pre-generation of %s crashed", schedule_id)
+        db.execute(
+            update(ScheduledPublish)
+            .where(ScheduledPublish.id == schedule_id, ScheduledPublish.claim_token == token,
+                   ScheduledPublish.status == "generating")
+            .values(status="scheduled", error=str(e)[:500], attempts=ScheduledPublish.attempts + 1)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+class Scheduler:
+    """
+    Single poller thread per API process:
+    - fires due items in batches (claimed row by row, so several processes
+      can poll the same table without double-publishing)
+    - claims items due within SCHEDULER_PREGENERATE_AHEAD and generates their
+      article + image on a small thread pool, so at the slot only the
+      WordPress upload is left
+    Items live in `scheduled_publishes`, ordered by the (status, due_at) index.
+    """
+
+    def __init__(self, poll_interval: float, batch_size: int, pregenerate_workers: int):
+        self.poll_interval = max(0.1, poll_interval)
+        self.batch_size = max(1, batch_size)
+        self.pregenerate_workers = max(1, pregenerate_workers)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._busy = 0
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self):
+        if self._thread:
+            return
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.pregenerate_workers, thread_name_prefix="scheduler-pregen")
+        self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.exception("Scheduler poll failed")
+            self._stop.wait(self.poll_interval)
+
+    # -------------------------
+    # One poll
+    # -------------------------
+    def poll(self):
+        db = SessionLocal()
+        try:
+            release_stale(db)
+            db.commit()
+
+            job_ids = fire_due(db, self.batch_size)
+            for job_id in job_ids:
+                job_queue.submit(job_id)
+            if job_ids:
+                scheduler_events.inc(len(job_ids), event="fired")
+
+            with self._lock:
+                free = self.pregenerate_workers - self._busy
+            claimed = []
+            if free > 0 and self._pool is not None:
+                ahead = _utcnow() + timedelta(seconds=settings.SCHEDULER_PREGENERATE_AHEAD)
+                rows = _claim(db, ("scheduled",), "generating", ahead, free,
+                              ScheduledPublish.attempts < MAX_PREGENERATE_ATTEMPTS)
+                claimed = [(row.id, row.claim_token) for row in rows]
+                db.commit()
+        finally:
+            db.close()
+
+        for schedule_id, token in claimed:
+            with self._lock:
+                self._busy += 1
+            self._pool.submit(self._pregenerate, schedule_id, token)
+
+    def _pregenerate(self, schedule_id: str, token: str):
+        try:
+            pregenerate(schedule_id, token)
+        finally:
+            with self._lock:
+                self._busy -= 1
+
+
+# Shared poller for the API process (started from app.main on startup)
+scheduler = Scheduler(
+    poll_interval=settings.SCHEDULER_POLL_INTERVAL,
+    batch_size=settings.SCHEDULER_BATCH_SIZE,
+    pregenerate_workers=settings.SCHEDULER_PREGENERATE_WORKERS,
+)
@@ -0,0 +1,51 @@
+# app/services/site_limits.py
+
+import threading
+import time
+from contextlib import contextmanager
+from app.core.config import settings
+
+
+class SiteRateLimiter:
+    """
+    Per-site throttle for WordPress uploads, shared by all publish workers:
+    at most `max_concurrent` uploads in flight per site and at least
+    `min_interval` seconds between upload starts. Keeps bulk campaigns
+    from hammering one customer's WordPress.
+    """
+
+    def __init__(self, max_concurrent: int, min_interval: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._semaphores: dict[int, threading.BoundedSemaphore] = {}
+        self._next_start: dict[int, float] = {}
+
+    def _semaphore(self, site_id: int) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(site_id)
+            if sem is None:
+                sem = self._semaphores[site_id] = threading.BoundedSemaphore(self.max_concurrent)
+            return sem
+
+    @contextmanager
+    def slot(self, site_id: int):
+        sem = self._semaphore(site_id)
+        sem.acquire()
+        try:
+            # Reserve the next start time for this site, then sleep until it
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_start.get(site_id, 0.0))
+                self._next_start[site_id] = start_at + self.min_interval
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+        finally:
+            sem.release()
+
+
+site_limiter = SiteRateLimiter(
+    max_concurrent=settings.SITE_MAX_CONCURRENT_PUBLISHES,
+    min_interval=settings.SITE_MIN_PUBLISH_INTERVAL,
+)
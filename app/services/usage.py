@@ -0,0 +1,115 @@
+# app/services/usage.py
+
+from datetime import datetime
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.generation_usage import GenerationUsage
+
+# group_by name → column expression
+GROUP_COLUMNS = {
+    "day": func.date(GenerationUsage.created_at),
+    "site": GenerationUsage.site_id,
+    "style": GenerationUsage.style,
+    "keyword": GenerationUsage.keyword,
+    "model": GenerationUsage.model,
+    "kind": GenerationUsage.kind,
+}
+
+
+def estimate_cost(kind: str, prompt_tokens: int, completion_tokens: int, success: bool = True) -> float:
+    if kind == "image":
+        return settings.OPENAI_PRICE_PER_IMAGE if success else 0.0
+    return (
+        prompt_tokens / 1000 * settings.OPENAI_PRICE_PROMPT_PER_1K
+        + completion_tokens / 1000 * settings.OPENAI_PRICE_COMPLETION_PER_1K
+    )
+
+
+def record_generation_usage(
+    db: Session,
+    records: list[dict],
+    user_id: int,
+    site_id: int | None = None,
+    job_id: str | None = None,
+    keyword: str | None = None,
+    style: str | None = None,
+) -> list[GenerationUsage]:
+    """
+    Store the usage records collected by openai_client (one per call).
+    Returns the rows so the caller can link them to the post later. Caller commits.
+    """
+    rows = [
+        GenerationUsage(
+            user_id=user_id,
+            site_id=site_id,
+            job_id=job_id,
+            kind=r["kind"],
+            model=r["model"],
+            keyword=keyword[:255] if keyword else None,
+            style=style,
+            prompt_tokens=r.get("prompt_tokens", 0),
+            completion_tokens=r.get("completion_tokens", 0),
+            latency_ms=r.get("latency_ms", 0.0),
+            retries=r.get("retries", 0),
+            success=r.get("success", True),
+            cached=r.get("cached", False),
+            cost_usd=0.0 if r.get("cached") else estimate_cost(
+                r["kind"], r.get("prompt_tokens", 0), r.get("completion_tokens", 0), r.get("success", True)
+            ),
+        )
+        for r in records
+    ]
+    db.add_all(rows)
+    return rows
+
+
+def usage_report(
+    db: Session,
+    user_id: int,
+    group_by: list[str],
+    since: datetime | None = None,
+    until: datetime | None = None,
+    site_id: int | None = None,
+    limit: int = 500,
+) -> list[dict]:
+    """Token / latency / cost totals of one user's generations, grouped by `group_by`"""
+    keys = [GROUP_COLUMNS[g].label(g) for g in group_by]
+    total_tokens = func.sum(GenerationUsage.prompt_tokens + GenerationUsage.completion_tokens)
+
+    stmt = (
+        select(
+            *keys,
+            func.count().label("generations"),
+            func.sum(case((GenerationUsage.cached.is_(True), 1), else_=0)).label("cached"),
+            func.sum(case((GenerationUsage.success.is_(False), 1), else_=0)).label("failed"),
+            func.sum(GenerationUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(GenerationUsage.completion_tokens).label("completion_tokens"),
+            total_tokens.label("total_tokens"),
+            func.avg(GenerationUsage.latency_ms).label("avg_latency_ms"),
+            func.max(GenerationUsage.latency_ms).label("max_latency_ms"),
+            func.sum(GenerationUsage.retries).label("retries"),
+            func.sum(GenerationUsage.cost_usd).label("cost_usd"),
+        )
+        .where(GenerationUsage.user_id == user_id)
+        .group_by(*keys)
+        .order_by(func.sum(GenerationUsage.cost_usd).desc())
+        .limit(limit)
+    )
+    if since:
+        stmt = stmt.where(GenerationUsage.created_at >= since)
+    if until:
+        stmt = stmt.where(GenerationUsage.created_at < until)
+    if site_id is not None:
+        stmt = stmt.where(GenerationUsage.site_id == site_id)
+
+    rows = []
+    for row in db.execute(stmt).mappings():
+        item = dict(row)
+        for k in ("avg_latency_ms", "max_latency_ms"):
+            item[k] = round(item[k] or 0.0, 1)
+        item["cost_usd"] = round(item["cost_usd"] or 0.0, 6)
+        if "day" in item and item["day"] is not None:
+            item["day"] = str(item["day"])
+        rows.append(item)
+    return rows
@@ -1,18 +1,14 @@
 # app/services/wordpress.py
 
-import base64, json, re, requests
-from io import BytesIO
-from PIL import Image
+import json, logging, re
 from requests.auth import HTTPBasicAuth
+from app.core.config import settings
+from app.core.executor import cpu_executor
+from app.core.metrics import stage
+from app.services.media import decode_b64, encode_jpeg
+from app.services.wp_client import wp_client
 
-
-def _compress_to_jpeg(b64: str, quality: int = 70) -> bytes:
-    """Decode base64 → compress → return JPEG bytes"""
-    raw = base64.b64decode(b64)
-    img = Image.open(BytesIO(raw)).convert("RGB")
-    buf = BytesIO()
-    img.save(buf, "JPEG", optimize=True, quality=quality)
-    return buf.getvalue()
+logger = logging.getLogger("rankpost")
 
 
 def upload_post(
@@ -21,7 +17,10 @@ def upload_post(
     app_pass: str,
     title: str,
     content_html: str,
-    image_b64: str | None = None
+    image_b64: str | None = None,
+    categories: list[int] | None = None,
+    tags: list[int] | None = None,
+    author: int | None = None,
 ) -> str | None:
     """
     Upload a post (and optional featured image) to WordPress using REST API.
@@ -31,6 +30,7 @@ def upload_post(
     - title → post title
     - content_html → HTML content
     - image_b64 → optional base64 image for featured image
+    - categories / tags / author → WordPress ids (from the site metadata cache)
     """
     featured_media_id = None
     try:
@@ -41,21 +41,33 @@ def upload_post(
         if image_b64:
             media_url = base_url + "/media"
             image_name = re.sub(r"[^a-zA-Z0-9]+", "-", title.lower())[:30] + ".jpg"
-            img_bytes = _compress_to_jpeg(image_b64, quality=72)
+            # Decoded here (cheap, chunked) so only the raw bytes are pickled
+            # to the CPU pool; the JPEG body is then streamed from one buffer
+            # (requests sends file objects in blocks)
+            with stage("jpeg_compress"):
+                raw = decode_b64(image_b64)
+                img_body = cpu_executor.run(
+                    encode_jpeg,
+                    raw,
+                    settings.WP_IMAGE_QUALITY,
+                    settings.WP_IMAGE_MAX_DIMENSION,
+                )
+                del raw
 
-            r = requests.post(
-                media_url,
-                headers={
-                    "Content-Disposition": f"attachment; filename={image_name}",
-                    "Content-Type": "image/jpeg"
-                },
-                data=img_bytes,
-                auth=HTTPBasicAuth(user, app_pass),
-                timeout=90
-            )
+            with stage("wp_media_upload"):
+                r = wp_client.post(
+                    media_url,
+                    headers={
+                        "Content-Disposition": f"attachment; filename={image_name}",
+                        "Content-Type": "image/jpeg"
+                    },
+                    data=img_body,
+                    auth=HTTPBasicAuth(user, app_pass),
+                )
+            img_body.close()
 
             if r.status_code >= 400:
-                print("[WP Upload] Media upload failed:", r.status_code, r.text)
+                logger.warning("WP media upload failed: %s %s", r.status_code, r.text[:500])
                 r.raise_for_status()
 
             featured_media_id = r.json().get("id")
@@ -69,22 +81,28 @@ def upload_post(
         }
         if featured_media_id:
             post_payload["featured_media"] = featured_media_id
+        if categories:
+            post_payload["categories"] = categories
+        if tags:
+            post_payload["tags"] = tags
+        if author:
+            post_payload["author"] = author
 
-        pr = requests.post(
-            posts_url,
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(post_payload),
-            auth=HTTPBasicAuth(user, app_pass),
-            timeout=90
-        )
+        with stage("wp_post_create"):
+            pr = wp_client.post(
+                posts_url,
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(post_payload),
+                auth=HTTPBasicAuth(user, app_pass),
+            )
 
         if pr.status_code >= 400:
-            print("[WP Upload] Post creation failed:", pr.status_code, pr.text)
+            logger.warning("WP post creation failed: %s %s", pr.status_code, pr.text[:500])
             pr.raise_for_status()
 
         j = pr.json()
         return j.get("link") or j.get("guid", {}).get("rendered")
 
     except Exception as e:
-        print("[WP Upload] error:", e)
+        logger.exception("WP upload failed")
         return None
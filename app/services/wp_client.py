@@ -0,0 +1,146 @@
+# app/services/wp_client.py
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from app.core.config import settings
+
+# Statuses worth retrying. Non-idempotent calls (POST) only retry on 429,
+# because a 5xx after WordPress created the post would publish it twice.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _retry_after(resp: requests.Response) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date)"""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class WordPressClient:
+    """
+    Shared HTTP client for every WordPress REST call.
+
+    - one requests.Session → keep-alive connection pool per site host
+    - (connect, read) timeouts instead of a flat 90 s
+    - at most `max_per_host` requests in flight per host
+    - retry with exponential backoff + jitter on 429/5xx, honoring Retry-After
+      up to `max_delay` (a longer Retry-After returns the response instead of
+      parking the worker thread)
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float,
+        read_timeout: float,
+        max_per_host: int,
+        pool_hosts: int,
+        max_retries: int,
+        backoff: float,
+        max_delay: float,
+    ):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_per_host = max(1, max_per_host)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.max_delay = max(0.0, max_delay)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=self.max_per_host)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            sem = self._host_slots.get(host)
+            if sem is None:
+                sem = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return sem
+
+    def _delay(self, attempt: int, resp: requests.Response | None = None) -> float | None:
+        """Seconds to wait before the next attempt; None = the server asks for longer than max_delay"""
+        retry_after = _retry_after(resp) if resp is not None else None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return min(self.max_delay, self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Same signature as requests.request; `timeout` defaults to the
+        configured (connect, read) pair and `max_retries` to the client's.
+        Returns the final response; raises on network errors once retries
+        are used up.
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        max_retries = max(0, kwargs.pop("max_retries", self.max_retries))
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        retry_statuses = RETRY_STATUSES if idempotent else {429}
+        slot = self._slot(url)
+
+        # File-like bodies are streamed; rewind them before every attempt
+        body = kwargs.get("data")
+        body_start = body.tell() if hasattr(body, "seek") else None
+
+        for attempt in range(max_retries + 1):
+            last_try = attempt == max_retries
+            if body_start is not None:
+                body.seek(body_start)
+            try:
+                with slot:
+                    resp = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.ConnectTimeout:
+                # Never reached the server → safe to retry any method
+                if last_try:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            except requests.ConnectionError:
+                if last_try or not idempotent:
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+
+            if resp.status_code in retry_statuses and not last_try:
+                delay = self._delay(attempt, resp)
+                if delay is None:
+                    return resp  # give up now: the caller sees the 429 / 503
+                resp.close()
+                time.sleep(delay)
+                continue
+            return resp
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+# Shared client for the whole process
+wp_client = WordPressClient(
+    connect_timeout=settings.WP_CONNECT_TIMEOUT,
+    read_timeout=settings.WP_READ_TIMEOUT,
+    max_per_host=settings.WP_MAX_PER_HOST,
+    pool_hosts=settings.WP_POOL_HOSTS,
+    max_retries=settings.WP_MAX_RETRIES,
+    backoff=settings.WP_RETRY_BACKOFF,
+    max_delay=settings.WP_RETRY_MAX_DELAY,
+)
@@ -0,0 +1,361 @@
+# app/services/wp_meta.py
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from requests.auth import HTTPBasicAuth
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.models.site import WordPressSite
+from app.models.site_meta import WordPressSiteMeta
+from app.services.crypto import get_site_password
+from app.services.wp_client import wp_client
+
+logger = logging.getLogger("rankpost")
+
+# resource → (REST path with _fields projection, paginated)
+RESOURCES = {
+    "root": ("/wp-json/?_fields=name,description,url,home,namespaces,authentication", False),
+    "categories": ("/wp-json/wp/v2/categories?per_page=100&_fields=id,name,slug,parent", True),
+    "tags": ("/wp-json/wp/v2/tags?per_page=100&_fields=id,name,slug", True),
+    "users": ("/wp-json/wp/v2/users?per_page=100&_fields=id,name,slug", True),
+    "auth": ("/wp-json/wp/v2/users/me?context=edit&_fields=id,name,capabilities", False),
+}
+
+# Capabilities worth keeping from users/me (the full map has ~100 entries)
+CAPABILITIES = ("publish_posts", "edit_posts", "upload_files", "manage_categories", "list_users")
+
+# Term fields a publish request can name → cached resource
+TERM_RESOURCES = {"categories": "categories", "tags": "tags", "author": "users"}
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _aware(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive datetimes
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+# -------------------------
+# Fetching
+# -------------------------
+def _fetch(site: WordPressSite, auth: HTTPBasicAuth, resource: str, row: WordPressSiteMeta | None):
+    """
+    One (conditional) GET of a resource; returns (status, data, etag, last_modified).
+    data is None for 304 / errors. Paginated resources follow X-WP-TotalPages
+    up to WP_META_MAX_PAGES; their validators are not kept, because an ETag
+    only describes page 1.
+    """
+    path, paginated = RESOURCES[resource]
+    url = site.wp_url.rstrip("/") + path
+    timeout = (settings.WP_CONNECT_TIMEOUT, 15)
+
+    headers = {"Accept": "application/json"}
+    if row is not None and row.data is not None:
+        if row.etag:
+            headers["If-None-Match"] = row.etag
+        if row.last_modified:
+            headers["If-Modified-Since"] = row.last_modified
+
+    resp = wp_client.get(url, headers=headers, auth=auth, timeout=timeout)
+    etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+    if resp.status_code == 304:
+        return 304, None, etag or (row.etag if row else None), last_modified or (row.last_modified if row else None)
+
+    if resource == "auth" and resp.status_code == 401:
+        # A definite answer, not an error: the application password is not accepted.
+        # 403 is not: security plugins often block the users routes while posting works
+        try:
+            code = resp.json().get("code")
+        except ValueError:
+            code = None
+        return resp.status_code, {"valid": False, "status": resp.status_code, "code": code}, None, None
+    if resp.status_code != 200:
+        return resp.status_code, None, None, None
+
+    data = resp.json()
+    if resource == "auth":
+        caps = data.get("capabilities") or {}
+        data = {"valid": True, "id": data.get("id"), "name": data.get("name"),
+                "capabilities": {c: bool(caps.get(c)) for c in CAPABILITIES}}
+    elif paginated:
+        total_pages = int(resp.headers.get("X-WP-TotalPages") or 1)
+        if total_pages > 1:
+            etag = last_modified = None
+            for page in range(2, min(total_pages, settings.WP_META_MAX_PAGES) + 1):
+                more = wp_client.get(f"{url}&page={page}", headers={"Accept": "application/json"}, auth=auth, timeout=timeout)
+                if more.status_code != 200:
+                    break
+                data.extend(more.json())
+    return 200, data, etag, last_modified
+
+
+def refresh_site(db: Session, site: WordPressSite, resources=None, force: bool = False) -> dict[str, WordPressSiteMeta]:
+    """
+    Refresh the stale (or, with `force`, all) metadata rows of a site.
+    A 304 only extends the TTL; failures keep the previous data and are
+    retried after WP_META_ERROR_TTL. Blocking HTTP → call from a worker
+    thread. Caller commits.
+    """
+    now = _utcnow()
+    rows = {r.resource: r for r in db.scalars(select(WordPressSiteMeta).where(WordPressSiteMeta.site_id == site.id))}
+    auth = HTTPBasicAuth(site.wp_user, get_site_password(site))
+
+    for resource in resources or RESOURCES:
+        row = rows.get(resource)
+        if row is not None and not force and _aware(row.expires_at) > now:
+            continue
+        if row is None:
+            row = rows[resource] = WordPressSiteMeta(site_id=site.id, resource=resource)
+            db.add(row)
+
+        try:
+            status, data, etag, last_modified = _fetch(site, auth, resource, row)
+        except Exception as e:
+            logger.warning("WP meta %s %s failed: %s", site.wp_url, resource, e)
+            row.status_code, row.error = None, str(e)[:500]
+            row.expires_at = now + timedelta(seconds=settings.WP_META_ERROR_TTL)
+            continue
+
+        row.status_code = status
+        if status == 304 or data is not None:
+            if data is not None:
+                row.data = json.dumps(data)
+            row.etag, row.last_modified = etag, last_modified
+            row.fetched_at, row.error = now, None
+            ttl = settings.WP_META_TTL
+            if resource == "auth" and not data_of(row).get("valid"):
+                ttl = settings.WP_META_ERROR_TTL  # re-check rejected credentials soon
+        else:
+            row.error = f"HTTP {status}"
+            ttl = settings.WP_META_ERROR_TTL
+        row.expires_at = now + timedelta(seconds=ttl)
+
+    db.flush()
+    return rows
+
+
+def refresh_site_by_id(site_id: int, force: bool = False) -> bool:
+    """Own-session refresh for worker threads; False when the site no longer exists"""
+    db = SessionLocal()
+    try:
+        site = db.get(WordPressSite, site_id)
+        if site is None:
+            return False
+        refresh_site(db, site, force=force)
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()  # another process inserted the same rows first; its data is as good
+        return True
+    finally:
+        db.close()
+
+
+# -------------------------
+# Reading (no HTTP)
+# -------------------------
+def data_of(row: WordPressSiteMeta | None):
+    if row is None or row.data is None:
+        return {} if row is None or row.resource in ("root", "auth") else []
+    return json.loads(row.data)
+
+
+def site_meta(db: Session, site_id: int) -> dict[str, WordPressSiteMeta]:
+    return {r.resource: r for r in db.scalars(select(WordPressSiteMeta).where(WordPressSiteMeta.site_id == site_id))}
+
+
+def auth_rejected(db: Session, site_id: int) -> bool:
+    """True when the cached, still fresh auth check says WordPress rejects the app password"""
+    row = db.scalar(select(WordPressSiteMeta).where(
+        WordPressSiteMeta.site_id == site_id, WordPressSiteMeta.resource == "auth",
+    ))
+    if row is None or row.data is None or _aware(row.expires_at) <= _utcnow():
+        return False
+    return data_of(row).get("valid") is False
+
+
+# Validation causes that are a definite answer about the credentials
+_AUTH_CAUSES = {"ok", "unauthorized", "auth_header_stripped"}
+
+
+def store_auth_result(db: Session, site_id: int, result) -> None:
+    """
+    Record a credential check (wp_validation.WPValidation) in the cached
+    "auth" row, so publishes and GET /sites/{id}/meta see it without another
+    request. Network-level failures only note the error. Caller commits.
+    """
+    now = _utcnow()
+    row = db.scalar(select(WordPressSiteMeta).where(
+        WordPressSiteMeta.site_id == site_id, WordPressSiteMeta.resource == "auth",
+    ))
+    if row is None:
+        row = WordPressSiteMeta(site_id=site_id, resource="auth")
+        db.add(row)
+    row.status_code = result.status_code
+
+    if result.cause not in _AUTH_CAUSES:
+        row.error = result.message
+        row.expires_at = now + timedelta(seconds=settings.WP_META_ERROR_TTL)
+        db.flush()
+        return
+
+    previous = data_of(row) if row.data is not None else {}
+    if result.ok:
+        # Keep the capabilities from the last full refresh
+        data = {**previous, "valid": True, "id": result.wp_user_id}
+        # No capabilities yet → leave the row stale so the next refresh fetches them
+        ttl = settings.WP_META_TTL if "capabilities" in previous else 0
+    else:
+        data = {"valid": False, "status": result.status_code, "code": result.wp_code, "cause": result.cause}
+        ttl = settings.WP_META_ERROR_TTL
+    row.data = json.dumps(data)
+    row.error = None
+    row.fetched_at = now
+    row.expires_at = now + timedelta(seconds=ttl)
+    db.flush()
+
+
+def _match(items: list[dict], wanted) -> int | None:
+    """
+    Name or slug first (a tag called "2024" is a name, not term id 2024);
+    a digit string only counts as an id when that id is in the cache.
+    Real ints are ids.
+    """
+    if isinstance(wanted, int) and not isinstance(wanted, bool):
+        return wanted
+    key = str(wanted).strip().lower()
+    for item in items:
+        if key in (str(item.get("name", "")).lower(), str(item.get("slug", "")).lower()):
+            return item.get("id")
+    if key.isdigit() and any(item.get("id") == int(key) for item in items):
+        return int(key)
+    return None
+
+
+def resolve_terms(db: Session, site: WordPressSite, terms: dict | None) -> dict:
+    """
+    Map category / tag / author names (or slugs, or ids) to WordPress ids
+    from the cache: {"categories": [ids], "tags": [ids], "author": id}.
+    Only a resource that was never cached is fetched (once); unknown names
+    are skipped rather than created.
+    """
+    if not terms:
+        return {}
+    rows = site_meta(db, site.id)
+    missing = [TERM_RESOURCES[k] for k, v in terms.items() if v and k in TERM_RESOURCES and TERM_RESOURCES[k] not in rows]
+    if missing:
+        rows = refresh_site(db, site, resources=missing, force=True)
+
+    out: dict = {}
+    for field, resource in TERM_RESOURCES.items():
+        wanted = terms.get(field)
+        if not wanted:
+            continue
+        items = data_of(rows.get(resource))
+        if field == "author":
+            author = _match(items, wanted)
+            if author is not None:
+                out["author"] = author
+            continue
+        ids = [i for i in (_match(items, w) for w in wanted) if i is not None]
+        skipped = len(wanted) - len(ids)
+        if skipped:
+            logger.warning("WP meta %s: %d unknown %s skipped", site.wp_url, skipped, field)
+        if ids:
+            out[field] = list(dict.fromkeys(ids))
+    return out
+
+
+# -------------------------
+# Background refresher
+# -------------------------
+class SiteMetaRefresher:
+    """
+    One thread per API process: every WP_META_REFRESH_INTERVAL seconds it
+    refreshes sites with expired rows (or none yet), WP_META_BATCH_SIZE at a
+    time; `submit(site_id)` refreshes a site right away (e.g. just added).
+    Refreshes are conditional GETs, so several processes refreshing the same
+    site cost little.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = max(1, batch_size)
+        self._queue: queue.Queue[int | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="wp-meta-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, site_id: int):
+        if self._thread:
+            self._queue.put(site_id)
+
+    def _run(self):
+        # The scan is due on its own clock, so a steady stream of submits
+        # cannot postpone it indefinitely
+        last_scan = time.monotonic()
+        while True:
+            wait = max(0.0, self.interval - (time.monotonic() - last_scan))
+            try:
+                site_id = self._queue.get(timeout=wait)
+            except queue.Empty:
+                site_id = 0
+            if site_id is None:
+                break
+            try:
+                if site_id:
+                    refresh_site_by_id(site_id)
+            except Exception:
+                logger.exception("WP meta refresh failed (site %s)", site_id)
+            if time.monotonic() - last_scan >= self.interval:
+                last_scan = time.monotonic()
+                try:
+                    for sid in self.stale_sites():
+                        refresh_site_by_id(sid)
+                except Exception:
+                    logger.exception("WP meta refresh failed")
+
+    def stale_sites(self) -> list[int]:
+        db = SessionLocal()
+        try:
+            stale = list(db.scalars(
+                select(WordPressSiteMeta.site_id)
+                .where(WordPressSiteMeta.expires_at <= _utcnow())
+                .distinct()
+                .limit(self.batch_size)
+            ))
+            never = list(db.scalars(
+                select(WordPressSite.id)
+                .where(~exists().where(WordPressSiteMeta.site_id == WordPressSite.id))
+                .limit(self.batch_size)
+            ))
+            return list(dict.fromkeys(stale + never))[: self.batch_size]
+        finally:
+            db.close()
+
+
+# Shared refresher for the API process (started from app.main on startup)
+site_meta_refresher = SiteMetaRefresher(
+    interval=settings.WP_META_REFRESH_INTERVAL,
+    batch_size=settings.WP_META_BATCH_SIZE,
+)
@@ -0,0 +1,131 @@
+# app/services/wp_validation.py
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import requests
+from requests.auth import HTTPBasicAuth
+from app.core.config import settings
+from app.services.wp_client import wp_client
+
+logger = logging.getLogger("rankpost")
+
+# Smallest authenticated REST call: ~10 bytes of JSON ({"id": 1}), and it
+# only answers with the caller's id when the application password is valid
+VALIDATE_PATH = "/wp-json/wp/v2/users/me?context=edit&_fields=id"
+
+# cause → message shown to the user
+MESSAGES = {
+    "ok": "Connected",
+    "invalid_url": "The site URL is not valid",
+    "dns": "The domain does not resolve (DNS lookup failed)",
+    "tls": "The site's SSL/TLS certificate could not be verified",
+    "connect": "The site refused or dropped the connection",
+    "timeout": "The site did not answer in time",
+    "unauthorized": "WordPress rejected the username or application password",
+    "auth_header_stripped": "The server strips the Authorization header, so WordPress never saw the application password",
+    "forbidden": "The WordPress user may not use the REST API (missing permissions or a security plugin)",
+    "rest_disabled": "The WordPress REST API (/wp-json/) is disabled or not reachable",
+    "http_error": "The site answered with an unexpected HTTP error",
+}
+
+
+@dataclass
+class WPValidation:
+    ok: bool
+    cause: str                  # key of MESSAGES
+    message: str
+    status_code: int | None = None
+    wp_code: str | None = None  # WordPress error code, e.g. "incorrect_password"
+    wp_user_id: int | None = None
+    latency_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _result(cause: str, start: float, **kw) -> WPValidation:
+    return WPValidation(
+        ok=cause == "ok",
+        cause=cause,
+        message=MESSAGES[cause],
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
+        **kw,
+    )
+
+
+def _network_cause(exc: Exception) -> str:
+    """dns / tls / timeout / connect from a requests exception (urllib3 keeps the root cause in .reason)"""
+    if isinstance(exc, requests.exceptions.SSLError):
+        return "tls"
+    if isinstance(exc, requests.exceptions.Timeout):
+        return "timeout"
+    reason = exc.args[0] if exc.args else None
+    reason = getattr(reason, "reason", reason)
+    name = type(reason).__name__
+    text = str(reason)
+    if name == "NameResolutionError" or "Name or service not known" in text or "getaddrinfo failed" in text:
+        return "dns"
+    if "SSL" in name or "CERTIFICATE" in text.upper():
+        return "tls"
+    return "connect"
+
+
+def validate_site(wp_url: str, user: str, app_password: str) -> WPValidation:
+    """
+    Check a site + application password with one small authenticated GET.
+    Never raises; the cause tells DNS / TLS / connection / timeout / auth /
+    REST-disabled failures apart. Blocking → call from a worker thread.
+    """
+    start = time.perf_counter()
+    url = str(wp_url).rstrip("/")
+    if not url.startswith(("http://", "https://")):
+        return _result("invalid_url", start)
+
+    try:
+        resp = wp_client.get(
+            url + VALIDATE_PATH,
+            headers={"Accept": "application/json"},
+            auth=HTTPBasicAuth(user, app_password),
+            timeout=(settings.WP_CONNECT_TIMEOUT, settings.WP_VALIDATE_TIMEOUT),
+            max_retries=0,  # a validation should answer fast, not back off
+        )
+    except requests.exceptions.InvalidURL:
+        return _result("invalid_url", start)
+    except requests.exceptions.RequestException as e:
+        logger.warning("WP validation of %s failed: %s", url, e)
+        return _result(_network_cause(e), start)
+
+    status = resp.status_code
+    try:
+        body = resp.json()
+    except ValueError:
+        body = None
+    wp_code = body.get("code") if isinstance(body, dict) else None
+
+    if status == 200 and isinstance(body, dict) and "id" in body:
+        return _result("ok", start, status_code=status, wp_user_id=body["id"])
+    if body is None or wp_code in ("rest_no_route", "rest_disabled"):
+        # HTML / empty answer or no route: not a working WordPress REST API
+        return _result("rest_disabled", start, status_code=status, wp_code=wp_code)
+    if status == 401:
+        # rest_not_logged_in = the request arrived without credentials (Apache/CGI drop the header)
+        cause = "auth_header_stripped" if wp_code == "rest_not_logged_in" else "unauthorized"
+        return _result(cause, start, status_code=status, wp_code=wp_code)
+    if status == 403:
+        return _result("forbidden", start, status_code=status, wp_code=wp_code)
+    return _result("http_error", start, status_code=status, wp_code=wp_code)
+
+
+def validate_sites(sites: list[tuple[str, str, str]]) -> list[WPValidation]:
+    """
+    Validate many (wp_url, user, app_password) at once; checks run in
+    parallel (WP_VALIDATE_CONCURRENCY), so N sites take about as long as the
+    slowest one. Results are in input order.
+    """
+    if not sites:
+        return []
+    workers = max(1, min(len(sites), settings.WP_VALIDATE_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wp-validate") as pool:
+        return list(pool.map(lambda s: validate_site(*s), sites))
@@ -0,0 +1,81 @@
+# bench/compare.py
+# Compare two bench/run.py result files (e.g. main vs. a branch):
+#
+#   python bench/compare.py bench/results/before.json bench/results/after.json
+#   python bench/compare.py old.json new.json --threshold 10 --fail-on-regression
+#
+# Latency/RSS going up or throughput going down by more than --threshold
+# percent is flagged as a regression.
+
+import argparse
+import json
+import sys
+
+# metric → True when higher is better
+METRICS = {"rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+
+def _change(old, new) -> float | None:
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(old: dict, new: dict, threshold: float) -> tuple[list[str], int]:
+    lines, regressions = [], 0
+    lines.append(f"old: {old.get('commit')} {old.get('label', '')}  ({old.get('timestamp')})")
+    lines.append(f"new: {new.get('commit')} {new.get('label', '')}  ({new.get('timestamp')})\n")
+
+    for scenario, new_data in new["scenarios"].items():
+        old_data = old["scenarios"].get(scenario)
+        if not old_data:
+            continue
+        lines.append(f"▶ {scenario}")
+        lines.append(f"  {'endpoint':<14}{'metric':<9}{'old':>10}{'new':>10}{'change':>9}")
+
+        for endpoint, n in new_data["endpoints"].items():
+            o = old_data["endpoints"].get(endpoint)
+            if not o:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                pct = _change(o[metric], n[metric])
+                flag = ""
+                if pct is not None and (pct < -threshold if higher_is_better else pct > threshold):
+                    flag, regressions = "  ⚠️", regressions + 1
+                shown = "-" if pct is None else f"{pct:+.1f}%"
+                lines.append(f"  {endpoint:<14}{metric:<9}{o[metric]!s:>10}{n[metric]!s:>10}{shown:>9}{flag}")
+            if n["errors"] > o["errors"]:
+                lines.append(f"  {endpoint:<14}{'errors':<9}{o['errors']:>10}{n['errors']:>10}{'':>9}  ⚠️")
+                regressions += 1
+
+        pct = _change(old_data.get("peak_rss_mb"), new_data.get("peak_rss_mb"))
+        if pct is not None:
+            flag = "  ⚠️" if pct > threshold else ""
+            regressions += bool(flag)
+            lines.append(f"  {'peak RSS MB':<23}{old_data['peak_rss_mb']:>10}{new_data['peak_rss_mb']:>10}{pct:>+8.1f}%{flag}")
+        lines.append("")
+    return lines, regressions
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Compare two benchmark result files")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--threshold", type=float, default=10.0, help="percent change flagged as a regression")
+    p.add_argument("--fail-on-regression", action="store_true", help="exit 1 when anything regressed")
+    args = p.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    lines, regressions = compare(old, new, args.threshold)
+    print("\n".join(lines))
+    print(f"{regressions} regression(s) over {args.threshold:g}%")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
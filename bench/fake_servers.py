@@ -0,0 +1,247 @@
+# bench/fake_servers.py
+# Local stand-ins for the OpenAI API and a WordPress REST site, so the app can
+# be load-tested without network access or API spend. Latency, error rate and
+# payload size are configurable; both run on uvicorn in a background thread.
+
+import asyncio
+import base64
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 200.0     # mean response latency
+    jitter: float = 0.5           # ± fraction of latency (uniform)
+    error_rate: float = 0.0       # share of requests answered with an error
+    article_words: int = 1400     # generated article size
+    image_px: int = 1024          # generated image is image_px × image_px
+    stream_chunks: int = 200      # chunks per streamed completion
+
+
+async def _delay(cfg: FakeConfig):
+    if cfg.latency_ms > 0:
+        factor = 1 + random.uniform(-cfg.jitter, cfg.jitter)
+        await asyncio.sleep(max(0.0, cfg.latency_ms * factor) / 1000)
+
+
+def _fail(cfg: FakeConfig) -> bool:
+    return cfg.error_rate > 0 and random.random() < cfg.error_rate
+
+
+# -------------------------
+# Fake OpenAI
+# -------------------------
+def _article_json(keyword: str, words: int) -> str:
+    paragraph = " ".join(["lorem"] * 60)
+    blocks, count = [], 0
+    while count < words:
+        blocks.append(f"<h2>{keyword} section {len(blocks) + 1}</h2><p>{paragraph}</p>")
+        count += 62
+    return json.dumps({"title": f"Guide to {keyword}", "content": "\n".join(blocks)})
+
+
+def _image_b64(px: int) -> str:
+    from PIL import Image
+
+    # Noise, so JPEG encoding costs what a real photo would
+    img = Image.frombytes("RGB", (px, px), random.randbytes(px * px * 3))
+    buf = io.BytesIO()
+    img.save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def openai_app(cfg: FakeConfig) -> Starlette:
+    image = _image_b64(cfg.image_px)  # built once, reused for every request
+    stats = {"chat": 0, "images": 0, "errors": 0}
+
+    async def chat(request: Request):
+        body = await request.json()
+        stats["chat"] += 1
+        await _delay(cfg)
+        if _fail(cfg):
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "fake overload", "type": "server_error"}},
+                                status_code=429, headers={"retry-after": "1"})
+
+        prompt = body["messages"][-1]["content"]
+        keyword = prompt.split('topic: "', 1)[-1].split('"', 1)[0][:60]
+        answer = _article_json(keyword, cfg.article_words)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(answer) // 4,
+                 "total_tokens": len(prompt) // 4 + len(answer) // 4}
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            size = max(1, len(answer) // cfg.stream_chunks)
+            for i in range(0, len(answer), size):
+                chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": answer[i:i + size]}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0)
+            tail = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                    "choices": [], "usage": usage}
+            yield f"data: {json.dumps(tail)}\n\ndata: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def images(request: Request):
+        stats["images"] += 1
+        await _delay(cfg)
+        if _fail(cfg):
+            stats["errors"] += 1
+            return JSONResponse({"error": {"message": "fake failure", "type": "server_error"}}, status_code=500)
+        return JSONResponse({"created": int(time.time()), "data": [{"b64_json": image}]})
+
+    async def get_stats(request: Request):
+        return JSONResponse(stats)
+
+    return Starlette(routes=[
+        Route("/v1/chat/completions", chat, methods=["POST"]),
+        Route("/v1/images/generations", images, methods=["POST"]),
+        Route("/stats", get_stats),
+    ])
+
+
+# -------------------------
+# Fake WordPress
+# -------------------------
+def wordpress_app(cfg: FakeConfig) -> Starlette:
+    state = {"next_id": 1, "media": 0, "posts": 0, "media_bytes": 0, "errors": 0, "not_modified": 0}
+    terms = {
+        "categories": [{"id": i, "name": f"Category {i}", "slug": f"category-{i}", "parent": 0} for i in range(1, 21)],
+        "tags": [{"id": 100 + i, "name": f"Tag {i}", "slug": f"tag-{i}"} for i in range(1, 51)],
+        "users": [{"id": 1, "name": "Bench Author", "slug": "bench"}],
+    }
+
+    def new_id() -> int:
+        state["next_id"] += 1
+        return state["next_id"]
+
+    async def media(request: Request):
+        body = await request.body()
+        await _delay(cfg)
+        if _fail(cfg):
+            state["errors"] += 1
+            return JSONResponse({"code": "fake_error"}, status_code=503)
+        state["media"] += 1
+        state["media_bytes"] += len(body)
+        return JSONResponse({"id": new_id(), "source_url": "http://fake-wp/media.jpg"}, status_code=201)
+
+    async def posts(request: Request):
+        if request.method == "GET":
+            return JSONResponse([])
+        body = await request.json()
+        await _delay(cfg)
+        if _fail(cfg):
+            state["errors"] += 1
+            return JSONResponse({"code": "fake_error"}, status_code=503)
+        state["posts"] += 1
+        state["last_post"] = {k: body.get(k) for k in ("categories", "tags", "author", "featured_media")}
+        post_id = new_id()
+        return JSONResponse({"id": post_id, "link": f"http://fake-wp/?p={post_id}"}, status_code=201)
+
+    def term_list(kind: str):
+        async def handler(request: Request):
+            # Fixed data → constant ETag, so conditional refreshes get 304
+            etag = f'"{kind}-v1"'
+            if request.headers.get("if-none-match") == etag:
+                state["not_modified"] += 1
+                return Response(status_code=304, headers={"ETag": etag})
+            return JSONResponse(terms[kind], headers={"ETag": etag, "X-WP-Total": str(len(terms[kind])), "X-WP-TotalPages": "1"})
+        return handler
+
+    async def users_me(request: Request):
+        if not request.headers.get("authorization"):
+            return JSONResponse({"code": "rest_not_logged_in"}, status_code=401)
+        return JSONResponse({"id": 1, "name": "Bench Author", "capabilities": {"publish_posts": True, "upload_files": True}})
+
+    async def root(request: Request):
+        return JSONResponse({"name": "Fake WP", "namespaces": ["wp/v2"]})
+
+    async def get_stats(request: Request):
+        return JSONResponse(state)
+
+    return Starlette(routes=[
+        Route("/wp-json/", root),
+        Route("/wp-json/wp/v2/media", media, methods=["POST"]),
+        Route("/wp-json/wp/v2/posts", posts, methods=["GET", "POST"]),
+        Route("/wp-json/wp/v2/categories", term_list("categories")),
+        Route("/wp-json/wp/v2/tags", term_list("tags")),
+        Route("/wp-json/wp/v2/users", term_list("users")),
+        Route("/wp-json/wp/v2/users/me", users_me),
+        Route("/stats", get_stats),
+    ])
+
+
+# -------------------------
+# Runner
+# -------------------------
+class BackgroundServer:
+    """uvicorn in a daemon thread; `url` is ready once start() returns"""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.config = uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False, lifespan="off")
+        self.server = uvicorn.Server(self.config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.url = ""
+
+    def start(self, timeout: float = 10.0) -> "BackgroundServer":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake server did not start")
+            time.sleep(0.02)
+        sock = self.server.servers[0].sockets[0]
+        host, port = sock.getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(5)
+
+
+def stats_of(url: str) -> dict:
+    import httpx
+    try:
+        return httpx.get(url + "/stats", timeout=5).json()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    # Run both stand-ins on fixed ports for manual testing
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the fake OpenAI + WordPress servers")
+    parser.add_argument("--openai-port", type=int, default=8901)
+    parser.add_argument("--wp-port", type=int, default=8902)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    cfg = FakeConfig(latency_ms=args.latency_ms, error_rate=args.error_rate)
+    oa = BackgroundServer(openai_app(cfg), port=args.openai_port).start()
+    wp = BackgroundServer(wordpress_app(cfg), port=args.wp_port).start()
+    print(f"OpenAI:    {oa.url}/v1   (OPENAI_BASE_URL)")
+    print(f"WordPress: {wp.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
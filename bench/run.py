@@ -0,0 +1,468 @@
+# bench/run.py
+# Load-test / benchmark runner.
+#
+# Boots the real app (uvicorn subprocess, fresh SQLite DB migrated with
+# Alembic) against the local fake OpenAI + WordPress servers, drives traffic
+# at a fixed concurrency and reports per endpoint: throughput, p50/p95/p99
+# latency, errors and the app's peak RSS. Results are saved as JSON so two
+# commits can be compared with bench/compare.py.
+#
+#   python bench/run.py                          # every scenario, 20s each
+#   python bench/run.py --scenario mix --duration 60 --concurrency 64
+#   python bench/run.py --openai-latency-ms 2000 --error-rate 0.05
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.fake_servers import BackgroundServer, FakeConfig, openai_app, stats_of, wordpress_app  # noqa: E402
+
+PASSWORD = "bench-password-123"
+
+# Weights of the realistic "mix" scenario (per request picked)
+MIX = {"signup": 1, "login": 3, "refresh": 3, "list_posts": 10, "publish": 1}
+SCENARIOS = ["signup", "login", "refresh", "list_posts", "publish", "mix"]
+
+
+# -------------------------
+# Measurements
+# -------------------------
+class Recorder:
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.error_kinds: dict[str, dict[str, int]] = {}
+
+    def ok(self, name: str, seconds: float):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def fail(self, name: str, kind: str):
+        self.errors[name] = self.errors.get(name, 0) + 1
+        kinds = self.error_kinds.setdefault(name, {})
+        kinds[kind] = kinds.get(kind, 0) + 1
+
+    def report(self, elapsed: float) -> dict:
+        out = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            values = sorted(self.samples.get(name, []))
+            errors = self.errors.get(name, 0)
+            out[name] = {
+                "count": len(values),
+                "errors": errors,
+                "error_kinds": self.error_kinds.get(name, {}),
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": _ms(_percentile(values, 50)),
+                "p95_ms": _ms(_percentile(values, 95)),
+                "p99_ms": _ms(_percentile(values, 99)),
+                "max_ms": _ms(values[-1] if values else None),
+                "mean_ms": _ms(sum(values) / len(values) if values else None),
+            }
+        return out
+
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _proc_kb(pid: int, field: str) -> int | None:
+    """VmRSS / VmHWM of a process in kB (Linux /proc; None elsewhere)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler:
+    """Polls the app's RSS while a scenario runs; keeps the peak"""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak_kb = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            rss = _proc_kb(self.pid, "VmRSS")
+            if rss:
+                self.peak_kb = max(self.peak_kb, rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> float | None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return round(self.peak_kb / 1024, 1) if self.peak_kb else None
+
+
+# -------------------------
+# Virtual users
+# -------------------------
+class Account:
+    """One bench user; each worker owns one so refresh-token rotation never races"""
+
+    def __init__(self, email: str):
+        self.email = email
+        self.access = ""
+        self.refresh = ""
+        self.site_id = None
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access}"}
+
+    def set_tokens(self, data: dict):
+        self.access = data["access_token"]
+        self.refresh = data["refresh_token"]
+
+
+class Runner:
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, args):
+        self.client = client
+        self.rec = recorder
+        self.args = args
+        self._signups = 0
+
+    async def _timed(self, name: str, method: str, url: str, expect: tuple = (200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.rec.fail(name, type(e).__name__)
+            return None
+        elapsed = time.perf_counter() - start
+        if resp.status_code not in expect:
+            self.rec.fail(name, str(resp.status_code))
+            return None
+        self.rec.ok(name, elapsed)
+        return resp
+
+    # ---- operations ----
+    async def signup(self, account: Account | None = None) -> Account | None:
+        self._signups += 1
+        account = account or Account(f"bench-{os.getpid()}-{self._signups}-{random.getrandbits(32):x}@example.com")
+        resp = await self._timed("signup", "POST", "/api/v1/auth/signup", expect=(201,),
+                                 json={"email": account.email, "password": PASSWORD})
+        if resp is None:
+            return None
+        account.set_tokens(resp.json())
+        return account
+
+    async def login(self, account: Account):
+        resp = await self._timed("login", "POST", "/api/v1/auth/login",
+                                 json={"email": account.email, "password": PASSWORD})
+        if resp is not None:
+            account.set_tokens(resp.json())
+
+    async def refresh(self, account: Account):
+        resp = await self._timed("refresh", "POST", "/api/v1/auth/refresh", json={"refresh_token": account.refresh})
+        if resp is not None:
+            account.set_tokens(resp.json())
+
+    async def list_posts(self, account: Account):
+        await self._timed("list_posts", "GET", "/api/v1/posts/", params={"limit": 20}, headers=account.headers)
+
+    async def publish(self, account: Account):
+        """auto-publish (202) timed on its own, plus the end-to-end time until the job finishes"""
+        start = time.perf_counter()
+        resp = await self._timed(
+            "publish", "POST", "/api/v1/content/auto-publish", expect=(202,), headers=account.headers,
+            json={
+                "site_id": account.site_id,
+                "keyword": f"bench keyword {random.randrange(self.args.keywords)}",
+                "style": "formal",
+                "with_image": self.args.with_image,
+                "use_cache": self.args.use_cache,
+            },
+        )
+        if resp is None:
+            return
+        status_url = resp.json()["status_url"]
+        deadline = start + self.args.job_timeout
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(self.args.poll_interval)
+            try:
+                job = await self.client.get(status_url, headers=account.headers)
+            except httpx.HTTPError as e:
+                self.rec.fail("publish_e2e", type(e).__name__)
+                return
+            if job.status_code != 200:
+                continue
+            status = job.json()["status"]
+            if status == "succeeded":
+                self.rec.ok("publish_e2e", time.perf_counter() - start)
+                return
+            if status == "failed":
+                self.rec.fail("publish_e2e", "job_failed")
+                return
+        self.rec.fail("publish_e2e", "timeout")
+
+    async def run_op(self, op: str, account: Account):
+        if op == "signup":
+            await self.signup()
+        else:
+            await getattr(self, op)(account)
+
+
+async def _worker(runner: Runner, account: Account, scenario: str, stop_at: float):
+    ops, weights = list(MIX), list(MIX.values())
+    while time.perf_counter() < stop_at:
+        op = random.choices(ops, weights)[0] if scenario == "mix" else scenario
+        await runner.run_op(op, account)
+
+
+# -------------------------
+# App under test
+# -------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _app_env(args, workdir: Path, openai_url: str) -> dict:
+    from cryptography.fernet import Fernet
+
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{workdir / 'bench.db'}",
+        "JWT_SECRET": "bench-secret",
+        "FERNET_KEY_BASE64": Fernet.generate_key().decode(),
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": openai_url + "/v1",
+        "OPENAI_RATE_STORE": "",
+        "DEBUG": "false",
+        "PYTHONPATH": str(ROOT),
+    })
+    env.update(dict(kv.split("=", 1) for kv in args.env))  # --env KEY=VALUE overrides
+    return env
+
+
+def _start_app(env: dict, port: int, log_path: Path) -> subprocess.Popen:
+    migrate = subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, env=env,
+                             capture_output=True, text=True)
+    if migrate.returncode:
+        raise RuntimeError("alembic upgrade failed:\n" + migrate.stderr)
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app exited with code {proc.returncode}")
+        try:
+            if httpx.get(url + "/", timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("app did not become ready")
+
+
+def _grant_credits(database_url: str, emails: list[str], credits: int):
+    """Top up bench accounts directly in the DB (signup only grants a trial)"""
+    from sqlalchemy import bindparam, create_engine, text
+
+    # Plain sync URL; importing app.core.db would need the app's settings here
+    if database_url.startswith("postgres://"):
+        database_url = "postgresql://" + database_url[len("postgres://"):]
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        conn.execute(
+            text("UPDATE users SET credits = :credits WHERE email IN :emails").bindparams(bindparam("emails", expanding=True)),
+            {"credits": credits, "emails": emails},
+        )
+    engine.dispose()
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -------------------------
+# Main
+# -------------------------
+async def _bench(args, app_url: str, app_pid: int, env: dict, wp_url: str) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=app_url, limits=limits, timeout=args.request_timeout) as client:
+        setup = Runner(client, Recorder(), args)
+
+        # One account per worker, each with a site pointing at the fake WordPress
+        accounts = []
+        for i in range(args.concurrency):
+            account = await setup.signup(Account(f"bench-user-{i}@example.com"))
+            if account is None:
+                raise RuntimeError(f"signup failed during setup: {setup.rec.error_kinds}")
+            resp = await client.post("/api/v1/sites/add", headers=account.headers, json={
+                "wp_url": wp_url, "wp_user": "bench", "wp_app_pass_enc": "bench pass",
+                "style": "formal", "site_name": f"Bench {i}",
+            })
+            resp.raise_for_status()
+            account.site_id = resp.json()["id"]
+            accounts.append(account)
+        await asyncio.to_thread(_grant_credits, env["DATABASE_URL"], [a.email for a in accounts], 1_000_000)
+
+        scenarios = {}
+        for scenario in args.scenario:
+            recorder = Recorder()
+            runner = Runner(client, recorder, args)
+            sampler = RssSampler(app_pid)
+            sampler.start()
+            print(f"▶ {scenario}: {args.concurrency} workers × {args.duration}s", flush=True)
+
+            start = time.perf_counter()
+            stop_at = start + args.duration
+            await asyncio.gather(*(_worker(runner, a, scenario, stop_at) for a in accounts))
+            elapsed = time.perf_counter() - start
+
+            scenarios[scenario] = {
+                "elapsed_s": round(elapsed, 2),
+                "peak_rss_mb": await sampler.stop(),
+                "endpoints": recorder.report(elapsed),
+            }
+            _print_scenario(scenario, scenarios[scenario])
+        return scenarios
+
+
+def _print_scenario(name: str, data: dict):
+    print(f"  {'endpoint':<14}{'count':>8}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}   (ms)")
+    for endpoint, s in data["endpoints"].items():
+        cells = [s["p50_ms"], s["p95_ms"], s["p99_ms"], s["max_ms"]]
+        lat = "".join(f"{'-' if v is None else round(v, 1):>9}" for v in cells)
+        print(f"  {endpoint:<14}{s['count']:>8}{s['errors']:>6}{s['rps']:>9}{lat}")
+    print(f"  peak RSS: {data['peak_rss_mb']} MB\n", flush=True)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark RankPost against local OpenAI / WordPress stand-ins")
+    p.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    p.add_argument("--duration", type=float, default=20, help="seconds per scenario")
+    p.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    p.add_argument("--openai-latency-ms", type=float, default=500)
+    p.add_argument("--wp-latency-ms", type=float, default=100)
+    p.add_argument("--jitter", type=float, default=0.5, help="± fraction of latency")
+    p.add_argument("--error-rate", type=float, default=0.0, help="share of fake OpenAI/WP calls that fail")
+    p.add_argument("--article-words", type=int, default=1400)
+    p.add_argument("--image-px", type=int, default=1024)
+    p.add_argument("--with-image", action=argparse.BooleanOptionalAction, default=True)
+    p.add_argument("--use-cache", action=argparse.BooleanOptionalAction, default=False)
+    p.add_argument("--keywords", type=int, default=1000, help="distinct keywords used by publish")
+    p.add_argument("--job-timeout", type=float, default=120)
+    p.add_argument("--poll-interval", type=float, default=0.25)
+    p.add_argument("--request-timeout", type=float, default=30)
+    p.add_argument("--database-url", default="", help="default: a fresh SQLite file in a temp dir")
+    p.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra app setting (repeatable)")
+    p.add_argument("--app-url", default="", help="benchmark an already running app instead of starting one")
+    p.add_argument("--label", default="", help="free-form tag stored in the result")
+    p.add_argument("--output", default="", help="result JSON path (default bench/results/<time>-<commit>.json)")
+    p.add_argument("--seed", type=int, default=None)
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    openai_cfg = FakeConfig(latency_ms=args.openai_latency_ms, jitter=args.jitter, error_rate=args.error_rate,
+                            article_words=args.article_words, image_px=args.image_px)
+    wp_cfg = FakeConfig(latency_ms=args.wp_latency_ms, jitter=args.jitter, error_rate=args.error_rate)
+    fake_openai = BackgroundServer(openai_app(openai_cfg)).start()
+    fake_wp = BackgroundServer(wordpress_app(wp_cfg)).start()
+
+    workdir = Path(tempfile.mkdtemp(prefix="rankpost-bench-"))
+    env = _app_env(args, workdir, fake_openai.url)
+    proc = None
+    try:
+        if args.app_url:
+            app_url, app_pid = args.app_url.rstrip("/"), None
+        else:
+            port = _free_port()
+            app_url = f"http://127.0.0.1:{port}"
+            proc = _start_app(env, port, workdir / "app.log")
+            _wait_ready(app_url, proc)
+            app_pid = proc.pid
+
+        scenarios = asyncio.run(_bench(args, app_url, app_pid or 0, env, fake_wp.url))
+
+        result = {
+            "commit": _git_commit(),
+            "label": args.label,
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "host": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "env")} | {"env": args.env},
+            "scenarios": scenarios,
+            "app_peak_rss_mb": round(hwm / 1024, 1) if app_pid and (hwm := _proc_kb(app_pid, "VmHWM")) else None,
+            "fakes": {"openai": stats_of(fake_openai.url), "wordpress": stats_of(fake_wp.url)},
+        }
+
+        output = Path(args.output) if args.output else (
+            ROOT / "bench" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}-{result['commit'] or 'nogit'}.json"
+        )
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(result, indent=2))
+        print(f"✅ Results saved to {output}")
+    except Exception:
+        log = workdir / "app.log"
+        if log.exists():
+            print("---- app log (tail) ----\n" + "".join(log.read_text().splitlines(True)[-40:]), file=sys.stderr)
+        raise
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        fake_openai.stop()
+        fake_wp.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
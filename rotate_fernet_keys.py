@@ -0,0 +1,17 @@
+# rotate_fernet_keys.py
+# Re-encrypt every stored WordPress app password with the current
+# FERNET_KEY_BASE64 (old keys must still be listed in FERNET_OLD_KEYS).
+from app.main import app  # noqa: F401  (loads all models)
+from app.core.db import SessionLocal
+from app.models.site import WordPressSite
+from app.services.crypto import rotate_text
+
+db = SessionLocal()
+
+sites = db.query(WordPressSite).all()
+for site in sites:
+    site.wp_app_pass_enc = rotate_text(site.wp_app_pass_enc)
+db.commit()
+print(f"✅ Re-encrypted {len(sites)} site password(s) with the current key.")
+
+db.close()
@@ -0,0 +1,59 @@
+# startup_trace.py
+# Import-time profile of the app: which modules make `import app.main` slow.
+#   python startup_trace.py                 # top 25 modules by cumulative time
+#   python startup_trace.py --top 50 --json # machine readable
+#   python startup_trace.py --module app.services.openai_client
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+parser = argparse.ArgumentParser(description="Trace import time of the FastAPI app")
+parser.add_argument("--module", default="app.main", help="module to import (default: app.main)")
+parser.add_argument("--top", type=int, default=25, help="how many modules to show")
+parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+args = parser.parse_args()
+
+# Fresh interpreter so nothing is already in sys.modules
+start = time.perf_counter()
+proc = subprocess.run(
+    [sys.executable, "-X", "importtime", "-c", f"import {args.module}"],
+    capture_output=True, text=True,
+)
+wall_ms = (time.perf_counter() - start) * 1000
+
+if proc.returncode != 0:
+    # -X importtime writes to stderr too; show only the traceback part
+    print("❌ Import failed:")
+    print("\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:")))
+    sys.exit(1)
+
+# Lines look like: "import time:       self [us] |  cumulative | imported package"
+rows = []
+for line in proc.stderr.splitlines():
+    if not line.startswith("import time:") or "self [us]" in line:
+        continue
+    self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+    rows.append({
+        "module": name.strip(),
+        "self_ms": int(self_us) / 1000,
+        "cumulative_ms": int(cumulative_us) / 1000,
+    })
+
+rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+imports_ms = max((r["cumulative_ms"] for r in rows if r["module"] == args.module), default=0.0)
+
+if args.json:
+    print(json.dumps({
+        "module": args.module,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": imports_ms,
+        "modules_loaded": len(rows),
+        "top": rows[:args.top],
+    }, indent=2))
+else:
+    print(f"⏱  import {args.module}: {imports_ms:.1f} ms (process wall {wall_ms:.1f} ms, {len(rows)} modules)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for r in rows[:args.top]:
+        print(f"{r['cumulative_ms']:>14.1f} {r['self_ms']:>9.1f}  {r['module']}")
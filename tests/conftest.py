@@ -0,0 +1,46 @@
+# Test settings: a throw-away SQLite database migrated with alembic, no real
+# OpenAI / WordPress traffic. Must run before anything imports app.core.config.
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+_tmp = tempfile.mkdtemp(prefix="rankpost-tests-")
+
+os.environ.setdefault("JWT_SECRET", "test-secret")
+os.environ.setdefault("FERNET_KEY_BASE64", "oV0Vt3N1c4KX1tqvYQ2u8Xvq9r3b8wq0Xk3w1o0ZQ2M=")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("CPU_POOL_WORKERS", "0")
+os.environ.setdefault("SCHEDULER_ENABLED", "false")
+os.environ.setdefault("WP_META_REFRESH_INTERVAL", "0")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _migrated_db():
+    subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=ROOT, check=True, capture_output=True)
+    yield
+
+
+@pytest.fixture(scope="session")
+def client(_migrated_db):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Signs up a fresh user; returns (headers, user_id)"""
+    import uuid
+
+    email = f"{uuid.uuid4().hex[:12]}@example.com"
+    token = client.post("/api/v1/auth/signup", json={"email": email, "password": "pw123456"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    return headers, client.get("/api/v1/users/me", headers=headers).json()["id"]
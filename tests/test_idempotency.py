@@ -0,0 +1,62 @@
+import app.routers.content as content
+from app.core.db import SessionLocal
+from app.models.site import WordPressSite
+from app.services.crypto import encrypt_text
+from app.services.idempotency import add_key, request_fingerprint
+from app.services.job_queue import new_job_id
+
+
+def _site(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        site = WordPressSite(user_id=user_id, wp_url="https://wp.test", wp_user="u", wp_app_pass_enc=encrypt_text("p"))
+        db.add(site)
+        db.commit()
+        return site.id
+    finally:
+        db.close()
+
+
+def _body(site_id: int, keyword: str) -> dict:
+    return {"keyword": keyword, "site_id": site_id, "with_image": False}
+
+
+def test_reused_key_with_different_body_is_422(client, auth_headers):
+    headers, user_id = auth_headers
+    site_id = _site(user_id)
+    headers = {**headers, "Idempotency-Key": "same-key"}
+    db = SessionLocal()
+    add_key(db, user_id, "same-key", request_fingerprint(content.AutoPublishRequest(**_body(site_id, "a")).model_dump()), new_job_id())
+    db.commit()
+    db.close()
+
+    r = client.post("/api/v1/content/auto-publish", json=_body(site_id, "b"), headers=headers)
+    assert r.status_code == 422
+
+
+def test_race_lost_with_different_body_is_422(client, auth_headers, monkeypatch):
+    """
+    Two requests with one key and different bodies: the loser passed the
+    first lookup before the winner committed, then hits the unique
+    constraint. It must get 422, not 500.
+    """
+    headers, user_id = auth_headers
+    site_id = _site(user_id)
+    headers = {**headers, "Idempotency-Key": "race-key"}
+
+    real_find_key = content.find_key
+    calls = []
+
+    def find_key(db, uid, key, request_hash):
+        calls.append(key)
+        if len(calls) == 1:
+            # The winner commits right after our first lookup saw nothing
+            add_key(db, uid, key, request_fingerprint(content.AutoPublishRequest(**_body(site_id, "winner")).model_dump()), new_job_id())
+            db.commit()
+            return None
+        return real_find_key(db, uid, key, request_hash)
+
+    monkeypatch.setattr(content, "find_key", find_key)
+    r = client.post("/api/v1/content/auto-publish", json=_body(site_id, "loser"), headers=headers)
+    assert r.status_code == 422
+    assert len(calls) == 2  # went through the IntegrityError branch
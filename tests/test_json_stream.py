@@ -0,0 +1,34 @@
+from app.services.json_stream import ArticleStreamParser, parse_article
+
+ANSWER = '```json\n{"title": "Best Shoes", "content": "<p>One</p><p>Two \\u00e9</p>"}\n```'
+
+
+def test_complete_answer():
+    assert parse_article(ANSWER) == {"title": "Best Shoes", "content": "<p>One</p><p>Two é</p>"}
+
+
+def test_truncated_answer_is_rejected():
+    # Cut off at max_tokens: no closing quote / brace
+    cut = ANSWER.index("Two")
+    assert parse_article(ANSWER[:cut]) is None
+    # Closing quote but no closing brace
+    assert parse_article('{"title": "T", "content": "<p>x</p>"') is None
+
+
+def test_missing_field_is_rejected():
+    assert parse_article('{"title": "T"}') is None
+    assert parse_article('{"title": "T", "content": ""}') is None
+
+
+def test_stream_chunks_and_truncation():
+    parser = ArticleStreamParser()
+    events = []
+    for i in range(0, len(ANSWER), 7):
+        events += parser.feed(ANSWER[i:i + 7])
+    assert "".join(t for f, t in events if f == "content") == "<p>One</p><p>Two é</p>"
+    assert parser.article() == {"title": "Best Shoes", "content": "<p>One</p><p>Two é</p>"}
+
+    truncated = ArticleStreamParser()
+    truncated.feed(ANSWER[:40])
+    assert truncated.result()["title"] == "Best Shoes"  # partial text is still visible
+    assert truncated.article() is None
@@ -0,0 +1,30 @@
+import base64
+import io
+import pickle
+
+from PIL import Image
+
+from app.services.media import decode_b64, encode_jpeg
+
+
+def _png_b64(size=(64, 48)) -> str:
+    buf = io.BytesIO()
+    Image.new("RGBA", size, (200, 40, 40, 255)).save(buf, "PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def test_decode_matches_b64decode():
+    for n in range(0, 10):
+        data = bytes(range(n)) * 7
+        b64 = base64.b64encode(data).decode()
+        assert decode_b64(b64) == data
+        assert decode_b64(base64.encodebytes(data).decode()) == data
+
+
+def test_raw_bytes_survive_the_trip_to_a_pool_process():
+    raw = decode_b64(_png_b64())
+    # what ProcessPoolExecutor does with the argument
+    out = encode_jpeg(pickle.loads(pickle.dumps(raw)), 80, 32)
+    img = Image.open(out)
+    assert img.format == "JPEG"
+    assert max(img.size) == 32
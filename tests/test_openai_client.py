@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+import app.services.openai_client as openai_client
+from app.core.config import settings
+from app.services.openai_gateway import openai_gateway
+
+
+def test_stage_budget_leaves_room_for_gateway_retries(monkeypatch):
+    """A call that times out once must be retried, not cancelled by the stage deadline"""
+    monkeypatch.setattr(settings, "OPENAI_IMAGE_TIMEOUT", 0.2)
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "OPENAI_BACKOFF_MAX", 0.05)
+    monkeypatch.setattr(settings, "OPENAI_STAGE_TIMEOUT", 0)
+    monkeypatch.setattr(openai_gateway, "max_retries", 2)
+    monkeypatch.setattr(openai_gateway, "backoff_base", 0.01)
+    monkeypatch.setattr(openai_gateway, "backoff_max", 0.05)
+
+    calls = []
+
+    async def generate(timeout, **kwargs):
+        calls.append(timeout)
+        if len(calls) == 1:
+            await asyncio.sleep(timeout)  # what httpx does before raising
+            raise httpx.ReadTimeout("timed out")
+        return SimpleNamespace(data=[SimpleNamespace(b64_json="aW1n")])
+
+    fake = SimpleNamespace(images=SimpleNamespace(generate=generate))
+    monkeypatch.setattr(openai_client, "get_client", lambda: fake)
+
+    usage: list = []
+    article, image_b64, _ = asyncio.run(
+        openai_client.generate_article_and_image_async("kw", article={"title": "T", "content": "C"}, usage=usage)
+    )
+    assert image_b64 == "aW1n"
+    assert len(calls) == 2
+    assert usage[0]["retries"] == 1
+
+
+def test_stage_budget_setting_overrides(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_STAGE_TIMEOUT", 42)
+    assert openai_client.stage_budget(120) == 42
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from app.services.openai_gateway import OpenAIGateway
+
+
+def _gateway(max_concurrency: int) -> OpenAIGateway:
+    return OpenAIGateway(rpm=0, tpm=0, max_concurrency=max_concurrency, max_retries=0, backoff_base=0.01, backoff_max=0.1)
+
+
+def test_concurrency_cap_is_shared_by_all_event_loops():
+    gateway = _gateway(3)
+    lock = threading.Lock()
+    state = {"now": 0, "peak": 0}
+
+    async def work():
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        await asyncio.sleep(0.02)
+        with lock:
+            state["now"] -= 1
+        return 1
+
+    async def batch():
+        return await asyncio.gather(*[gateway.call_async(work) for _ in range(8)])
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(batch()))) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [sum(r) for r in results] == [8, 8]
+    assert state["peak"] == 3
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    gateway = _gateway(1)
+
+    async def main():
+        slot = gateway.async_slot()
+        await slot.acquire()
+        waiter = asyncio.create_task(slot.acquire())
+        await asyncio.sleep(0)
+        slot.release()      # hands the slot to the waiter ...
+        waiter.cancel()     # ... which is cancelled before it runs
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        await asyncio.wait_for(slot.acquire(), 1)  # the slot was passed on, not lost
+        slot.release()
+
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core.db import SessionLocal
+from app.models.post import GeneratedPost
+from app.models.site import WordPressSite
+from app.services.crypto import encrypt_text
+
+NOON = datetime(2030, 1, 1, 12, 0, tzinfo=timezone.utc)
+PLUS5 = timezone(timedelta(hours=5))
+
+
+def _posts(user_id: int, created: list[datetime]) -> list[int]:
+    db = SessionLocal()
+    try:
+        site = WordPressSite(user_id=user_id, wp_url="https://wp.test", wp_user="u", wp_app_pass_enc=encrypt_text("p"))
+        db.add(site)
+        db.flush()
+        posts = [
+            GeneratedPost(user_id=user_id, site_id=site.id, title=f"t{i}", keyword=f"k{i}",
+                          wp_post_url=f"https://wp.test/{i}", created_at=at)
+            for i, at in enumerate(created)
+        ]
+        db.add_all(posts)
+        db.commit()
+        return [p.id for p in posts]
+    finally:
+        db.close()
+
+
+def _all_pages(client, headers, limit: int, **params) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        q = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/v1/posts/", params=q, headers=headers).json()
+        pages.append([p["id"] for p in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def test_pages_cross_identical_created_at(client, auth_headers):
+    headers, user_id = auth_headers
+    # six posts at the same instant, written naive UTC, aware UTC and +05:00
+    tied = [NOON.replace(tzinfo=None), NOON, NOON.astimezone(PLUS5)] * 2
+    older = [NOON - timedelta(hours=1), NOON - timedelta(days=1)]
+    ids = _posts(user_id, tied + older)
+
+    pages = _all_pages(client, headers, limit=4)
+    assert [len(p) for p in pages] == [4, 4]
+    flat = [i for page in pages for i in page]
+    assert flat == sorted(ids[:6], reverse=True) + ids[6:]
+
+
+def test_aware_date_filters_compare_in_utc(client, auth_headers):
+    headers, user_id = auth_headers
+    ids = _posts(user_id, [NOON - timedelta(hours=1), NOON, NOON + timedelta(hours=1)])
+
+    # [12:00Z, 13:00Z) written with a +05:00 offset
+    params = {"date_from": NOON.astimezone(PLUS5).isoformat(),
+              "date_to": (NOON + timedelta(hours=1)).astimezone(PLUS5).isoformat()}
+    assert _all_pages(client, headers, limit=1, **params) == [[ids[1]]]
@@ -0,0 +1,64 @@
+from sqlalchemy import select
+
+from app.core.db import SessionLocal
+from app.models.credit_ledger import CreditLedgerEntry
+from app.models.scheduled_publish import ScheduledPublish
+from app.models.site import WordPressSite
+from app.models.user import User
+from app.services.crypto import encrypt_text
+
+
+def _site(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        site = WordPressSite(user_id=user_id, wp_url="https://wp.test", wp_user="u", wp_app_pass_enc=encrypt_text("p"))
+        db.add(site)
+        db.commit()
+        return site.id
+    finally:
+        db.close()
+
+
+def _schedule(client, headers, site_id: int, keywords: list[str]):
+    body = {"site_id": site_id, "keywords": keywords, "start_at": "2030-01-01T00:00:00", "interval_minutes": 60}
+    return client.post("/api/v1/schedule/", json=body, headers=headers)
+
+
+def test_schedule_reserves_one_credit_per_item(client, auth_headers):
+    headers, user_id = auth_headers  # signup grants 5 credits
+    site_id = _site(user_id)
+
+    r = _schedule(client, headers, site_id, ["a", "b", "c"])
+    assert r.status_code == 201
+
+    db = SessionLocal()
+    try:
+        assert db.scalar(select(User.credits).where(User.id == user_id)) == 2
+        reserves = db.scalars(
+            select(CreditLedgerEntry)
+            .where(CreditLedgerEntry.user_id == user_id, CreditLedgerEntry.kind == "reserve")
+            .order_by(CreditLedgerEntry.id)
+        ).all()
+        assert [(e.delta, e.balance_after) for e in reserves] == [(-1, 4), (-1, 3), (-1, 2)]
+        job_ids = set(db.scalars(select(ScheduledPublish.job_id).where(ScheduledPublish.user_id == user_id)))
+        assert {e.job_id for e in reserves} == job_ids
+        assert len(job_ids) == 3
+    finally:
+        db.close()
+
+
+def test_schedule_without_enough_credits_reserves_nothing(client, auth_headers):
+    headers, user_id = auth_headers
+    site_id = _site(user_id)
+
+    r = _schedule(client, headers, site_id, [f"k{i}" for i in range(6)])
+    assert r.status_code == 400
+
+    db = SessionLocal()
+    try:
+        assert db.scalar(select(User.credits).where(User.id == user_id)) == 5
+        assert not db.scalars(select(CreditLedgerEntry).where(
+            CreditLedgerEntry.user_id == user_id, CreditLedgerEntry.kind == "reserve")).all()
+        assert not db.scalars(select(ScheduledPublish).where(ScheduledPublish.user_id == user_id)).all()
+    finally:
+        db.close()
@@ -0,0 +1,24 @@
+import time
+
+from app.services import wp_meta
+from app.services.wp_meta import SiteMetaRefresher
+
+
+def test_stale_scan_runs_while_submits_keep_arriving(monkeypatch):
+    refreshed, scans = [], []
+    monkeypatch.setattr(wp_meta, "refresh_site_by_id", lambda sid, *a: refreshed.append(sid))
+    refresher = SiteMetaRefresher(interval=0.2, batch_size=10)
+    monkeypatch.setattr(refresher, "stale_sites", lambda: scans.append(time.monotonic()) or [])
+
+    refresher.start()
+    try:
+        # one submit every 50ms never lets queue.get(timeout=interval) expire
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            refresher.submit(1)
+            time.sleep(0.05)
+    finally:
+        refresher.stop()
+
+    assert len(refreshed) >= 10
+    assert 3 <= len(scans) <= 6